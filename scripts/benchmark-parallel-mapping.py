@@ -0,0 +1,91 @@
+"""
+Benchmark how parallel mapping scales with the number of workers
+
+The records are our test data, repeated to give a catalogue
+of the requested size.
+The serial row is
+[map_to_cmip_branded_variables][cmip_branded_variable_mapper.bulk.].
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import typer
+from tabulate import tabulate
+
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+from cmip_branded_variable_mapper.parallel import (
+    map_to_cmip_branded_variables_parallel,
+)
+
+TEST_DATA_FILE = (
+    Path(__file__).parents[1]
+    / "tests"
+    / "test-data"
+    / "CMIP7-variables-for-branding.csv"
+)
+
+
+def main(
+    n_records: int = 2_000_000,
+    workers: list[int] = [1, 2, 4, 8, 16, 32, 64],
+    chunk_size: int = 50_000,
+) -> None:
+    """
+    Print the time taken to map a catalogue with different numbers of workers
+
+    Parameters
+    ----------
+    n_records
+        Number of records in the catalogue
+
+    workers
+        Numbers of workers to benchmark with.
+
+        Numbers greater than the number of available processors are skipped.
+
+    chunk_size
+        Number of records sent to a worker at once
+    """
+    raw = pd.read_csv(TEST_DATA_FILE)
+    n_repeats = -(-n_records // raw.shape[0])
+    variable_names = (raw["Physical Parameter"].tolist() * n_repeats)[:n_records]
+    cell_methods = (
+        [None if pd.isnull(v) else v for v in raw["Cell Methods"]] * n_repeats
+    )[:n_records]
+    # Vary the variable names a bit, so it isn't purely repeated work
+    variable_names = [f"{v}{i % 97}" for i, v in enumerate(variable_names)]
+    dimensions = ([tuple(v.split(", ")) for v in raw["Dimensions"]] * n_repeats)[
+        :n_records
+    ]
+
+    start = time.perf_counter()
+    map_to_cmip_branded_variables(variable_names, cell_methods, dimensions)
+    serial = time.perf_counter() - start
+    rows: list[list[object]] = [["serial (bulk)", f"{serial:.2f}", "1.00"]]
+
+    for n_workers in workers:
+        if n_workers > (os.cpu_count() or 1):
+            continue
+
+        start = time.perf_counter()
+        map_to_cmip_branded_variables_parallel(
+            variable_names,
+            cell_methods,
+            dimensions,
+            max_workers=n_workers,
+            chunk_size=chunk_size,
+        )
+        elapsed = time.perf_counter() - start
+        rows.append([n_workers, f"{elapsed:.2f}", f"{serial / elapsed:.2f}"])
+
+    print(f"{n_records=}, {chunk_size=}")
+    print(tabulate(rows, headers=["workers", "time (s)", "speed up vs. serial"]))
+
+
+if __name__ == "__main__":
+    typer.run(main)
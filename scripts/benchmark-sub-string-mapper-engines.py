@@ -0,0 +1,89 @@
+"""
+Benchmark the engines of `CellMethodsSubStringMapperOrdered`
+
+This is what we used to choose `AUTOMATON_ENGINE_MIN_KEYS`.
+The cell methods come from our test data,
+the sub-strings are our area label sub-strings
+plus randomly generated sub-strings (to mimic extended vocabularies).
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import timeit
+from pathlib import Path
+
+import pandas as pd
+import typer
+from tabulate import tabulate
+
+from cmip_branded_variable_mapper.area_label import AREA_LABEL_CELL_METHODS_MAPPER
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapperOrdered,
+)
+
+TEST_DATA_FILE = (
+    Path(__file__).parents[1]
+    / "tests"
+    / "test-data"
+    / "CMIP7-variables-for-branding.csv"
+)
+
+
+def main(
+    n_keys: list[int] = [0, 25, 50, 100, 250, 1000],
+    repeats: int = 5,
+    seed: int = 20250924,
+) -> None:
+    """
+    Print the time per call of each engine for different numbers of keys
+
+    Parameters
+    ----------
+    n_keys
+        Number of extra, randomly generated sub-strings to benchmark with
+
+    repeats
+        Number of times to repeat each timing
+
+    seed
+        Seed for the random number generator
+    """
+    cell_methods = pd.read_csv(TEST_DATA_FILE)["Cell Methods"].tolist()
+    rng = random.Random(seed)  # noqa: S311
+
+    rows = []
+    for n in n_keys:
+        unordered_map = dict(AREA_LABEL_CELL_METHODS_MAPPER.sub_string_map)
+        while (
+            len(unordered_map) < len(AREA_LABEL_CELL_METHODS_MAPPER.sub_string_map) + n
+        ):
+            key = "".join(
+                rng.choice(string.ascii_lowercase + "_")
+                for _ in range(rng.randint(8, 20))
+            )
+            unordered_map[key] = key
+
+        row: list[object] = [len(unordered_map)]
+        for engine in ("scan", "automaton"):
+            mapper = CellMethodsSubStringMapperOrdered.from_unordered(
+                unordered_map, engine=engine
+            )
+
+            def run(mapper: CellMethodsSubStringMapperOrdered = mapper) -> None:
+                for cm in cell_methods:
+                    mapper.get_value(cm)
+
+            time_per_call = min(timeit.repeat(run, number=1, repeat=repeats)) / len(
+                cell_methods
+            )
+            row.append(f"{time_per_call * 1e9:.0f}")
+
+        rows.append(row)
+
+    print(tabulate(rows, headers=["n keys", "scan (ns/call)", "automaton (ns/call)"]))
+
+
+if __name__ == "__main__":
+    typer.run(main)
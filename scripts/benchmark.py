@@ -0,0 +1,344 @@
+"""
+Benchmark the mapping, label functions and mapper classes
+
+Results are written as JSON to a history directory
+(one file per run, tagged with the commit),
+so runs on different commits can be compared.
+
+Run the benchmarks on the current commit
+
+```sh
+uv run python scripts/benchmark.py run
+```
+
+then compare two runs, flagging regressions
+(exits with a non-zero code if there are any)
+
+```sh
+uv run python scripts/benchmark.py compare <base-commit> <new-commit>
+```
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import platform
+import random
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+import typer
+from tabulate import tabulate
+
+from cmip_branded_variable_mapper.area_label import (
+    AREA_LABEL_CELL_METHODS_MAPPER,
+    get_area_label,
+)
+from cmip_branded_variable_mapper.horizontal_label import get_horizontal_label
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+    get_temporal_label,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+    get_vertical_label,
+)
+
+REPO_ROOT = Path(__file__).parents[1]
+
+TEST_DATA_FILE = REPO_ROOT / "tests" / "test-data" / "CMIP7-variables-for-branding.csv"
+
+DEFAULT_HISTORY_DIR = REPO_ROOT / ".benchmarks"
+
+Record = tuple[str, "str | None", tuple[str, ...]]
+
+app = typer.Typer()
+
+
+def load_catalogue() -> list[Record]:
+    """
+    Load the records in our test data
+    """
+    raw = pd.read_csv(TEST_DATA_FILE)
+
+    return [
+        (
+            variable_name,
+            None if pd.isnull(cell_methods) else cell_methods,
+            tuple(dimensions.split(", ")),
+        )
+        for variable_name, cell_methods, dimensions in zip(
+            raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+        )
+    ]
+
+
+def make_synthetic(catalogue: list[Record], size: int, seed: int) -> list[Record]:
+    """
+    Make synthetic records by perturbing records from the catalogue
+
+    Each synthetic record is a random catalogue record
+    with its dimensions shuffled and, sometimes, an extra unknown dimension,
+    so there are many more unique combinations than in the catalogue.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    res = []
+    for _ in range(size):
+        variable_name, cell_methods, dimensions = rng.choice(catalogue)
+        dimensions_l = list(dimensions)
+        if rng.random() < 0.5:  # noqa: PLR2004
+            dimensions_l.append(f"extra{rng.randrange(1000)}")
+
+        rng.shuffle(dimensions_l)
+        res.append((variable_name, cell_methods, tuple(dimensions_l)))
+
+    return res
+
+
+def get_benchmarks(records: list[Record]) -> dict[str, Callable[[], object]]:
+    """
+    Get the benchmarks to run over some records
+
+    Each benchmark loops over all the records once.
+    The mapper classes are given empty cell methods
+    for records without cell methods.
+    """
+    cell_methods_l = [cm or "" for _, cm, _ in records]
+    dimensions_l = [dims for _, _, dims in records]
+
+    def run_map() -> None:
+        for variable_name, cell_methods, dimensions in records:
+            map_to_cmip_branded_variable(variable_name, cell_methods, dimensions)
+
+    def run_temporal() -> None:
+        for _, cell_methods, dimensions in records:
+            get_temporal_label(cell_methods, dimensions)
+
+    def run_vertical() -> None:
+        for dimensions in dimensions_l:
+            get_vertical_label(dimensions)
+
+    def run_horizontal() -> None:
+        for dimensions in dimensions_l:
+            get_horizontal_label(dimensions)
+
+    def run_area() -> None:
+        for _, cell_methods, _ in records:
+            get_area_label(cell_methods)
+
+    def run_sub_string_mapper() -> None:
+        mapper = TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER
+        for cell_methods in cell_methods_l:
+            mapper.get_value(cell_methods)
+
+    def run_sub_string_mapper_ordered() -> None:
+        mapper = AREA_LABEL_CELL_METHODS_MAPPER
+        for cell_methods in cell_methods_l:
+            mapper.get_value(cell_methods)
+
+    def run_dimension_mapper() -> None:
+        mapper = VERTICAL_LABEL_DIMENSIONS_MAPPER
+        for dimensions in dimensions_l:
+            mapper.get_value(dimensions)
+
+    return {
+        "map_to_cmip_branded_variable": run_map,
+        "get_temporal_label": run_temporal,
+        "get_vertical_label": run_vertical,
+        "get_horizontal_label": run_horizontal,
+        "get_area_label": run_area,
+        "CellMethodsSubStringMapper.get_value": run_sub_string_mapper,
+        "CellMethodsSubStringMapperOrdered.get_value": run_sub_string_mapper_ordered,
+        "DimensionMapper.get_value": run_dimension_mapper,
+    }
+
+
+def get_commit() -> str:
+    """
+    Get the current commit (with a `-dirty` suffix if there are changes)
+    """
+    commit = subprocess.check_output(  # noqa: S603
+        ["git", "rev-parse", "HEAD"],  # noqa: S607
+        cwd=REPO_ROOT,
+        text=True,
+    ).strip()
+    status = subprocess.check_output(  # noqa: S603
+        ["git", "status", "--porcelain", "--untracked-files=no"],  # noqa: S607
+        cwd=REPO_ROOT,
+        text=True,
+    )
+
+    return f"{commit}-dirty" if status.strip() else commit
+
+
+@app.command()
+def run(
+    history_dir: Path = DEFAULT_HISTORY_DIR,
+    synthetic_size: int = 20_000,
+    repeats: int = 5,
+    seed: int = 20251018,
+) -> None:
+    """
+    Run the benchmarks and add the results to the history
+
+    Parameters
+    ----------
+    history_dir
+        Directory in which to store the results
+
+    synthetic_size
+        Number of synthetic records to benchmark with
+
+    repeats
+        Number of times to repeat each benchmark (the fastest is recorded)
+
+    seed
+        Seed for the random number generator used to make the synthetic records
+    """
+    catalogue = load_catalogue()
+    datasets = {
+        "catalogue": catalogue,
+        f"synthetic-{synthetic_size}": make_synthetic(
+            catalogue, size=synthetic_size, seed=seed
+        ),
+    }
+
+    results: dict[str, dict[str, Any]] = {}
+    for dataset, records in datasets.items():
+        for name, func in get_benchmarks(records).items():
+            times = timeit.repeat(func, number=1, repeat=repeats)
+            results[f"{dataset}/{name}"] = {
+                "ns_per_record": min(times) / len(records) * 1e9,
+                "times_s": times,
+                "n_records": len(records),
+            }
+
+    commit = get_commit()
+    timestamp = dt.datetime.now(dt.timezone.utc)
+    out = {
+        "commit": commit,
+        "timestamp": timestamp.isoformat(),
+        "python": sys.version,
+        "machine": platform.platform(),
+        "results": results,
+    }
+
+    history_dir.mkdir(parents=True, exist_ok=True)
+    out_file = history_dir / f"{timestamp:%Y%m%dT%H%M%S}-{commit[:12]}.json"
+    out_file.write_text(json.dumps(out, indent=2))
+
+    print(
+        tabulate(
+            [[k, f"{v['ns_per_record']:.0f}"] for k, v in results.items()],
+            headers=["benchmark", "ns/record"],
+        )
+    )
+    print(f"Wrote {out_file}")
+
+
+def find_run(run_id: str, history_dir: Path) -> Path:
+    """
+    Find a run in the history
+
+    `run_id` is either a path to a results file
+    or (the start of) a commit, in which case the latest run of that commit is used.
+    """
+    if (path := Path(run_id)).is_file():
+        return path
+
+    commit = subprocess.run(  # noqa: S603
+        ["git", "rev-parse", "--verify", "--quiet", f"{run_id}^{{commit}}"],  # noqa: S607
+        cwd=REPO_ROOT,
+        text=True,
+        capture_output=True,
+        check=False,
+    ).stdout.strip()
+    prefix = commit or run_id
+
+    matches = sorted(
+        p
+        for p in history_dir.glob("*.json")
+        if json.loads(p.read_text())["commit"].startswith(prefix)
+    )
+    if not matches:
+        msg = f"No runs of {run_id!r} found in {history_dir}"
+        raise typer.BadParameter(msg)
+
+    return matches[-1]
+
+
+@app.command()
+def compare(
+    base: str,
+    new: str,
+    history_dir: Path = DEFAULT_HISTORY_DIR,
+    threshold: float = 0.1,
+) -> None:
+    """
+    Compare two runs, flagging regressions
+
+    Parameters
+    ----------
+    base
+        Run to compare against (a results file or a commit)
+
+    new
+        Run to compare (a results file or a commit)
+
+    history_dir
+        Directory in which the results are stored
+
+    threshold
+        Relative slow down above which a benchmark is flagged as a regression
+    """
+    base_res = json.loads(find_run(base, history_dir).read_text())
+    new_res = json.loads(find_run(new, history_dir).read_text())
+
+    rows = []
+    n_regressions = 0
+    for name, new_v in new_res["results"].items():
+        if (base_v := base_res["results"].get(name)) is None:
+            rows.append([name, "-", f"{new_v['ns_per_record']:.0f}", "-", "new"])
+            continue
+
+        ratio = new_v["ns_per_record"] / base_v["ns_per_record"]
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            n_regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "improvement"
+        else:
+            flag = ""
+
+        rows.append(
+            [
+                name,
+                f"{base_v['ns_per_record']:.0f}",
+                f"{new_v['ns_per_record']:.0f}",
+                f"{ratio:.2f}",
+                flag,
+            ]
+        )
+
+    print(f"base: {base_res['commit']}")
+    print(f"new:  {new_res['commit']}")
+    print(
+        tabulate(
+            rows,
+            headers=["benchmark", "base (ns/record)", "new (ns/record)", "ratio", ""],
+        )
+    )
+
+    if n_regressions:
+        print(f"{n_regressions} regression(s) above {threshold:.0%}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,59 @@
+"""
+Build a lookup artifact from a catalogue of variables
+
+By default, the catalogue is our test data (the CMIP7 data request).
+See [artifact][cmip_branded_variable_mapper.artifact] for details.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import typer
+
+from cmip_branded_variable_mapper.artifact import LookupArtifact, build_artifact
+
+TEST_DATA_FILE = (
+    Path(__file__).parents[1]
+    / "tests"
+    / "test-data"
+    / "CMIP7-variables-for-branding.csv"
+)
+
+
+def main(
+    out_file: Path = Path("cmip-branded-variables.lookup"),
+    catalogue: Path = TEST_DATA_FILE,
+) -> None:
+    """
+    Map a catalogue once and write the results to a lookup artifact
+
+    Parameters
+    ----------
+    out_file
+        File in which to write the artifact
+
+    catalogue
+        CSV file with "Compound Name", "Physical Parameter",
+        "Cell Methods" and "Dimensions" columns
+    """
+    raw = pd.read_csv(catalogue)
+    build_artifact(
+        out_file,
+        compound_names=raw["Compound Name"].tolist(),
+        variable_names=raw["Physical Parameter"].tolist(),
+        cell_methods=[None if pd.isnull(v) else v for v in raw["Cell Methods"]],
+        dimensions=[tuple(v.split(", ")) for v in raw["Dimensions"]],
+    )
+
+    artifact = LookupArtifact.from_path(out_file)
+    print(
+        f"Wrote {artifact.n_records} records to {out_file} "
+        f"({out_file.stat().st_size} bytes)"
+    )
+    artifact.close()
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -2,10 +2,56 @@
 Mapping from CMIP variable and other information to branded variable names.
 """
 
-import importlib.metadata
+from __future__ import annotations
 
-from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+import importlib
 
-__version__ = importlib.metadata.version("cmip_branded_variable_mapper")
+# Not imported from typing, as importing typing is relatively slow
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
 
-__all__ = ["map_to_cmip_branded_variable"]
+    from cmip_branded_variable_mapper.bulk import (
+        map_dataframe_to_cmip_branded_variables,
+        map_to_cmip_branded_variables,
+    )
+    from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+    __version__: str
+
+# The public API and version are resolved on first access,
+# so importing the package (e.g. to get at a sub-module) stays cheap.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "map_dataframe_to_cmip_branded_variables": "cmip_branded_variable_mapper.bulk",
+    "map_to_cmip_branded_variable": "cmip_branded_variable_mapper.mapper",
+    "map_to_cmip_branded_variables": "cmip_branded_variable_mapper.bulk",
+}
+
+__all__ = [
+    "map_dataframe_to_cmip_branded_variables",
+    "map_to_cmip_branded_variable",
+    "map_to_cmip_branded_variables",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value: Any = version("cmip_branded_variable_mapper")
+
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    # Cache, so __getattr__ isn't called again
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__, "__version__"})
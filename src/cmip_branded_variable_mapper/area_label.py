@@ -4,6 +4,7 @@ Determination of the area label
 
 from __future__ import annotations
 
+from cmip_branded_variable_mapper.cell_methods import ParsedCellMethods
 from cmip_branded_variable_mapper.mapper_classes import (
     CellMethodsSubStringMapperOrdered,
 )
@@ -43,7 +44,7 @@ Mapper from sub-strings of cell methods to the area label
 
 
 def get_area_label(
-    cell_methods: str | None,
+    cell_methods: str | ParsedCellMethods | None,
     cell_methods_mapper: CellMethodsSubStringMapperOrdered = (
         AREA_LABEL_CELL_METHODS_MAPPER
     ),
@@ -63,6 +64,12 @@ def get_area_label(
     cell_methods
         Cell methods of the variable
 
+        If parsed cell methods are given,
+        only their `area_text`
+        (i.e. the values of the `where`, `over` and `within` qualifiers
+        and the comments)
+        is checked by `cell_methods_mapper`.
+
     cell_methods_mapper
         Mapper to use to get values based on cell methods
 
@@ -74,6 +81,9 @@ def get_area_label(
     :
         Area label to use for constructing the branded variable name
     """
+    if isinstance(cell_methods, ParsedCellMethods):
+        cell_methods = cell_methods.area_text
+
     if cell_methods is not None:
         if (match := cell_methods_mapper.get_value(cell_methods)) is not None:
             return match
@@ -0,0 +1,305 @@
+"""
+Output of mapping results to [Apache Arrow](https://arrow.apache.org) and Parquet
+
+This requires the optional [pyarrow](https://arrow.apache.org/docs/python) package.
+
+Every column (the inputs, the branded variable and each label)
+is written dictionary-encoded,
+i.e. as integer codes into a small array of distinct values.
+Like in [columnar][cmip_branded_variable_mapper.columnar],
+no Python string is created per record, neither when writing nor when reading,
+which keeps the files and the memory footprint small
+even for tens of millions of records.
+
+For example
+
+```python
+from cmip_branded_variable_mapper.arrow import map_to_parquet, read_parquet
+
+map_to_parquet("mapped.parquet", variable_names, cell_methods, dimensions)
+df = read_parquet("mapped.parquet")  # every column is a pd.Categorical
+```
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from cmip_branded_variable_mapper.columnar import (
+    factorize,
+    map_to_cmip_branded_variables_columnar,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+INPUT_COLUMNS: tuple[str, ...] = ("variable_name", "cell_methods", "dimensions")
+"""
+Names of the columns in which the inputs are written
+"""
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        msg = (
+            "Arrow and Parquet output requires pyarrow. "
+            "Please install it "
+            "(e.g. `pip install 'cmip-branded-variable-mapper[parquet]'`)."
+        )
+        raise ImportError(msg) from exc
+
+    return pyarrow
+
+
+def to_categorical(values: Sequence[Any]) -> pd.Categorical:
+    """
+    Convert values to a [pd.Categorical][pandas.Categorical]
+
+    Parameters
+    ----------
+    values
+        Values to convert.
+
+        Missing values (`None`, `NaN`) are kept as missing values.
+        Sequences (e.g. dimensions) are joined with spaces.
+
+    Returns
+    -------
+    :
+        Categorical, built from the unique values only
+    """
+    if isinstance(values, pd.Categorical):
+        return values
+
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.array
+
+    codes, uniques = factorize(values)
+
+    # Sequences are joined, so e.g. ("longitude", "latitude")
+    # and "longitude latitude" are the same category.
+    # Only the unique values are normalised, then their codes are merged.
+    categories: dict[str, int] = {}
+    unique_codes = np.empty(len(uniques), dtype=np.intp)
+    for i, u in enumerate(uniques):
+        if u is None:
+            # Missing values have the code -1
+            unique_codes[i] = -1
+        else:
+            category = " ".join(u) if isinstance(u, tuple) else u
+            unique_codes[i] = categories.setdefault(category, len(categories))
+
+    return pd.Categorical.from_codes(unique_codes[codes], categories=list(categories))
+
+
+def categorical_to_arrow(values: pd.Categorical) -> pa.DictionaryArray:
+    """
+    Convert a [pd.Categorical][pandas.Categorical] to a dictionary-encoded array
+
+    Parameters
+    ----------
+    values
+        Values to convert
+
+    Returns
+    -------
+    :
+        Dictionary-encoded array which shares the categorical's codes
+    """
+    pa = _import_pyarrow()
+
+    codes = np.asarray(values.codes)
+    categories = np.asarray(values.categories, dtype=object)
+
+    return pa.DictionaryArray.from_arrays(
+        # Missing values have the code -1
+        pa.array(codes, mask=codes == -1),
+        pa.array(categories, type=None if len(categories) else pa.string()),
+    )
+
+
+def dataframe_to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a [pd.DataFrame][pandas.DataFrame] to an Arrow table
+
+    Parameters
+    ----------
+    df
+        Data to convert (e.g. from
+        [map_dataframe_to_cmip_branded_variables][cmip_branded_variable_mapper.bulk.])
+
+    Returns
+    -------
+    :
+        Table, in which every column is dictionary-encoded.
+
+        The index is dropped.
+    """
+    pa = _import_pyarrow()
+
+    return pa.table(
+        {
+            str(column): categorical_to_arrow(to_categorical(df[column]))
+            for column in df.columns
+        }
+    )
+
+
+def map_to_arrow_table(
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+) -> pa.Table:
+    """
+    Map many records into an Arrow table
+
+    Parameters
+    ----------
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    Returns
+    -------
+    :
+        Table with the inputs (see [INPUT_COLUMNS][(m).]),
+        the branded variable and each label for each record.
+
+        Every column is dictionary-encoded.
+        Dimensions are written as a single string, separated by spaces.
+    """
+    mapped = map_to_cmip_branded_variables_columnar(
+        variable_names=variable_names, cell_methods=cell_methods, dimensions=dimensions
+    )
+    inputs = {
+        column: to_categorical(values)
+        for column, values in zip(
+            INPUT_COLUMNS, (variable_names, cell_methods, dimensions)
+        )
+    }
+
+    return dataframe_to_arrow_table(
+        pd.DataFrame({**inputs, **{c: mapped[c] for c in mapped.columns}})
+    )
+
+
+def map_to_parquet(
+    path: Path | str,
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+    **kwargs: Any,
+) -> None:
+    """
+    Map many records and write the results to a Parquet file
+
+    Parameters
+    ----------
+    path
+        Path to the file to write
+
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    **kwargs
+        Passed to [pyarrow.parquet.write_table][]
+    """
+    pa = _import_pyarrow()
+
+    pa.parquet.write_table(
+        map_to_arrow_table(
+            variable_names=variable_names,
+            cell_methods=cell_methods,
+            dimensions=dimensions,
+        ),
+        path,
+        **kwargs,
+    )
+
+
+def arrow_table_to_dataframe(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert an Arrow table to a [pd.DataFrame][pandas.DataFrame]
+
+    Parameters
+    ----------
+    table
+        Table to convert
+
+    Returns
+    -------
+    :
+        Converted table.
+
+        Dictionary-encoded columns are returned as
+        [pd.Categorical][pandas.Categorical] built directly from their codes,
+        so no Python string is created per record.
+    """
+    # Chunks may have different dictionaries, unify them so each column
+    # becomes one categorical rather than being decoded
+    res: pd.DataFrame = table.unify_dictionaries().to_pandas()
+
+    return res
+
+
+def read_parquet(
+    path: Path | str, columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """
+    Read a Parquet file, e.g. one written by [map_to_parquet][(m).]
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    columns
+        Columns to read.
+
+        If `None`, all columns are read.
+
+    Returns
+    -------
+    :
+        Data in the file.
+
+        String columns are returned as [pd.Categorical][pandas.Categorical]
+        (see [arrow_table_to_dataframe][(m).]).
+    """
+    pa = _import_pyarrow()
+
+    schema = pa.parquet.read_schema(path)
+    names = schema.names if columns is None else list(columns)
+    read_dictionary = [
+        name
+        for name in names
+        if pa.types.is_string(schema.field(name).type)
+        or pa.types.is_large_string(schema.field(name).type)
+        or pa.types.is_dictionary(schema.field(name).type)
+    ]
+    table = pa.parquet.read_table(
+        path,
+        columns=None if columns is None else list(columns),
+        read_dictionary=read_dictionary,
+    )
+
+    return arrow_table_to_dataframe(table)
@@ -0,0 +1,538 @@
+"""
+Precomputed, memory-mapped lookup artifact
+
+Most lookups are for a fixed catalogue of variables
+(e.g. the CMIP7 data request).
+[build_artifact][(m).] maps such a catalogue once
+and writes the results to a compact binary file.
+[LookupArtifact][(m).] memory-maps this file,
+so loading it does no parsing
+and many processes can share one (page-cached) copy.
+[ArtifactMapper][(m).] looks records up in an artifact,
+falling back to the live mapper for anything which isn't in it.
+
+The file is made up of (all integers are little-endian)
+
+- a header (see `HEADER_FORMAT`)
+- a string table: the offset of each string (uint32)
+  followed by the UTF-8 encoded strings
+- a label table: for each label, the string ID of each label code (uint32)
+- the records: compound name, key and branded variable string IDs (uint32)
+  then the code of each label (uint8)
+- two open-addressing hash indexes (uint32 record number plus one, zero is empty),
+  one keyed by compound name
+  and one keyed by (variable name, cell methods, dimensions)
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable
+
+from attrs import define, field
+
+from cmip_branded_variable_mapper.mapper import get_labels, map_to_cmip_branded_variable
+
+MAGIC = b"CBVMLKUP"
+"""
+Bytes at the start of every artifact
+"""
+
+FORMAT_VERSION = 1
+"""
+Version of the artifact format
+"""
+
+HEADER_FORMAT = "<8sIIII"
+"""
+Format of the header
+
+Magic bytes, format version, number of strings, number of records
+and number of slots in each hash index.
+"""
+
+RECORD_FORMAT = "<III4B"
+"""
+Format of each record
+
+Compound name, key and branded variable string IDs,
+then the temporal, vertical, horizontal and area label codes.
+"""
+
+LABELS: tuple[str, ...] = (
+    "temporal_label",
+    "vertical_label",
+    "horizontal_label",
+    "area_label",
+)
+"""
+Labels stored in the artifact, in the order in which their codes are stored
+"""
+
+MAX_LABEL_CODES = 256
+"""
+Maximum number of distinct values of each label (codes are stored as uint8)
+"""
+
+_NO_CELL_METHODS = "\x00"
+_KEY_SEPARATOR = "\x1f"
+_DIMENSIONS_SEPARATOR = "\x1e"
+
+_HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+_RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+_UINT32 = struct.Struct("<I")
+_UINT32_PAIR = struct.Struct("<II")
+
+
+def make_key(
+    variable_name: str, cell_methods: str | None, dimensions: Sequence[str]
+) -> bytes:
+    """
+    Make the key used to look up a record
+
+    Parameters
+    ----------
+    variable_name
+        Variable name
+
+    cell_methods
+        Cell methods
+
+    dimensions
+        Dimensions
+
+    Returns
+    -------
+    :
+        Key, as bytes
+    """
+    return _KEY_SEPARATOR.join(
+        [
+            variable_name,
+            _NO_CELL_METHODS if cell_methods is None else cell_methods,
+            _DIMENSIONS_SEPARATOR.join(dimensions),
+        ]
+    ).encode()
+
+
+def _build_index(keys: Sequence[bytes], n_slots: int) -> list[int]:
+    # The hash must be stable across processes, so we can't use `hash`
+    mask = n_slots - 1
+    slots = [0] * n_slots
+    seen = set()
+    for i, key in enumerate(keys):
+        if key in seen:
+            # Keep the first record with a given key
+            continue
+
+        seen.add(key)
+        slot = zlib.crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+
+        slots[slot] = i + 1
+
+    return slots
+
+
+def build_artifact(
+    path: Path,
+    compound_names: Sequence[str],
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str]],
+) -> None:
+    """
+    Map a catalogue and write the results to an artifact
+
+    Parameters
+    ----------
+    path
+        Path in which to write the artifact
+
+    compound_names
+        Compound name of each record (e.g. "Amon.tas")
+
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    Raises
+    ------
+    ValueError
+        The inputs are not all the same length
+        or a label has more than [MAX_LABEL_CODES][(m).] distinct values
+    """
+    if not (
+        len(compound_names)
+        == len(variable_names)
+        == len(cell_methods)
+        == len(dimensions)
+    ):
+        msg = (
+            "compound_names, variable_names, cell_methods and dimensions "
+            "must all be the same length. "
+            f"Received {len(compound_names)=}, {len(variable_names)=}, "
+            f"{len(cell_methods)=} and {len(dimensions)=}"
+        )
+        raise ValueError(msg)
+
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    label_codes: list[dict[str, int]] = [{} for _ in LABELS]
+    records = []
+    record_keys = []
+    for compound_name, variable_name, cm, dims in zip(
+        compound_names, variable_names, cell_methods, dimensions
+    ):
+        # Same code path as the live mapper used by ArtifactMapper's fallback
+        labels = get_labels(cell_methods=cm, dimensions=dims)
+        key = make_key(variable_name, cm, dims)
+        record_keys.append(key)
+        records.append(
+            struct.pack(
+                RECORD_FORMAT,
+                intern(compound_name),
+                intern(key.decode()),
+                intern("_".join([variable_name, "-".join(labels)])),
+                *(
+                    codes.setdefault(label, len(codes))
+                    for codes, label in zip(label_codes, labels)
+                ),
+            )
+        )
+
+    for column, codes in zip(LABELS, label_codes):
+        if len(codes) > MAX_LABEL_CODES:
+            msg = (
+                f"{column} has {len(codes)} distinct values, "
+                f"at most {MAX_LABEL_CODES} are supported"
+            )
+            raise ValueError(msg)
+
+    label_table_header = [len(codes) for codes in label_codes]
+    label_table = [intern(label) for codes in label_codes for label in codes]
+
+    encoded = [s.encode() for s in strings]
+    offsets = [0]
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+
+    n_slots = 1
+    while n_slots < 2 * max(len(records), 1):
+        n_slots *= 2
+
+    compound_index = _build_index([c.encode() for c in compound_names], n_slots)
+    key_index = _build_index(record_keys, n_slots)
+
+    with open(path, "wb") as fh:
+        fh.write(
+            struct.pack(
+                HEADER_FORMAT,
+                MAGIC,
+                FORMAT_VERSION,
+                len(strings),
+                len(records),
+                n_slots,
+            )
+        )
+        fh.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        fh.write(b"".join(encoded))
+        fh.write(struct.pack(f"<{len(label_codes)}I", *label_table_header))
+        fh.write(struct.pack(f"<{len(label_table)}I", *label_table))
+        fh.write(b"".join(records))
+        fh.write(struct.pack(f"<{n_slots}I", *compound_index))
+        fh.write(struct.pack(f"<{n_slots}I", *key_index))
+
+
+@define
+class LookupArtifact:
+    """
+    Memory-mapped lookup artifact
+
+    Use [from_path][(c).] to load an artifact.
+    """
+
+    path: Path
+    """
+    Path to the artifact
+    """
+
+    n_records: int
+    """
+    Number of records in the artifact
+    """
+
+    _mmap: mmap.mmap = field(repr=False)
+    _n_slots: int = field(repr=False)
+    _offsets_start: int = field(repr=False)
+    _strings_start: int = field(repr=False)
+    _labels: tuple[tuple[str, ...], ...] = field(repr=False)
+    _records_start: int = field(repr=False)
+    _compound_index_start: int = field(repr=False)
+    _key_index_start: int = field(repr=False)
+
+    @classmethod
+    def from_path(cls, path: Path) -> LookupArtifact:
+        """
+        Load (memory-map) an artifact
+
+        Parameters
+        ----------
+        path
+            Path to the artifact
+
+        Returns
+        -------
+        :
+            Loaded artifact
+
+        Raises
+        ------
+        ValueError
+            The file is not an artifact or was written with a different format version
+        """
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mm) < _HEADER_SIZE or mm[: len(MAGIC)] != MAGIC:
+            mm.close()
+            msg = f"{path} is not a lookup artifact"
+            raise ValueError(msg)
+
+        _, version, n_strings, n_records, n_slots = struct.unpack_from(
+            HEADER_FORMAT, mm, 0
+        )
+        if version != FORMAT_VERSION:
+            mm.close()
+            msg = (
+                f"{path} has format version {version}, "
+                f"we can only read version {FORMAT_VERSION}"
+            )
+            raise ValueError(msg)
+
+        offsets_start = _HEADER_SIZE
+        strings_start = offsets_start + 4 * (n_strings + 1)
+        (strings_size,) = _UINT32.unpack_from(mm, offsets_start + 4 * n_strings)
+        label_table_start = strings_start + strings_size
+
+        n_labels = len(LABELS)
+        n_codes = struct.unpack_from(f"<{n_labels}I", mm, label_table_start)
+        cursor = label_table_start + 4 * n_labels
+        label_ids = struct.unpack_from(f"<{sum(n_codes)}I", mm, cursor)
+        cursor += 4 * sum(n_codes)
+
+        res = cls(
+            path=path,
+            n_records=n_records,
+            mmap=mm,
+            n_slots=n_slots,
+            offsets_start=offsets_start,
+            strings_start=strings_start,
+            labels=(),
+            records_start=cursor,
+            compound_index_start=cursor + _RECORD_SIZE * n_records,
+            key_index_start=cursor + _RECORD_SIZE * n_records + 4 * n_slots,
+        )
+
+        # The label vocabularies are tiny, so we decode them up front
+        labels = []
+        start = 0
+        for n in n_codes:
+            labels.append(
+                tuple(res._get_string(i) for i in label_ids[start : start + n])
+            )
+            start += n
+
+        res._labels = tuple(labels)
+
+        return res
+
+    def close(self) -> None:
+        """
+        Close the memory map
+        """
+        self._mmap.close()
+
+    def _get_string_bytes(self, string_id: int) -> bytes:
+        start, stop = _UINT32_PAIR.unpack_from(
+            self._mmap, self._offsets_start + 4 * string_id
+        )
+
+        return self._mmap[self._strings_start + start : self._strings_start + stop]
+
+    def _get_string(self, string_id: int) -> str:
+        return self._get_string_bytes(string_id).decode()
+
+    def _find(self, key: bytes, index_start: int, field_number: int) -> int | None:
+        # Returns the offset of the record with the given key, if there is one
+        mm = self._mmap
+        unpack_from = _UINT32.unpack_from
+        mask = self._n_slots - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            value: int = unpack_from(mm, index_start + 4 * slot)[0]
+            if not value:
+                return None
+
+            record_start = self._records_start + _RECORD_SIZE * (value - 1)
+            string_id = unpack_from(mm, record_start + 4 * field_number)[0]
+            start, stop = _UINT32_PAIR.unpack_from(
+                mm, self._offsets_start + 4 * string_id
+            )
+            if mm[self._strings_start + start : self._strings_start + stop] == key:
+                return record_start
+
+            slot = (slot + 1) & mask
+
+    def _get_branded_variable(self, record_start: int) -> str:
+        return self._get_string(_UINT32.unpack_from(self._mmap, record_start + 8)[0])
+
+    def get_by_compound_name(self, compound_name: str) -> str | None:
+        """
+        Get the branded variable of a compound name
+
+        Parameters
+        ----------
+        compound_name
+            Compound name (e.g. "Amon.tas")
+
+        Returns
+        -------
+        :
+            Branded variable, `None` if the compound name isn't in the artifact
+        """
+        record_start = self._find(compound_name.encode(), self._compound_index_start, 0)
+        if record_start is None:
+            return None
+
+        return self._get_branded_variable(record_start)
+
+    def get(
+        self, variable_name: str, cell_methods: str | None, dimensions: Sequence[str]
+    ) -> str | None:
+        """
+        Get the branded variable of a record
+
+        Parameters
+        ----------
+        variable_name
+            Variable name
+
+        cell_methods
+            Cell methods
+
+        dimensions
+            Dimensions
+
+        Returns
+        -------
+        :
+            Branded variable, `None` if the record isn't in the artifact
+        """
+        record_start = self._find(
+            make_key(variable_name, cell_methods, dimensions), self._key_index_start, 1
+        )
+        if record_start is None:
+            return None
+
+        return self._get_branded_variable(record_start)
+
+    def get_labels(
+        self, variable_name: str, cell_methods: str | None, dimensions: Sequence[str]
+    ) -> tuple[str, str, str, str] | None:
+        """
+        Get the labels of a record
+
+        Parameters
+        ----------
+        variable_name
+            Variable name
+
+        cell_methods
+            Cell methods
+
+        dimensions
+            Dimensions
+
+        Returns
+        -------
+        :
+            Temporal, vertical, horizontal and area label (in that order),
+            `None` if the record isn't in the artifact
+        """
+        record_start = self._find(
+            make_key(variable_name, cell_methods, dimensions), self._key_index_start, 1
+        )
+        if record_start is None:
+            return None
+
+        codes = struct.unpack_from("<4B", self._mmap, record_start + 12)
+        temporal, vertical, horizontal, area = (
+            labels[code] for labels, code in zip(self._labels, codes)
+        )
+
+        return temporal, vertical, horizontal, area
+
+
+@define
+class ArtifactMapper:
+    """
+    Mapper which looks records up in an artifact, falling back to a live mapper
+    """
+
+    artifact: LookupArtifact
+    """
+    Artifact in which to look records up
+    """
+
+    fallback: Callable[[str, str | None, tuple[str, ...]], str] = (
+        map_to_cmip_branded_variable
+    )
+    """
+    Mapper to use for records which aren't in the artifact
+    """
+
+    def map_to_cmip_branded_variable(
+        self,
+        variable_name: str,
+        cell_methods: str | None,
+        dimensions: tuple[str, ...],
+    ) -> str:
+        """
+        Map CMIP variable information into a branded variable
+
+        Parameters
+        ----------
+        variable_name
+            Variable name
+
+        cell_methods
+            Cell methods associated with the variable
+
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Branded variable
+        """
+        if (
+            res := self.artifact.get(variable_name, cell_methods, dimensions)
+        ) is not None:
+            return res
+
+        return self.fallback(variable_name, cell_methods, dimensions)
@@ -0,0 +1,128 @@
+"""
+Branded variables as records rather than joined strings
+
+A [BrandedVariable][(m).] holds the variable name and each label separately,
+so consumers don't have to split the joined string to get at the labels.
+All its strings are interned.
+There are only a few dozen distinct labels,
+so millions of records share the same handful of label strings
+and each record costs little more than its five references.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from attrs import field, frozen
+
+
+@frozen(weakref_slot=False)
+class BrandedVariable:
+    """
+    Branded variable, split into its components
+
+    [str][] gives the branded variable in the usual format
+    (e.g. `"tas_tavg-h2m-hxy-u"`).
+    """
+
+    variable_name: str = field(converter=sys.intern)
+    """
+    Variable name
+    """
+
+    temporal_label: str = field(converter=sys.intern)
+    """
+    Temporal label
+    """
+
+    vertical_label: str = field(converter=sys.intern)
+    """
+    Vertical label
+    """
+
+    horizontal_label: str = field(converter=sys.intern)
+    """
+    Horizontal label
+    """
+
+    area_label: str = field(converter=sys.intern)
+    """
+    Area label
+    """
+
+    _str: str | None = field(default=None, init=False, repr=False, eq=False, hash=False)
+    """
+    Cache of the branded variable as a string, filled on first use
+    """
+
+    @classmethod
+    def from_string(cls, branded_variable: str) -> BrandedVariable:
+        """
+        Initialise from a branded variable in the usual format
+
+        Parameters
+        ----------
+        branded_variable
+            Branded variable, e.g. `"tas_tavg-h2m-hxy-u"`
+
+        Returns
+        -------
+        :
+            Initialised instance
+
+        Raises
+        ------
+        ValueError
+            `branded_variable` is not of the form
+            `<variable name>_<temporal>-<vertical>-<horizontal>-<area>`
+
+        Examples
+        --------
+        >>> BrandedVariable.from_string("tas_tavg-h2m-hxy-u")
+        BrandedVariable(variable_name='tas', temporal_label='tavg', vertical_label='h2m', horizontal_label='hxy', area_label='u')
+        """  # noqa: E501
+        variable_name, _, suffix = branded_variable.rpartition("_")
+        labels = suffix.split("-")
+        if not variable_name or len(labels) != 4:  # noqa: PLR2004
+            msg = (
+                "branded_variable must be of the form "
+                "'<variable name>_<temporal>-<vertical>-<horizontal>-<area>'. "
+                f"Received {branded_variable=}"
+            )
+            raise ValueError(msg)
+
+        res = cls(variable_name, *labels)
+        object.__setattr__(res, "_str", branded_variable)
+
+        return res
+
+    @property
+    def labels(self) -> tuple[str, str, str, str]:
+        """
+        Temporal, vertical, horizontal and area label (in that order)
+        """
+        return (
+            self.temporal_label,
+            self.vertical_label,
+            self.horizontal_label,
+            self.area_label,
+        )
+
+    @property
+    def suffix(self) -> str:
+        """
+        Suffix of the branded variable, i.e. the labels joined with "-"
+        """
+        return "-".join(self.labels)
+
+    def __str__(self) -> str:
+        """
+        Get the branded variable in the usual format
+        """
+        res = self._str
+        if res is None:
+            res = "_".join([self.variable_name, self.suffix])
+            # Frozen, but the cache isn't part of the value
+            object.__setattr__(self, "_str", res)
+
+        return res
@@ -0,0 +1,281 @@
+"""
+Mapping of many records at once
+
+Catalogues of variables tend to repeat the same combinations
+of cell methods and dimensions over and over
+(e.g. every variable on `pfull`).
+The functions here therefore only derive the labels
+once per unique combination of cell methods and dimensions
+and then broadcast the results back to every record.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from cmip_branded_variable_mapper.dimension_vocabulary import tokenize_dimensions
+from cmip_branded_variable_mapper.mapper import get_labels
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+LABEL_COLUMNS: tuple[str, ...] = (
+    "temporal_label",
+    "vertical_label",
+    "horizontal_label",
+    "area_label",
+)
+"""
+Names of the columns in which each label is returned
+"""
+
+BRANDED_VARIABLE_COLUMN: str = "branded_variable"
+"""
+Name of the column in which the branded variable is returned
+"""
+
+
+def factorize_inputs(
+    cell_methods: Iterable[str | None],
+    dimensions: Iterable[Sequence[str] | str],
+) -> tuple[npt.NDArray[np.intp], list[tuple[str | None, tuple[str, ...]]]]:
+    """
+    Factorize cell methods and dimensions into their unique combinations
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record.
+
+        Strings are split with
+        [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.],
+        as in [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.].
+
+    Returns
+    -------
+    :
+        Code of each record and the unique combinations.
+
+        The code of each record is its index in the unique combinations.
+    """
+    uniques: dict[tuple[str | None, tuple[str, ...]], int] = {}
+    codes_l = [
+        uniques.setdefault(
+            (
+                cm,
+                tokenize_dimensions(dims) if isinstance(dims, str) else tuple(dims),
+            ),
+            len(uniques),
+        )
+        for cm, dims in zip(cell_methods, dimensions)
+    ]
+
+    return np.asarray(codes_l, dtype=np.intp), list(uniques)
+
+
+def map_to_cmip_branded_variables(
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+) -> list[str]:
+    """
+    Map many records of CMIP variable information into branded variables
+
+    Parameters
+    ----------
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    Returns
+    -------
+    :
+        Branded variable of each record
+
+    Raises
+    ------
+    ValueError
+        The inputs are not all the same length
+
+    Examples
+    --------
+    >>> map_to_cmip_branded_variables(
+    ...     variable_names=["tas", "hfds", "pr"],
+    ...     cell_methods=[
+    ...         "area: time: mean",
+    ...         "area: mean where sea time: mean",
+    ...         "area: time: mean",
+    ...     ],
+    ...     dimensions=[
+    ...         ("longitude", "latitude", "time", "height2m"),
+    ...         ("longitude", "latitude", "time"),
+    ...         ("longitude", "latitude", "time"),
+    ...     ],
+    ... )
+    ['tas_tavg-h2m-hxy-u', 'hfds_tavg-u-hxy-sea', 'pr_tavg-u-hxy-u']
+    """
+    if not (len(variable_names) == len(cell_methods) == len(dimensions)):
+        msg = (
+            "variable_names, cell_methods and dimensions must all be the same length. "
+            f"Received {len(variable_names)=}, {len(cell_methods)=} "
+            f"and {len(dimensions)=}"
+        )
+        raise ValueError(msg)
+
+    codes, uniques = factorize_inputs(cell_methods=cell_methods, dimensions=dimensions)
+    suffixes = ["-".join(get_labels(cm, dims)) for cm, dims in uniques]
+
+    return [
+        "_".join([variable_name, suffixes[code]])
+        for variable_name, code in zip(variable_names, codes.tolist())
+    ]
+
+
+def split_dimensions(dimensions: str, separator: str | None) -> tuple[str, ...]:
+    """
+    Split a string of dimensions into a tuple of dimensions
+
+    Parameters
+    ----------
+    dimensions
+        Dimensions, all in one string
+
+    separator
+        Separator between dimensions.
+
+        If `None`, the dimensions are split on whitespace.
+
+    Returns
+    -------
+    :
+        Dimensions, with surrounding whitespace removed
+
+    Examples
+    --------
+    >>> split_dimensions("longitude, latitude, time", separator=",")
+    ('longitude', 'latitude', 'time')
+    >>> split_dimensions("longitude latitude time", separator=None)
+    ('longitude', 'latitude', 'time')
+    """
+    return tuple(d.strip() for d in dimensions.split(separator) if d.strip())
+
+
+def map_dataframe_to_cmip_branded_variables(  # noqa: PLR0913
+    df: pd.DataFrame,
+    variable_name_column: str = "variable_name",
+    cell_methods_column: str = "cell_methods",
+    dimensions_column: str = "dimensions",
+    dimensions_are_strings: bool = False,
+    dimensions_separator: str | None = None,
+) -> pd.DataFrame:
+    """
+    Map a [pd.DataFrame][pandas.DataFrame] of CMIP variable information
+
+    Parameters
+    ----------
+    df
+        Data to map. Each row is one record.
+
+    variable_name_column
+        Column which contains the variable name
+
+    cell_methods_column
+        Column which contains the cell methods
+
+        Missing values (e.g. `NaN`) are treated as `None`.
+
+    dimensions_column
+        Column which contains the dimensions
+
+    dimensions_are_strings
+        Whether the dimensions are stored as strings (e.g. "longitude latitude time")
+        rather than as sequences of strings.
+
+        If `True`, the dimensions are split
+        with [split_dimensions][(m).] using `dimensions_separator`.
+
+    dimensions_separator
+        Separator to use when splitting dimensions.
+
+        Only used if `dimensions_are_strings` is `True`.
+
+    Returns
+    -------
+    :
+        Branded variable and each label for each row in `df`.
+
+        The index is the same as `df`'s index.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> df = pd.DataFrame(
+    ...     {
+    ...         "Physical Parameter": ["tas", "hfds"],
+    ...         "Cell Methods": [
+    ...             "area: time: mean",
+    ...             "area: mean where sea time: mean",
+    ...         ],
+    ...         "Dimensions": [
+    ...             "longitude, latitude, time, height2m",
+    ...             "longitude, latitude, time",
+    ...         ],
+    ...     }
+    ... )
+    >>> res = map_dataframe_to_cmip_branded_variables(
+    ...     df,
+    ...     variable_name_column="Physical Parameter",
+    ...     cell_methods_column="Cell Methods",
+    ...     dimensions_column="Dimensions",
+    ...     dimensions_are_strings=True,
+    ...     dimensions_separator=",",
+    ... )
+    >>> res["branded_variable"].tolist()
+    ['tas_tavg-h2m-hxy-u', 'hfds_tavg-u-hxy-sea']
+    """
+    cell_methods = [
+        None if pd.isna(cm) else cm for cm in df[cell_methods_column].tolist()
+    ]
+    if dimensions_are_strings:
+        dimensions = [
+            split_dimensions(dims, separator=dimensions_separator)
+            for dims in df[dimensions_column].tolist()
+        ]
+    else:
+        dimensions = df[dimensions_column].tolist()
+
+    codes, uniques = factorize_inputs(cell_methods=cell_methods, dimensions=dimensions)
+    unique_labels = np.empty((len(uniques), len(LABEL_COLUMNS)), dtype=object)
+    for i, (cm, dims) in enumerate(uniques):
+        unique_labels[i, :] = get_labels(cm, dims)
+
+    labels = unique_labels[codes, :]
+    suffixes = np.asarray(
+        ["-".join(labels_u) for labels_u in unique_labels.tolist()], dtype=object
+    )[codes]
+
+    res = pd.DataFrame(labels, columns=list(LABEL_COLUMNS), index=df.index)
+    res.insert(
+        0,
+        BRANDED_VARIABLE_COLUMN,
+        [
+            "_".join([variable_name, suffix])
+            for variable_name, suffix in zip(
+                df[variable_name_column].tolist(), suffixes.tolist()
+            )
+        ],
+    )
+
+    return res
@@ -0,0 +1,389 @@
+"""
+Bounded, instrumented memoization of the mapping
+
+Services often map the same handful of combinations over and over.
+[CachedMapper][(m).] wraps
+[map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+and the individual label functions with LRU caches
+whose hits, misses and evictions can be queried and reset.
+
+Caching is opt-in, simply create a [CachedMapper][(m).] and use its methods
+instead of the module-level functions.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Callable, Generic, TypeVar
+
+from attrs import define, field, frozen, validators
+
+from cmip_branded_variable_mapper.area_label import get_area_label
+from cmip_branded_variable_mapper.horizontal_label import get_horizontal_label
+from cmip_branded_variable_mapper.relevance import (
+    LabelRelevance,
+    get_default_relevance,
+)
+from cmip_branded_variable_mapper.temporal_label import get_temporal_label
+from cmip_branded_variable_mapper.vertical_label import get_vertical_label
+
+T = TypeVar("T")
+
+
+@frozen
+class CacheInfo:
+    """
+    Snapshot of the statistics of a cache
+    """
+
+    hits: int
+    """Number of lookups which were found in the cache"""
+
+    misses: int
+    """Number of lookups which were not found in the cache"""
+
+    evictions: int
+    """Number of entries removed to keep the cache within its maximum size"""
+
+    maxsize: int
+    """Maximum number of entries in the cache"""
+
+    currsize: int
+    """Current number of entries in the cache"""
+
+
+@define
+class LRUCache(Generic[T]):
+    """
+    Thread-safe, least-recently-used cache with hit, miss and eviction counters
+    """
+
+    maxsize: int = field(default=4096, validator=validators.ge(1))
+    """
+    Maximum number of entries in the cache
+    """
+
+    hits: int = field(default=0, init=False)
+    """Number of lookups which were found in the cache"""
+
+    misses: int = field(default=0, init=False)
+    """Number of lookups which were not found in the cache"""
+
+    evictions: int = field(default=0, init=False)
+    """Number of entries removed to keep the cache within its maximum size"""
+
+    _data: OrderedDict[Hashable, T] = field(
+        init=False, factory=OrderedDict, eq=False, repr=False
+    )
+
+    _lock: threading.Lock = field(
+        init=False, factory=threading.Lock, eq=False, repr=False
+    )
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        Get a value from the cache, computing (and storing) it if needed
+
+        Parameters
+        ----------
+        key
+            Key of the value
+
+        compute
+            Function which computes the value if it is not in the cache
+
+        Returns
+        -------
+        :
+            Value
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+
+        # Compute outside the lock so other threads aren't blocked.
+        # At worst, two threads compute the same value.
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def info(self) -> CacheInfo:
+        """
+        Get the statistics of the cache
+
+        Returns
+        -------
+        :
+            Snapshot of the cache's statistics
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                maxsize=self.maxsize,
+                currsize=len(self._data),
+            )
+
+    def reset_stats(self) -> None:
+        """
+        Reset the hit, miss and eviction counters to zero
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache and reset its statistics
+        """
+        with self._lock:
+            self._data.clear()
+
+        self.reset_stats()
+
+
+@define
+class CachedMapper:
+    """
+    Mapper which caches the branded variables and labels it derives
+
+    Each function has its own cache, each with the same maximum size.
+    On a miss, [map_to_cmip_branded_variable][(c).]
+    uses the (cached) label methods,
+    so e.g. two variables with the same cell methods and dimensions
+    share the label cache entries.
+
+    Before being used as keys, the inputs are projected
+    onto the inputs which can actually change the result
+    (see [relevance][(c).]).
+    As a result, lists, tuples and strings of dimensions share entries,
+    as do records which only differ in dimensions
+    which don't affect the labels.
+    Similarly, the temporal and area labels are cached on the clauses
+    of the cell methods which they actually read,
+    so e.g. "area: mean where sea time: mean" and "area: mean where sea"
+    share an area label entry.
+
+    Examples
+    --------
+    >>> mapper = CachedMapper(maxsize=128)
+    >>> for _ in range(3):
+    ...     res = mapper.map_to_cmip_branded_variable(
+    ...         variable_name="tas",
+    ...         cell_methods="area: time: mean",
+    ...         dimensions=["longitude", "latitude", "time", "height2m"],
+    ...     )
+    >>> res
+    'tas_tavg-h2m-hxy-u'
+    >>> mapper.cache_info()["map_to_cmip_branded_variable"]
+    CacheInfo(hits=2, misses=1, evictions=0, maxsize=128, currsize=1)
+    """
+
+    maxsize: int = field(default=4096, validator=validators.ge(1))
+    """
+    Maximum number of entries in each cache
+    """
+
+    relevance: dict[str, LabelRelevance] = field(factory=get_default_relevance)
+    """
+    Inputs which can change each label (and the branded variable)
+
+    Keyed by label name (plus `"branded_variable"`),
+    see [get_default_relevance][cmip_branded_variable_mapper.relevance.].
+    """
+
+    caches: dict[str, LRUCache[str]] = field(init=False)
+    """
+    Cache used by each method, keyed by the method's name
+    """
+
+    @caches.default
+    def _caches_default(self) -> dict[str, LRUCache[str]]:
+        return {
+            name: LRUCache(maxsize=self.maxsize)
+            for name in (
+                "map_to_cmip_branded_variable",
+                "get_temporal_label",
+                "get_vertical_label",
+                "get_horizontal_label",
+                "get_area_label",
+            )
+        }
+
+    def map_to_cmip_branded_variable(
+        self,
+        variable_name: str,
+        cell_methods: str | None,
+        dimensions: Sequence[str] | str,
+    ) -> str:
+        """
+        Map CMIP variable information into a branded variable, with caching
+
+        See [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+        for details of the parameters.
+
+        Parameters
+        ----------
+        variable_name
+            Variable name
+
+        cell_methods
+            Cell methods associated with the variable
+
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Branded variable
+        """
+        relevance = self.relevance["branded_variable"]
+        cell_methods_n = relevance.project_cell_methods(cell_methods)
+        dimensions_n = relevance.project_dimensions(dimensions)
+
+        def compute() -> str:
+            suffix = "-".join(
+                [
+                    self.get_temporal_label(cell_methods_n, dimensions_n),
+                    self.get_vertical_label(dimensions_n),
+                    self.get_horizontal_label(dimensions_n),
+                    self.get_area_label(cell_methods_n),
+                ]
+            )
+
+            return "_".join([variable_name, suffix])
+
+        return self.caches["map_to_cmip_branded_variable"].get_or_compute(
+            (variable_name, cell_methods_n, dimensions_n), compute
+        )
+
+    def get_temporal_label(
+        self, cell_methods: str | None, dimensions: Sequence[str] | str
+    ) -> str:
+        """
+        Get temporal label, with caching
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods of the variable
+
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Temporal label
+        """
+        relevance = self.relevance["temporal_label"]
+        cell_methods_n = relevance.project_cell_methods(cell_methods)
+        dimensions_n = relevance.project_dimensions(dimensions)
+
+        return self.caches["get_temporal_label"].get_or_compute(
+            (cell_methods_n, dimensions_n),
+            lambda: get_temporal_label(cell_methods_n, dimensions_n),
+        )
+
+    def get_vertical_label(self, dimensions: Sequence[str] | str) -> str:
+        """
+        Get vertical label, with caching
+
+        Parameters
+        ----------
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Vertical label
+        """
+        dimensions_n = self.relevance["vertical_label"].project_dimensions(dimensions)
+
+        return self.caches["get_vertical_label"].get_or_compute(
+            dimensions_n, lambda: get_vertical_label(dimensions_n)
+        )
+
+    def get_horizontal_label(self, dimensions: Sequence[str] | str) -> str:
+        """
+        Get horizontal label, with caching
+
+        Parameters
+        ----------
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Horizontal label
+        """
+        dimensions_n = self.relevance["horizontal_label"].project_dimensions(dimensions)
+
+        return self.caches["get_horizontal_label"].get_or_compute(
+            dimensions_n, lambda: get_horizontal_label(dimensions_n)
+        )
+
+    def get_area_label(self, cell_methods: str | None) -> str:
+        """
+        Get area label, with caching
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods of the variable
+
+        Returns
+        -------
+        :
+            Area label
+        """
+        cell_methods_n = self.relevance["area_label"].project_cell_methods(cell_methods)
+
+        return self.caches["get_area_label"].get_or_compute(
+            cell_methods_n, lambda: get_area_label(cell_methods_n)
+        )
+
+    def cache_info(self) -> dict[str, CacheInfo]:
+        """
+        Get the statistics of each cache
+
+        Returns
+        -------
+        :
+            Statistics of each cache, keyed by method name
+        """
+        return {name: cache.info() for name, cache in self.caches.items()}
+
+    def reset_stats(self) -> None:
+        """
+        Reset the hit, miss and eviction counters of every cache
+        """
+        for cache in self.caches.values():
+            cache.reset_stats()
+
+    def cache_clear(self) -> None:
+        """
+        Clear every cache (and reset its statistics)
+        """
+        for cache in self.caches.values():
+            cache.clear()
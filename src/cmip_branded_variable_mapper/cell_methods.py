@@ -0,0 +1,307 @@
+"""
+Parsing of CF cell methods
+
+The labels only care about small parts of the cell methods
+(e.g. the area label only cares about the values of the qualifiers,
+like `where sea`, and the comments).
+Parsing the cell methods once into their components
+means that each label only has to look at the parts it needs,
+rather than scanning the full string.
+
+For the syntax of cell methods, see the
+[CF conventions](https://cfconventions.org/Data/cf-conventions/cf-conventions-1.12/cf-conventions.html#cell-methods).
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+
+from attrs import field, frozen
+
+CELL_METHODS_TOKEN_PATTERN = re.compile(r"\([^()]*\)|[^\s()]+")
+"""
+Pattern used to split cell methods into tokens
+
+A token is either a parenthesised comment or a run of non-whitespace characters.
+"""
+
+CELL_METHODS_NAME_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+"""
+Pattern which axis names and methods must match
+"""
+
+CELL_METHODS_QUALIFIERS = ("where", "over", "within")
+"""
+Keywords which introduce a qualifier of a cell method
+"""
+
+
+class CellMethodsParseError(ValueError):
+    """
+    Raised when cell methods cannot be parsed
+    """
+
+    def __init__(self, cell_methods: str, reason: str) -> None:
+        """
+        Initialise the error
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods which could not be parsed
+
+        reason
+            Reason the cell methods could not be parsed
+        """
+        super().__init__(f"Could not parse {cell_methods=!r}. {reason}")
+
+
+@frozen
+class CellMethod:
+    """
+    A single cell method, e.g. `area: mean where sea`
+    """
+
+    axes: tuple[str, ...]
+    """
+    Axes (names) to which the method applies, without the trailing colon
+    """
+
+    method: str
+    """
+    Method, e.g. "mean"
+    """
+
+    where: str | None = None
+    """
+    Type given by the `where` clause, if any
+    """
+
+    over: str | None = None
+    """
+    Type or interval given by the `over` clause, if any
+
+    This is either the second part of a `where ... over ...` clause
+    or the interval of a climatological `over` clause.
+    """
+
+    within: str | None = None
+    """
+    Interval given by the `within` clause, if any
+    """
+
+    comments: tuple[str, ...] = ()
+    """
+    Contents of any parenthesised comments, without the parentheses
+    """
+
+    def __str__(self) -> str:
+        """
+        Get the canonical string representation of the cell method
+        """
+        parts = [*(f"{axis}:" for axis in self.axes), self.method]
+        for qualifier in CELL_METHODS_QUALIFIERS:
+            if (value := getattr(self, qualifier)) is not None:
+                parts.extend([qualifier, value])
+
+        parts.extend(f"({comment})" for comment in self.comments)
+
+        return " ".join(parts)
+
+
+@frozen
+class ParsedCellMethods:
+    """
+    Cell methods, parsed into their components
+    """
+
+    methods: tuple[CellMethod, ...]
+    """
+    Individual cell methods, in the order in which they appear
+    """
+
+    temporal_text: str = field(init=False)
+    """
+    The parts of the cell methods which can affect the temporal label
+
+    This is the cell method of each method which applies to time,
+    written as `time: <method>` (e.g. `time: maximum`).
+    """
+
+    area_text: str = field(init=False)
+    """
+    The parts of the cell methods which can affect the area label
+
+    This is the value of every qualifier (`where`, `over` and `within`,
+    e.g. `snow`, `sea_ice` and `sector`) and every comment,
+    separated by `" | "`.
+    The area label's sub-strings only ever match these values,
+    never the axis names, methods or qualifier keywords.
+    """
+
+    @temporal_text.default
+    def _temporal_text_default(self) -> str:
+        return " ".join(f"time: {m.method}" for m in self.methods if "time" in m.axes)
+
+    @area_text.default
+    def _area_text_default(self) -> str:
+        return " | ".join(
+            [
+                *(
+                    value
+                    for m in self.methods
+                    for qualifier in CELL_METHODS_QUALIFIERS
+                    if (value := getattr(m, qualifier)) is not None
+                ),
+                *(c for m in self.methods for c in m.comments),
+            ]
+        )
+
+    def __str__(self) -> str:
+        """
+        Get the canonical string representation of the cell methods
+        """
+        return " ".join(str(m) for m in self.methods)
+
+
+def parse_cell_methods(cell_methods: str) -> ParsedCellMethods:
+    """
+    Parse cell methods
+
+    The results are cached.
+    Cell methods which only differ in their whitespace
+    share the same (cached) result.
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods to parse
+
+    Returns
+    -------
+    :
+        Parsed cell methods
+
+    Raises
+    ------
+    CellMethodsParseError
+        The cell methods could not be parsed
+
+    Examples
+    --------
+    >>> parsed = parse_cell_methods("area: mean where sea time: mean")
+    >>> parsed.methods[0]
+    CellMethod(axes=('area',), method='mean', where='sea', over=None, within=None, comments=())
+    >>> parsed.temporal_text
+    'time: mean'
+    >>> parsed.area_text
+    'sea'
+    >>> str(parse_cell_methods("area:   time: mean  (comment:  mask=siconc)"))
+    'area: time: mean (comment: mask=siconc)'
+    """  # noqa: E501
+    return _parse_canonical_cell_methods(" ".join(cell_methods.split()))
+
+
+def _check_name(cell_methods: str, name: str, kind: str) -> str:
+    if not CELL_METHODS_NAME_PATTERN.fullmatch(name):
+        raise CellMethodsParseError(cell_methods, f"Invalid {kind} {name!r}.")
+
+    return name
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_canonical_cell_methods(cell_methods: str) -> ParsedCellMethods:
+    tokens = CELL_METHODS_TOKEN_PATTERN.findall(cell_methods)
+    if "".join(tokens).replace(" ", "") != cell_methods.replace(" ", ""):
+        raise CellMethodsParseError(cell_methods, "Unbalanced parentheses.")
+
+    methods = []
+    i = 0
+    while i < len(tokens):
+        axes = []
+        while i < len(tokens) and tokens[i].endswith(":"):
+            axes.append(_check_name(cell_methods, tokens[i][:-1], "axis name"))
+            i += 1
+
+        if not axes:
+            raise CellMethodsParseError(
+                cell_methods, f"Expected an axis name, found {tokens[i]!r}."
+            )
+
+        if i >= len(tokens) or tokens[i].startswith("("):
+            raise CellMethodsParseError(
+                cell_methods, f"No method given for axes {axes!r}."
+            )
+
+        method = _check_name(cell_methods, tokens[i], "method")
+        i += 1
+
+        qualifiers: dict[str, str] = {}
+        comments = []
+        while i < len(tokens) and not tokens[i].endswith(":"):
+            token = tokens[i]
+            if token.startswith("("):
+                comments.append(" ".join(token[1:-1].split()))
+                i += 1
+            elif token in CELL_METHODS_QUALIFIERS:
+                if i + 1 >= len(tokens) or tokens[i + 1].endswith(":"):
+                    raise CellMethodsParseError(
+                        cell_methods, f"No value given for {token!r}."
+                    )
+
+                if token in qualifiers:
+                    raise CellMethodsParseError(
+                        cell_methods, f"{token!r} given more than once."
+                    )
+
+                qualifiers[token] = tokens[i + 1]
+                i += 2
+            else:
+                raise CellMethodsParseError(
+                    cell_methods, f"Unexpected token {token!r}."
+                )
+
+        methods.append(
+            CellMethod(
+                axes=tuple(axes),
+                method=method,
+                comments=tuple(comments),
+                **qualifiers,
+            )
+        )
+
+    return ParsedCellMethods(methods=tuple(methods))
+
+
+def parse_cell_methods_if_possible(
+    cell_methods: str | None,
+) -> str | ParsedCellMethods | None:
+    """
+    Parse cell methods, falling back to the raw value if they can't be parsed
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods to parse
+
+    Returns
+    -------
+    :
+        Parsed cell methods if `cell_methods` is a string which can be parsed,
+        otherwise `cell_methods` itself.
+
+    Examples
+    --------
+    >>> parse_cell_methods_if_possible("time: mean").temporal_text
+    'time: mean'
+    >>> parse_cell_methods_if_possible('"time: mean"')
+    '"time: mean"'
+    """
+    if isinstance(cell_methods, str):
+        try:
+            return parse_cell_methods(cell_methods)
+        except CellMethodsParseError:
+            pass
+
+    return cell_methods
@@ -0,0 +1,450 @@
+r"""
+Command-line interface
+
+Records are streamed one at a time,
+so memory use does not grow with the size of the input.
+For example, to add branded variables to our test data
+
+```sh
+cmip-branded-variable-mapper tests/test-data/CMIP7-variables-for-branding.csv \
+    --variable-name-column "Physical Parameter" \
+    --cell-methods-column "Cell Methods" \
+    --dimensions-column "Dimensions"
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import warnings
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal, TextIO
+
+from cmip_branded_variable_mapper.compiled import compile_mapper
+from cmip_branded_variable_mapper.dimension_vocabulary import tokenize_dimensions
+
+FORMATS = ("csv", "jsonl")
+"""
+Supported input and output formats
+"""
+
+_FORMAT_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class MissingColumnError(KeyError):
+    """
+    Raised when a record does not have a column we need
+    """
+
+    def __init__(self, column: str, record_number: int) -> None:
+        """
+        Initialise the error
+
+        Parameters
+        ----------
+        column
+            Column which is missing
+
+        record_number
+            Number of the record (starting from 1) which is missing the column
+        """
+        super().__init__(f"Record {record_number} has no {column!r} column")
+
+
+class InvalidRecordError(ValueError):
+    """
+    Raised when a line of the input is not a valid record
+    """
+
+    def __init__(self, line_number: int, reason: str) -> None:
+        """
+        Initialise the error
+
+        Parameters
+        ----------
+        line_number
+            Number of the line (starting from 1) which is not a valid record
+
+        reason
+            Reason the line is not a valid record
+        """
+        super().__init__(f"Line {line_number} is not a valid record. {reason}")
+
+
+def infer_format(path: str | None, default: str = "csv") -> str:
+    """
+    Infer the format of a file from its suffix
+
+    Parameters
+    ----------
+    path
+        Path to the file.
+
+        `None` or `"-"` means standard input/output.
+
+    default
+        Format to use if the format cannot be inferred
+
+    Returns
+    -------
+    :
+        Format of the file
+
+    Examples
+    --------
+    >>> infer_format("archive.jsonl")
+    'jsonl'
+    >>> infer_format("-")
+    'csv'
+    """
+    if path is None or path == "-":
+        return default
+
+    for suffix, fmt in _FORMAT_SUFFIXES.items():
+        if path.endswith(suffix):
+            return fmt
+
+    return default
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[dict[str, Any]]:
+    """
+    Iterate over the records in a stream
+
+    Parameters
+    ----------
+    stream
+        Stream to read from
+
+    fmt
+        Format of the stream
+
+    Yields
+    ------
+    :
+        Records, one at a time
+
+    Raises
+    ------
+    InvalidRecordError
+        A line of JSON lines input is not a JSON object
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise InvalidRecordError(line_number, str(exc)) from exc
+
+            if not isinstance(record, dict):
+                raise InvalidRecordError(
+                    line_number, f"Expected a JSON object, found {line.strip()!r}"
+                )
+
+            yield record
+
+
+def get_dimensions(
+    value: str | Sequence[str], separator: str | None
+) -> tuple[str, ...]:
+    """
+    Get dimensions from the value in a record
+
+    Parameters
+    ----------
+    value
+        Value in the record.
+
+        This is either a string or (in the case of JSON lines input)
+        a list of dimensions.
+
+    separator
+        Separator between dimensions in strings.
+
+        If `None`, strings are split with
+        [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+
+    Returns
+    -------
+    :
+        Dimensions, with surrounding whitespace removed
+        (as in [split_dimensions][cmip_branded_variable_mapper.bulk.])
+
+    Examples
+    --------
+    >>> get_dimensions("longitude, latitude, time", separator=",")
+    ('longitude', 'latitude', 'time')
+    >>> get_dimensions("longitude latitude time", separator=None)
+    ('longitude', 'latitude', 'time')
+    """
+    if not isinstance(value, str):
+        return tuple(value)
+
+    if separator is None:
+        return tokenize_dimensions(value)
+
+    return tuple(d.strip() for d in value.split(separator) if d.strip())
+
+
+def map_records(  # noqa: PLR0913
+    records: Iterator[dict[str, Any]],
+    variable_name_column: str = "variable_name",
+    cell_methods_column: str = "cell_methods",
+    dimensions_column: str = "dimensions",
+    dimensions_separator: str | None = None,
+    branded_variable_column: str = "branded_variable",
+) -> Iterator[dict[str, Any]]:
+    """
+    Add the branded variable to each record
+
+    Parameters
+    ----------
+    records
+        Records to map
+
+    variable_name_column
+        Column which contains the variable name
+
+    cell_methods_column
+        Column which contains the cell methods
+
+        Empty cell methods are treated as no cell methods.
+
+    dimensions_column
+        Column which contains the dimensions
+
+    dimensions_separator
+        Separator between dimensions, passed to [get_dimensions][(m).]
+
+    branded_variable_column
+        Column in which to write the branded variable
+
+    Yields
+    ------
+    :
+        Records, with the branded variable added
+
+    Raises
+    ------
+    MissingColumnError
+        A record does not have one of the columns we need
+    """
+    map_to_cmip_branded_variable = compile_mapper().map_to_cmip_branded_variable
+
+    for i, record in enumerate(records, start=1):
+        try:
+            variable_name = record[variable_name_column]
+            cell_methods = record[cell_methods_column]
+            dimensions = record[dimensions_column]
+        except KeyError as exc:
+            raise MissingColumnError(exc.args[0], record_number=i) from exc
+
+        record[branded_variable_column] = map_to_cmip_branded_variable(
+            variable_name,
+            cell_methods or None,
+            get_dimensions(dimensions, separator=dimensions_separator),
+        )
+
+        yield record
+
+
+def write_records(records: Iterator[dict[str, Any]], stream: TextIO, fmt: str) -> None:
+    """
+    Write records to a stream
+
+    Parameters
+    ----------
+    records
+        Records to write
+
+    stream
+        Stream to write to
+
+    fmt
+        Format to write in.
+
+        CSV output has the columns of the first record
+        (the records are streamed, so later records can't add columns).
+        Columns which are missing from later records are left empty.
+        Columns which aren't in the first record are dropped, with a warning.
+        Write JSON lines to keep every column.
+    """
+    if fmt == "csv":
+        writer: csv.DictWriter[str] | None = None
+        fieldnames: set[str] = set()
+        warned = False
+        for record_number, record in enumerate(records, start=1):
+            if writer is None:
+                fieldnames = set(record)
+                writer = csv.DictWriter(
+                    stream, fieldnames=list(record), restval="", extrasaction="ignore"
+                )
+                writer.writeheader()
+
+            elif not warned and not fieldnames.issuperset(record):
+                extra = [k for k in record if k not in fieldnames]
+                warnings.warn(
+                    f"Record {record_number} has columns "
+                    f"which aren't in the first record: {extra!r}. "
+                    "These aren't written to the CSV output "
+                    "(here or in any later records).",
+                    stacklevel=2,
+                )
+                warned = True
+
+            writer.writerow(record)
+
+    else:
+        for record in records:
+            stream.write(json.dumps(record))
+            stream.write("\n")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Get the parser of the command-line arguments
+
+    Returns
+    -------
+    :
+        Parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="cmip-branded-variable-mapper",
+        description=(
+            "Add branded variables to a catalogue of variables. "
+            "Records are streamed, so inputs of any size can be processed."
+        ),
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="File to read (default: standard input)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="File to write (default: standard output)",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=FORMATS,
+        help="Format of the input (default: inferred from the suffix, else csv)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS,
+        help="Format of the output (default: the same as the input)",
+    )
+    parser.add_argument("--variable-name-column", default="variable_name")
+    parser.add_argument("--cell-methods-column", default="cell_methods")
+    parser.add_argument("--dimensions-column", default="dimensions")
+    parser.add_argument(
+        "--dimensions-separator",
+        help="Separator between dimensions (default: whitespace and/or commas)",
+    )
+    parser.add_argument("--branded-variable-column", default="branded_variable")
+
+    return parser
+
+
+@contextlib.contextmanager
+def open_stream(
+    path: str, mode: Literal["r", "w"], default: TextIO
+) -> Iterator[TextIO]:
+    """
+    Open a file for streaming records, with `"-"` meaning a standard stream
+
+    Parameters
+    ----------
+    path
+        Path to open, or `"-"` to use `default`
+
+    mode
+        Mode in which to open the file
+
+    default
+        Stream to use if `path` is `"-"` (e.g. [sys.stdin][]).
+
+        This is not closed on exit.
+
+    Yields
+    ------
+    :
+        Opened file (or `default`)
+    """
+    if path == "-":
+        yield default
+
+    else:
+        with open(path, mode, newline="", encoding="utf-8") as fh:
+            yield fh
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the command-line interface
+
+    Parameters
+    ----------
+    argv
+        Command-line arguments.
+
+        If not supplied, `sys.argv[1:]` is used.
+
+    Returns
+    -------
+    :
+        Exit code
+    """
+    args = get_parser().parse_args(argv)
+
+    input_format = args.input_format or infer_format(args.input)
+    output_format = args.output_format or infer_format(
+        args.output, default=input_format
+    )
+
+    with contextlib.ExitStack() as stack:
+        fh_in = stack.enter_context(open_stream(args.input, "r", sys.stdin))
+        fh_out = stack.enter_context(open_stream(args.output, "w", sys.stdout))
+        records = map_records(
+            iter_records(fh_in, input_format),
+            variable_name_column=args.variable_name_column,
+            cell_methods_column=args.cell_methods_column,
+            dimensions_column=args.dimensions_column,
+            dimensions_separator=args.dimensions_separator,
+            branded_variable_column=args.branded_variable_column,
+        )
+        try:
+            write_records(records, fh_out, output_format)
+        except MissingColumnError as exc:
+            print(f"error: {exc.args[0]}", file=sys.stderr)
+            return 1
+        except InvalidRecordError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # Whatever we were writing to stopped reading (e.g. `head`).
+            # Point stdout at devnull so Python doesn't complain on exit.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+"""
+Columnar (vectorised) mapping of many records at once
+
+The labels are computed with array operations
+over a boolean dimension-presence matrix
+rather than one record at a time.
+Each label is held as integer codes into a small array of categories
+(there are only a handful of distinct values for each label),
+so the results can be returned as [pd.Categorical][pandas.Categorical]
+without creating a Python string per record.
+
+This uses the default mappers
+(e.g. [VERTICAL_LABEL_DIMENSIONS_MAPPER][cmip_branded_variable_mapper.vertical_label.])
+and gives the same results as
+[map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.].
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from cmip_branded_variable_mapper.area_label import AREA_LABEL_CELL_METHODS_MAPPER
+from cmip_branded_variable_mapper.bulk import BRANDED_VARIABLE_COLUMN, LABEL_COLUMNS
+from cmip_branded_variable_mapper.cell_methods import (
+    ParsedCellMethods,
+    parse_cell_methods_if_possible,
+)
+from cmip_branded_variable_mapper.dimension_vocabulary import tokenize_dimensions
+from cmip_branded_variable_mapper.horizontal_label import HORIZONTAL_LABEL_DIMENSIONS
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapper,
+    CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+    TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER,
+    TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+)
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+PRESENCE_MATRIX_COLUMNS: tuple[str, ...] = tuple(
+    dict.fromkeys(
+        (
+            *TEMPORAL_LABEL_DIMENSIONS_MAPPER.dimension_map,
+            "time",
+            "time4",
+            *VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map,
+            *HORIZONTAL_LABEL_DIMENSIONS,
+        )
+    )
+)
+"""
+Columns of the dimension-presence matrix
+
+These are all the dimensions which can affect any label.
+"""
+
+_COLUMN_INDEX = {dimension: i for i, dimension in enumerate(PRESENCE_MATRIX_COLUMNS)}
+
+
+def factorize(
+    values: Sequence[Any],
+) -> tuple[npt.NDArray[np.intp], list[Any]]:
+    """
+    Factorize values into codes and unique values
+
+    Unlike calling [pd.factorize][pandas.factorize] directly,
+    this supports tuples as values
+    and keeps missing values (`None`, `NaN`) as `None`
+    rather than giving them a sentinel code.
+
+    Parameters
+    ----------
+    values
+        Values to factorize
+
+    Returns
+    -------
+    :
+        Code of each value and the unique values
+    """
+    if isinstance(values, (np.ndarray, pd.Series)) and values.dtype != object:
+        values_arr: npt.NDArray[Any] | pd.Series[Any] = values
+    else:
+        values_arr = np.empty(len(values), dtype=object)
+        # Assign element-wise so tuples aren't turned into extra dimensions
+        values_arr[:] = values
+
+    try:
+        codes, uniques = pd.factorize(values_arr, use_na_sentinel=False)
+    except TypeError:
+        # Unhashable values (e.g. lists of dimensions)
+        values_arr = np.empty(len(values), dtype=object)
+        values_arr[:] = [tuple(v) if isinstance(v, list) else v for v in values]
+        codes, uniques = pd.factorize(values_arr, use_na_sentinel=False)
+
+    return codes.astype(np.intp, copy=False), [
+        None if pd.api.types.is_scalar(u) and pd.isna(u) else u for u in uniques
+    ]
+
+
+def get_presence_matrix(
+    dimensions: Sequence[Sequence[str] | str],
+) -> npt.NDArray[np.bool_]:
+    """
+    Get the dimension-presence matrix
+
+    Parameters
+    ----------
+    dimensions
+        Dimensions of each record.
+
+        Strings are split with
+        [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+
+    Returns
+    -------
+    :
+        Boolean matrix of shape `(len(dimensions), len(PRESENCE_MATRIX_COLUMNS))`.
+
+        Element `[i, j]` is `True` if record `i`
+        has dimension `PRESENCE_MATRIX_COLUMNS[j]`.
+    """
+    presence = np.zeros((len(dimensions), len(PRESENCE_MATRIX_COLUMNS)), dtype=bool)
+    for i, dims in enumerate(dimensions):
+        if isinstance(dims, str):
+            dims = tokenize_dimensions(dims)  # noqa: PLW2901
+
+        cols = [_COLUMN_INDEX[d] for d in dims if d in _COLUMN_INDEX]
+        presence[i, cols] = True
+
+    return presence
+
+
+def _get_dimension_mapper_codes(
+    presence: npt.NDArray[np.bool_],
+    mapper: DimensionMapper,
+    categories: list[str],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]:
+    # Columns are in priority order, so argmax gives the best present dimension
+    sub_matrix = presence[:, [_COLUMN_INDEX[d] for d in mapper.dimension_map]]
+    value_codes = np.array(
+        [categories.index(v) for v in mapper.dimension_map.values()], dtype=np.intp
+    )
+    matched: npt.NDArray[np.bool_] = np.logical_or.reduce(sub_matrix, axis=1)
+    codes: npt.NDArray[np.intp] = value_codes[sub_matrix.argmax(axis=1)]
+
+    return codes, matched
+
+
+def _get_cell_methods_codes(
+    cell_methods: list[str | None],
+    mapper: CellMethodsSubStringMapper | CellMethodsSubStringMapperOrdered,
+    categories: list[str],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.bool_]]:
+    matches = [None if cm is None else mapper.get_value(cm) for cm in cell_methods]
+    codes = np.array(
+        [0 if m is None else categories.index(m) for m in matches], dtype=np.intp
+    )
+    matched = np.array([m is not None for m in matches], dtype=bool)
+
+    return codes, matched
+
+
+def _get_categories(*values: object) -> list[str]:
+    return list(dict.fromkeys(v for v in values if isinstance(v, str)))
+
+
+def get_labels_columnar(
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+) -> dict[str, pd.Categorical]:
+    """
+    Get all the labels for many records
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    Returns
+    -------
+    :
+        Each label for each record, keyed by label name
+        (see [LABEL_COLUMNS][cmip_branded_variable_mapper.bulk.]).
+    """
+    cm_codes, cm_uniques = factorize(cell_methods)
+    dims_codes, dims_uniques = factorize(dimensions)
+
+    # The labels only look at the relevant clauses of the cell methods,
+    # exactly as in the scalar mapper
+    cm_parsed = [parse_cell_methods_if_possible(cm) for cm in cm_uniques]
+    cm_temporal = [
+        cm.temporal_text if isinstance(cm, ParsedCellMethods) else cm
+        for cm in cm_parsed
+    ]
+    cm_area = [
+        cm.area_text if isinstance(cm, ParsedCellMethods) else cm for cm in cm_parsed
+    ]
+
+    presence = get_presence_matrix([d or () for d in dims_uniques])
+    time_present = presence[:, _COLUMN_INDEX["time"]][dims_codes]
+    time4_present = presence[:, _COLUMN_INDEX["time4"]][dims_codes]
+
+    # Temporal label (Table F1)
+    temporal_categories = _get_categories(
+        *TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER.sub_string_map.values(),
+        *TEMPORAL_LABEL_DIMENSIONS_MAPPER.dimension_map.values(),
+        *TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER.sub_string_map.values(),
+        "ti",
+    )
+    initial_codes, initial_matched = _get_cell_methods_codes(
+        cm_temporal,
+        TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+        temporal_categories,
+    )
+    time4_codes, time4_matched = _get_cell_methods_codes(
+        cm_temporal,
+        TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER,
+        temporal_categories,
+    )
+    temporal_dims_codes, temporal_dims_matched = _get_dimension_mapper_codes(
+        presence, TEMPORAL_LABEL_DIMENSIONS_MAPPER, temporal_categories
+    )
+    temporal_codes = np.select(
+        [
+            initial_matched[cm_codes] & time_present,
+            temporal_dims_matched[dims_codes],
+            time4_matched[cm_codes] & time4_present,
+        ],
+        [
+            initial_codes[cm_codes],
+            temporal_dims_codes[dims_codes],
+            time4_codes[cm_codes],
+        ],
+        default=temporal_categories.index("ti"),
+    )
+
+    # Vertical label (Table F2)
+    vertical_categories = _get_categories(
+        *VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map.values(), "u"
+    )
+    vertical_dims_codes, vertical_dims_matched = _get_dimension_mapper_codes(
+        presence, VERTICAL_LABEL_DIMENSIONS_MAPPER, vertical_categories
+    )
+    vertical_codes = np.where(
+        vertical_dims_matched, vertical_dims_codes, vertical_categories.index("u")
+    )[dims_codes]
+
+    # Horizontal label (Table F3)
+    def present(dimension: str) -> npt.NDArray[np.bool_]:
+        return presence[:, _COLUMN_INDEX[dimension]]
+
+    horizontal_categories = ["hxy", "hy", "hs", "hyb", "ht", "hm"]
+    horizontal_codes = np.select(
+        [
+            (present("longitude") & present("latitude"))
+            | (present("xant") & present("yant"))
+            | (present("xgre") & present("ygre")),
+            present("latitude") & ~(present("longitude") | present("basin")),
+            present("site"),
+            present("latitude") & present("basin"),
+            present("oline")
+            | present("siline")
+            | (present("gridlatitude") & present("basin")),
+        ],
+        [0, 1, 2, 3, 4],
+        default=5,
+    )[dims_codes]
+
+    # Area label (Table F4)
+    area_categories = _get_categories(
+        *(v for _, v in AREA_LABEL_CELL_METHODS_MAPPER.sub_string_map), "u"
+    )
+    area_cm_codes, area_cm_matched = _get_cell_methods_codes(
+        cm_area, AREA_LABEL_CELL_METHODS_MAPPER, area_categories
+    )
+    area_codes = np.where(area_cm_matched, area_cm_codes, area_categories.index("u"))[
+        cm_codes
+    ]
+
+    return {
+        label: pd.Categorical.from_codes(codes, categories=categories)
+        for label, codes, categories in (
+            (LABEL_COLUMNS[0], temporal_codes, temporal_categories),
+            (LABEL_COLUMNS[1], vertical_codes, vertical_categories),
+            (LABEL_COLUMNS[2], horizontal_codes, horizontal_categories),
+            (LABEL_COLUMNS[3], area_codes, area_categories),
+        )
+    }
+
+
+def map_to_cmip_branded_variables_columnar(
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+) -> pd.DataFrame:
+    """
+    Map many records of CMIP variable information into branded variables
+
+    Parameters
+    ----------
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record.
+
+        Strings are split with
+        [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+
+    Returns
+    -------
+    :
+        Branded variable and each label for each record.
+
+        All columns are categoricals,
+        so no Python string is created per record.
+
+    Raises
+    ------
+    ValueError
+        The inputs are not all the same length
+
+    Examples
+    --------
+    >>> res = map_to_cmip_branded_variables_columnar(
+    ...     variable_names=["tas", "hfds"],
+    ...     cell_methods=["area: time: mean", "area: mean where sea time: mean"],
+    ...     dimensions=["longitude latitude time height2m", "longitude latitude time"],
+    ... )
+    >>> res["branded_variable"].tolist()
+    ['tas_tavg-h2m-hxy-u', 'hfds_tavg-u-hxy-sea']
+    """
+    if not (len(variable_names) == len(cell_methods) == len(dimensions)):
+        msg = (
+            "variable_names, cell_methods and dimensions must all be the same length. "
+            f"Received {len(variable_names)=}, {len(cell_methods)=} "
+            f"and {len(dimensions)=}"
+        )
+        raise ValueError(msg)
+
+    labels = get_labels_columnar(cell_methods=cell_methods, dimensions=dimensions)
+    variable_name_codes, variable_name_uniques = factorize(variable_names)
+
+    # Build each branded variable once per unique combination
+    # of variable name and labels
+    combined = variable_name_codes.astype(np.int64)
+    for label in LABEL_COLUMNS:
+        combined = combined * len(labels[label].categories) + labels[label].codes
+
+    _, first_occurence, branded_variable_codes = np.unique(
+        combined, return_index=True, return_inverse=True
+    )
+    branded_variables = [
+        "_".join(
+            [
+                variable_name_uniques[variable_name_codes[i]],
+                "-".join(
+                    labels[label].categories[labels[label].codes[i]]
+                    for label in LABEL_COLUMNS
+                ),
+            ]
+        )
+        for i in first_occurence.tolist()
+    ]
+
+    return pd.DataFrame(
+        {
+            BRANDED_VARIABLE_COLUMN: pd.Categorical.from_codes(
+                branded_variable_codes.reshape(-1), categories=branded_variables
+            ),
+            **labels,
+        }
+    )
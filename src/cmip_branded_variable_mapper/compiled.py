@@ -0,0 +1,421 @@
+"""
+Mapping compiled into a single, specialised function
+
+[map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+is built from small, configurable pieces.
+That makes it easy to follow, but each call goes through
+four label functions, each of which then looks through its mappers.
+[compile_mapper][(m).] instead generates the source of one function,
+with the mappers' tables written out as literals,
+which evaluates all four labels in a single pass.
+The dimension tables are written out as dictionaries
+from each dimension to its priority and value,
+so only the dimensions which are present are looked up
+(as in the indexed [DimensionMapper][cmip_branded_variable_mapper.mapper_classes.]),
+rather than testing every key in the table.
+The function also remembers the suffix it derived for each
+combination of cell methods and dimensions,
+so repeated combinations cost little more than a dictionary lookup.
+
+Like [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.],
+the generated function parses the cell methods
+and matches each label's rules against the clauses that label reads
+(falling back to the raw string if the cell methods can't be parsed),
+and splits string dimensions with
+[tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+
+from attrs import frozen
+
+from cmip_branded_variable_mapper.area_label import AREA_LABEL_CELL_METHODS_MAPPER
+from cmip_branded_variable_mapper.cell_methods import (
+    ParsedCellMethods,
+    parse_cell_methods_if_possible,
+)
+from cmip_branded_variable_mapper.dimension_vocabulary import tokenize_dimensions
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapper,
+    CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+    TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER,
+    TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+)
+
+_TEMPLATE = """\
+_TEMPORAL_DIMENSIONS = {temporal_dimensions_table!r}
+
+_VERTICAL_DIMENSIONS = {vertical_dimensions_table!r}
+
+
+def get_suffix(
+    cell_methods,
+    dimensions,
+    _parse=_parse_cell_methods,
+    _parsed_type=_ParsedCellMethods,
+    _tokenize=_tokenize_dimensions,
+    _str=str,
+    _temporal_dimensions=_TEMPORAL_DIMENSIONS,
+    _vertical_dimensions=_VERTICAL_DIMENSIONS,
+):
+    if isinstance(dimensions, _str):
+        dimensions = _tokenize(dimensions)
+
+    dims = set(dimensions)
+
+    temporal_cm = area_cm = _parse(cell_methods)
+    if isinstance(temporal_cm, _parsed_type):
+        temporal_cm = temporal_cm.temporal_text
+        area_cm = area_cm.area_text
+
+    temporal = None
+    if temporal_cm is not None and {required_dimension!r} in dims:
+{temporal_initial}
+    if temporal is None:
+{temporal_dimensions}
+    if temporal is None and temporal_cm is not None and "time4" in dims:
+{temporal_time4}
+    if temporal is None:
+        temporal = {temporal_fallback!r}
+
+    vertical = None
+{vertical}
+    if vertical is None:
+        vertical = {vertical_fallback!r}
+
+    longitude_present = "longitude" in dims
+    latitude_present = "latitude" in dims
+    basin_present = "basin" in dims
+    if (
+        (longitude_present and latitude_present)
+        or ("xant" in dims and "yant" in dims)
+        or ("xgre" in dims and "ygre" in dims)
+    ):
+        horizontal = "hxy"
+    elif latitude_present and not (longitude_present or basin_present):
+        horizontal = "hy"
+    elif "site" in dims:
+        horizontal = "hs"
+    elif latitude_present and basin_present:
+        horizontal = "hyb"
+    elif (
+        "oline" in dims
+        or "siline" in dims
+        or ("gridlatitude" in dims and basin_present)
+    ):
+        horizontal = "ht"
+    else:
+        horizontal = {horizontal_fallback!r}
+
+    area = None
+    if area_cm is not None:
+{area}
+    if area is None:
+        area = {area_fallback!r}
+
+    return temporal + "-" + vertical + "-" + horizontal + "-" + area
+
+
+def map_to_cmip_branded_variable(
+    variable_name,
+    cell_methods,
+    dimensions,
+    _cache={{}},
+    _get_suffix=get_suffix,
+    _tuple=tuple,
+    _tokenize=_tokenize_dimensions,
+    _str=str,
+):
+    if type(dimensions) is not _tuple:
+        if isinstance(dimensions, _str):
+            dimensions = _tokenize(dimensions)
+        else:
+            dimensions = _tuple(dimensions)
+
+    key = (cell_methods, dimensions)
+    try:
+        return variable_name + "_" + _cache[key]
+    except KeyError:
+        pass
+
+    suffix = _get_suffix(cell_methods, dimensions)
+    if len(_cache) >= {max_cached_suffixes!r}:
+        _cache.clear()
+
+    _cache[key] = suffix
+
+    return variable_name + "_" + suffix
+"""
+
+
+def _generate_chain(
+    target: str,
+    subject: str,
+    pairs: Sequence[tuple[str, str]],
+    indent: int,
+) -> str:
+    """
+    Generate an if/elif chain which sets `target` from the first matching pair
+
+    Parameters
+    ----------
+    target
+        Name of the variable to set
+
+    subject
+        Name of the variable to check for each key with `in`
+
+    pairs
+        Pairs of (key, value), in the order in which they should be checked
+
+    indent
+        Number of spaces to indent the chain by
+
+    Returns
+    -------
+    :
+        Source of the chain.
+
+        If `pairs` is empty, a `pass` statement is returned.
+    """
+    pad = " " * indent
+    if not pairs:
+        return f"{pad}pass"
+
+    lines = []
+    for i, (key, value) in enumerate(pairs):
+        keyword = "if" if i == 0 else "elif"
+        lines.append(f"{pad}{keyword} {key!r} in {subject}:")
+        lines.append(f"{pad}    {target} = {value!r}")
+
+    return "\n".join(lines)
+
+
+def _get_priority_table(dimension_map: dict[str, str]) -> dict[str, tuple[int, str]]:
+    """
+    Get the table of a dimension mapper, keyed by dimension
+
+    Parameters
+    ----------
+    dimension_map
+        Map from dimensions to values, in order of priority
+
+    Returns
+    -------
+    :
+        Map from each dimension to its priority (lower wins) and value
+    """
+    return {
+        dimension: (priority, value)
+        for priority, (dimension, value) in enumerate(dimension_map.items())
+    }
+
+
+def _generate_lookup(target: str, table: str, indent: int) -> str:
+    """
+    Generate a lookup which sets `target` from the best-priority dimension present
+
+    Parameters
+    ----------
+    target
+        Name of the variable to set
+
+    table
+        Name of the table (see [_get_priority_table][(m).]) to look dimensions up in
+
+    indent
+        Number of spaces to indent the lookup by
+
+    Returns
+    -------
+    :
+        Source of the lookup.
+
+        If no dimension is in the table, `target` is left unchanged.
+    """
+    pad = " " * indent
+    lines = [
+        "best = None",
+        "for dimension in dims:",
+        f"    match = {table}.get(dimension)",
+        "    if match is not None and (best is None or match < best):",
+        "        best = match",
+        "if best is not None:",
+        f"    {target} = best[1]",
+    ]
+
+    return "\n".join(f"{pad}{line}" for line in lines)
+
+
+@frozen
+class CompiledMapper:
+    """
+    Mapper compiled into a single, specialised function
+    """
+
+    source: str
+    """
+    Source code of the generated functions
+    """
+
+    get_suffix: Callable[[str | None, Sequence[str] | str], str]
+    """
+    Generated function which derives the suffix (all four labels)
+
+    This does no caching.
+    """
+
+    map_to_cmip_branded_variable: Callable[[str, str | None, Sequence[str] | str], str]
+    """
+    Generated function which maps to a branded variable
+
+    This has the same signature as
+    [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.].
+    The suffix derived for each combination of cell methods and dimensions
+    is remembered.
+    """
+
+
+def compile_mapper(  # noqa: PLR0913
+    temporal_cell_methods_initial_mapper: CellMethodsSubStringMapper = (
+        TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER
+    ),
+    temporal_cell_methods_initial_required_dimension: str = "time",
+    temporal_dimensions_mapper: DimensionMapper = TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+    temporal_cell_methods_time4_mapper: CellMethodsSubStringMapper = (
+        TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER
+    ),
+    temporal_fallback: str = "ti",
+    vertical_dimensions_mapper: DimensionMapper = VERTICAL_LABEL_DIMENSIONS_MAPPER,
+    vertical_fallback: str = "u",
+    horizontal_fallback: str = "hm",
+    area_cell_methods_mapper: CellMethodsSubStringMapperOrdered = (
+        AREA_LABEL_CELL_METHODS_MAPPER
+    ),
+    area_fallback: str = "u",
+    max_cached_suffixes: int = 65536,
+) -> CompiledMapper:
+    """
+    Compile the mappers into a single, specialised function
+
+    The parameters have the same meaning as the parameters of
+    [get_temporal_label][cmip_branded_variable_mapper.temporal_label.],
+    [get_vertical_label][cmip_branded_variable_mapper.vertical_label.],
+    [get_horizontal_label][cmip_branded_variable_mapper.horizontal_label.] and
+    [get_area_label][cmip_branded_variable_mapper.area_label.].
+    The mappers are read when this function is called,
+    so later changes to them are not reflected in the compiled mapper.
+
+    Parameters
+    ----------
+    temporal_cell_methods_initial_mapper
+        Mapper to use to get the temporal label based on cell methods
+        in the 'initial' tests
+
+    temporal_cell_methods_initial_required_dimension
+        Dimension required for the result of using
+        `temporal_cell_methods_initial_mapper` to be used
+
+    temporal_dimensions_mapper
+        Mapper to use to get the temporal label based on dimensions
+
+    temporal_cell_methods_time4_mapper
+        Mapper to use to get the temporal label based on cell methods
+        if "time4" is in dimensions
+
+    temporal_fallback
+        Temporal label to use if no other conditions are matched
+
+    vertical_dimensions_mapper
+        Mapper to use to get the vertical label based on dimensions
+
+    vertical_fallback
+        Vertical label to use if no other conditions are matched
+
+    horizontal_fallback
+        Horizontal label to use if no other conditions are matched
+
+    area_cell_methods_mapper
+        Mapper to use to get the area label based on cell methods
+
+    area_fallback
+        Area label to use if no other conditions are matched
+
+    max_cached_suffixes
+        Maximum number of suffixes to remember
+
+        Once this is exceeded, all remembered suffixes are forgotten.
+
+    Returns
+    -------
+    :
+        Compiled mapper
+
+    Examples
+    --------
+    >>> compiled = compile_mapper()
+    >>> compiled.map_to_cmip_branded_variable(
+    ...     variable_name="tas",
+    ...     cell_methods="area: time: mean",
+    ...     dimensions=("longitude", "latitude", "time", "height2m"),
+    ... )
+    'tas_tavg-h2m-hxy-u'
+    """
+    source = _TEMPLATE.format(
+        required_dimension=temporal_cell_methods_initial_required_dimension,
+        temporal_initial=_generate_chain(
+            "temporal",
+            "temporal_cm",
+            tuple(temporal_cell_methods_initial_mapper.sub_string_map.items()),
+            indent=8,
+        ),
+        temporal_dimensions_table=_get_priority_table(
+            temporal_dimensions_mapper.dimension_map
+        ),
+        temporal_dimensions=_generate_lookup(
+            "temporal", "_temporal_dimensions", indent=8
+        ),
+        temporal_time4=_generate_chain(
+            "temporal",
+            "temporal_cm",
+            tuple(temporal_cell_methods_time4_mapper.sub_string_map.items()),
+            indent=8,
+        ),
+        temporal_fallback=temporal_fallback,
+        vertical_dimensions_table=_get_priority_table(
+            vertical_dimensions_mapper.dimension_map
+        ),
+        vertical=_generate_lookup("vertical", "_vertical_dimensions", indent=4),
+        vertical_fallback=vertical_fallback,
+        horizontal_fallback=horizontal_fallback,
+        area=_generate_chain(
+            "area",
+            "area_cm",
+            area_cell_methods_mapper.sub_string_map,
+            indent=8,
+        ),
+        area_fallback=area_fallback,
+        max_cached_suffixes=max_cached_suffixes,
+    )
+
+    namespace: dict[str, object] = {
+        "_parse_cell_methods": parse_cell_methods_if_possible,
+        "_ParsedCellMethods": ParsedCellMethods,
+        "_tokenize_dimensions": tokenize_dimensions,
+    }
+    exec(compile(source, "<compiled cmip_branded_variable_mapper>", "exec"), namespace)  # noqa: S102
+
+    return CompiledMapper(
+        source=source,
+        get_suffix=namespace["get_suffix"],  # type: ignore[arg-type]
+        map_to_cmip_branded_variable=namespace["map_to_cmip_branded_variable"],  # type: ignore[arg-type]
+    )
@@ -0,0 +1,249 @@
+"""
+Interning and bitmask encoding of dimensions
+
+Each dimension name which appears in the rule tables is assigned a bit.
+A record's dimensions can then be encoded once as an integer bitmask
+and tests like "is this dimension present?" become cheap mask tests,
+rather than scans of a tuple of dimensions.
+Dimensions which don't appear in any rule table can't change any label,
+so they aren't assigned a bit
+(otherwise the vocabulary would grow without bound
+in services which see arbitrary dimension names).
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+import threading
+from collections.abc import Sequence
+
+from attrs import define, field
+
+DIMENSIONS_SPLIT_PATTERN = re.compile(r"[\s,]+")
+"""
+Pattern used to split strings of dimensions
+
+Dimensions can be separated by whitespace, commas or both
+(e.g. "longitude latitude time" or "longitude, latitude, time").
+"""
+
+NO_BIT: int = 0
+"""
+Bit of any dimension which hasn't been interned
+
+All such dimensions share this value, i.e. they don't set any bit in a mask.
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def tokenize_dimensions(dimensions: str) -> tuple[str, ...]:
+    """
+    Split a string of dimensions into a tuple of dimensions
+
+    The results are cached, so repeated strings are only split once.
+
+    Parameters
+    ----------
+    dimensions
+        Dimensions, separated by whitespace, commas or both
+
+    Returns
+    -------
+    :
+        Dimensions
+
+    Examples
+    --------
+    >>> tokenize_dimensions("longitude latitude time")
+    ('longitude', 'latitude', 'time')
+    >>> tokenize_dimensions("longitude, latitude, time")
+    ('longitude', 'latitude', 'time')
+    """
+    return tuple(d for d in DIMENSIONS_SPLIT_PATTERN.split(dimensions) if d)
+
+
+@define
+class DimensionVocabulary:
+    """
+    Vocabulary of dimensions, each of which is assigned a bit
+
+    Only dimensions which are explicitly interned with [intern][(c).]
+    (normally by the rule tables, e.g. when a
+    [DimensionMapper][cmip_branded_variable_mapper.mapper_classes.] is built)
+    are assigned bits, in the order in which they are interned.
+    Any other dimension is encoded as [NO_BIT][(m).].
+    Bits are never re-assigned,
+    so masks remain valid as the vocabulary grows.
+    """
+
+    bits: dict[str, int] = field(factory=dict)
+    """
+    Map from dimension to its bit
+    """
+
+    max_cached_masks: int = 65536
+    """
+    Maximum number of encoded masks to cache
+
+    Once this is exceeded, the cache is cleared.
+    """
+
+    _masks: dict[tuple[str, ...] | str, int] = field(
+        init=False, factory=dict, eq=False, repr=False
+    )
+
+    _lock: threading.Lock = field(
+        factory=threading.Lock, init=False, eq=False, repr=False
+    )
+
+    def intern(self, dimension: str) -> int:
+        """
+        Get the bit of a dimension, assigning a new bit if needed
+
+        This should only be used for dimensions which appear in the rule tables.
+        Interning a new dimension clears the cached masks,
+        as they were encoded without the dimension's bit.
+
+        Parameters
+        ----------
+        dimension
+            Dimension
+
+        Returns
+        -------
+        :
+            Bit assigned to `dimension`
+        """
+        if (bit := self.bits.get(dimension)) is None:
+            with self._lock:
+                if (bit := self.bits.get(dimension)) is None:
+                    bit = 1 << len(self.bits)
+                    self.bits[dimension] = bit
+                    self._masks.clear()
+
+        return bit
+
+    def get_bit(self, dimension: str) -> int:
+        """
+        Get the bit of a dimension which has already been interned
+
+        Parameters
+        ----------
+        dimension
+            Dimension
+
+        Returns
+        -------
+        :
+            Bit assigned to `dimension`
+
+        Raises
+        ------
+        ValueError
+            `dimension` has not been interned,
+            so its presence can't be seen in any mask
+        """
+        try:
+            return self.bits[dimension]
+        except KeyError as exc:
+            msg = (
+                f"{dimension!r} has not been interned, "
+                "so its presence can't be seen in masks. "
+                "Intern it (e.g. by creating a "
+                "cmip_branded_variable_mapper.spec.LabelSpec which uses it) "
+                "before encoding any dimensions."
+            )
+            raise ValueError(msg) from exc
+
+    def encode(self, dimensions: Sequence[str] | str) -> int:
+        """
+        Encode dimensions as a bitmask
+
+        Parameters
+        ----------
+        dimensions
+            Dimensions to encode.
+
+            If a string is given, it is first split with
+            [tokenize_dimensions][(m).].
+
+        Returns
+        -------
+        :
+            Bitmask with the bit of each interned dimension in `dimensions` set.
+
+            Dimensions which haven't been interned are ignored
+            (their bit is [NO_BIT][(m).]).
+            Results are cached, so repeated dimensions are only encoded once.
+
+        Examples
+        --------
+        >>> vocabulary = DimensionVocabulary()
+        >>> for dimension in ("longitude", "latitude", "time"):
+        ...     _ = vocabulary.intern(dimension)
+        >>> vocabulary.encode(("longitude", "latitude", "time"))
+        7
+        >>> vocabulary.encode("latitude, time, landUse")
+        6
+        >>> vocabulary.bits
+        {'longitude': 1, 'latitude': 2, 'time': 4}
+        """
+        key = dimensions if isinstance(dimensions, (tuple, str)) else tuple(dimensions)
+        if (mask := self._masks.get(key)) is not None:
+            return mask
+
+        bits = self.bits
+        n_bits = len(bits)
+        mask = NO_BIT
+        for dimension in tokenize_dimensions(key) if isinstance(key, str) else key:
+            mask |= bits.get(dimension, NO_BIT)
+
+        if len(self._masks) >= self.max_cached_masks:
+            self._masks.clear()
+
+        # Don't cache a mask which missed a dimension interned in the meantime
+        if len(bits) == n_bits:
+            self._masks[key] = mask
+
+        return mask
+
+    def decode(self, mask: int) -> tuple[str, ...]:
+        """
+        Decode a bitmask back into dimensions
+
+        Parameters
+        ----------
+        mask
+            Bitmask to decode
+
+        Returns
+        -------
+        :
+            Dimensions whose bit is set in `mask`,
+            in the order in which they were added to the vocabulary.
+        """
+        return tuple(d for d, bit in self.bits.items() if mask & bit)
+
+
+DIMENSION_VOCABULARY = DimensionVocabulary()
+"""
+Vocabulary used by the mask-based label functions and mappers
+"""
+
+
+def encode_dimensions(dimensions: Sequence[str] | str) -> int:
+    """
+    Encode dimensions as a bitmask using [DIMENSION_VOCABULARY][(m).]
+
+    Parameters
+    ----------
+    dimensions
+        Dimensions to encode
+
+    Returns
+    -------
+    :
+        Bitmask with the bit of each dimension in `dimensions` set
+    """
+    return DIMENSION_VOCABULARY.encode(dimensions)
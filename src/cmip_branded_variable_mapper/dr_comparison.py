@@ -0,0 +1,543 @@
+"""
+Comparison with the data request's reference implementation
+
+The CMIP7 data request team derive branded variables with their own code
+(see [compute_brand_dr][(m).]).
+The functions here run that code and our mapper over a local snapshot
+of the data request's variables and report where they disagree,
+grouped by label (temporal, vertical, horizontal and area).
+
+Like in [bulk][cmip_branded_variable_mapper.bulk],
+both implementations are only run once per unique combination
+of cell methods and dimensions, so a full data request takes well under a second.
+
+For example, to compare against a snapshot exported by the data request software
+
+```sh
+python -m cmip_branded_variable_mapper.dr_comparison variables_v1.2.1.json
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cmip_branded_variable_mapper.bulk import (
+    LABEL_COLUMNS,
+    factorize_inputs,
+    split_dimensions,
+)
+from cmip_branded_variable_mapper.mapper import get_labels
+
+DR_SUFFIX = "_dr"
+"""
+Suffix of the columns which hold the data request's results
+"""
+
+SNAPSHOT_COLUMNS: tuple[str, ...] = (
+    "compound_name",
+    "variable_name",
+    "frequency",
+    "cell_methods",
+    "dimensions",
+)
+"""
+Columns of a snapshot, as returned by [load_snapshot][(m).]
+"""
+
+_VERTICAL_PATTERNS: tuple[tuple[re.Pattern[str], int, str], ...] = (
+    # Pattern, group holding the level and template for the label.
+    # The order matters, the first pattern which matches any dimension wins.
+    (re.compile(r"^height(\d+)m$"), 1, "h{}m"),
+    (re.compile(r"^sdepth(\d+)$"), 1, "d{}0cm"),
+    (re.compile(r"^((depth)|(olayer))(\d+)m?$"), 4, "d{}m"),
+    (re.compile(r"^op(\d+)bar$"), 1, "op{}bar"),
+    (re.compile(r"^pl?(\d+)$"), 1, "{}hPa"),
+    (re.compile(r"^alt(\d+)$"), 1, "h{}"),
+    (re.compile(r"^plev(\d+[uch]?)$"), 1, "p{}"),
+    (re.compile(r"^oplev(\d+)$"), 1, "op{}"),
+)
+
+_AREA_LABELS_DR: tuple[tuple[str, str], ...] = (
+    # The order matters, e.g. "sea_ice" has to be checked before "sea"
+    ("air", "air"),
+    ("convective_cloud", "ccl"),
+    ("stratiform_cloud", "scl"),
+    ("cloud", "cl"),
+    ("crops", "crp"),
+    ("floating_ice_shelf", "fis"),
+    ("grounded_ice_sheet", "gis"),
+    ("ice_sheet", "is"),
+    ("ice_free_sea", "ifs"),
+    ("sea_ice_melt_pond", "simp"),
+    ("sea_ice_ridges", "sir"),
+    ("sea_ice", "si"),
+    ("sea", "sea"),
+    ("land_ice", "li"),
+    ("land", "lnd"),
+    ("natural_grasses", "ng"),
+    ("pastures", "pst"),
+    ("shrubs", "shb"),
+    ("snow", "sn"),
+    ("trees", "tree"),
+    ("unfrozen_soil", "ufs"),
+    ("vegetation", "veg"),
+    ("wetland", "wl"),
+    ("sector", "multi"),
+)
+
+
+# The data request's implementation, modified to make it easier to use
+# without needing their variable class and to avoid re-compiling regular expressions.
+# Source: https://github.com/CMIP-Data-Request/CMIP7_DReq_Software/blob/a466f0d4dddef9a3234134b1fc463f901135f37b/scripts/sandbox/create_brand_name.py#L40
+def get_labels_dr(  # noqa: PLR0912
+    cell_methods: str, dimensions: Sequence[str]
+) -> tuple[str, str, str, str]:
+    """
+    Get all the labels using the data request's implementation
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods of the variable (an empty string if there are none)
+
+    dimensions
+        Dimensions of the variable
+
+    Returns
+    -------
+    :
+        Temporal, vertical, horizontal and area label (in that order)
+    """
+    # Temporal label
+    if "time: max" in cell_methods or "time: min" in cell_methods:
+        tlabel = "tstat"
+    elif "time: sum" in cell_methods:
+        tlabel = "tsum"
+    elif "time" in dimensions or "timefxc" in dimensions:
+        tlabel = "tavg"
+    elif "time1" in dimensions:
+        tlabel = "tpt"
+    elif "time2" in dimensions:
+        tlabel = "tclm"
+    elif "time3" in dimensions:
+        tlabel = "tclmdc"
+    else:
+        tlabel = "ti"
+
+    # Vertical label
+    vlabel = "u"
+    if (
+        "sdepth" in dimensions
+        or "olevel" in dimensions
+        or "alevel" in dimensions
+        or "alevhalf" in dimensions
+        or "olevhalf" in dimensions
+    ):
+        vlabel = "l"
+    elif "rho" in dimensions:
+        vlabel = "rho"
+    else:
+        for pattern, group, template in _VERTICAL_PATTERNS:
+            match = next(
+                (m for m in map(pattern.match, dimensions) if m is not None), None
+            )
+            if match is not None:
+                vlabel = template.format(match.group(group))
+                break
+
+    # Horizontal label
+    if (
+        ("latitude" in dimensions and "longitude" in dimensions)
+        or ("xant" in dimensions and "yant" in dimensions)
+        or ("xgre" in dimensions and "ygre" in dimensions)
+    ):
+        hlabel = "hxy"
+    elif (
+        "latitude" in dimensions
+        and "longitude" not in dimensions
+        and "basin" not in dimensions
+    ):
+        hlabel = "hy"
+    elif "site" in dimensions:
+        hlabel = "hxys"
+    elif "latitude" in dimensions and "basin" in dimensions:
+        hlabel = "hys"
+    elif (
+        ("gridlatitude" in dimensions and "basin" in dimensions)
+        or "oline" in dimensions
+        or "siline" in dimensions
+    ):
+        hlabel = "ht"
+    else:
+        hlabel = "hm"
+
+    # Area label
+    if "where" not in cell_methods:
+        alabel = "u"
+    else:
+        alabel = next(
+            (label for key, label in _AREA_LABELS_DR if key in cell_methods), "undef"
+        )
+
+    return tlabel, vlabel, hlabel, alabel
+
+
+def compute_brand_dr(  # noqa: PLR0913
+    var_name: str,
+    param_name: str,
+    freq_name: str,
+    cell_methods: str,
+    dimensions: Sequence[str],
+    extended_brand_name: bool = False,
+) -> str:
+    """
+    Compute the brand using the data request's implementation
+
+    Parameters
+    ----------
+    var_name
+        Name of the variable (only used for the region)
+
+    param_name
+        Name of the physical parameter
+
+    freq_name
+        Name of the frequency (only used for the extended brand name)
+
+    cell_methods
+        Cell methods of the variable (an empty string if there are none)
+
+    dimensions
+        Dimensions of the variable
+
+    extended_brand_name
+        Whether to append the frequency and region to the brand
+
+    Returns
+    -------
+    :
+        Brand, in the data request's format
+        (i.e. the labels are joined to the parameter with "-", not "_")
+
+    Examples
+    --------
+    >>> compute_brand_dr(
+    ...     var_name="tas",
+    ...     param_name="tas",
+    ...     freq_name="mon",
+    ...     cell_methods="area: time: mean",
+    ...     dimensions=["longitude", "latitude", "time", "height2m"],
+    ... )
+    'tas-tavg-h2m-hxy-u'
+    """
+    rep = "-".join([param_name, *get_labels_dr(cell_methods, dimensions)])
+    if not extended_brand_name:
+        return rep
+
+    # Region
+    if "xgre" in dimensions or "ygre" in dimensions or "Gre" in var_name:
+        rlabel = "gre"
+    elif "xant" in dimensions or "yant" in dimensions or "Ant" in var_name:
+        rlabel = "ant"
+    elif "site" in dimensions:
+        rlabel = "site"
+    else:
+        rlabel = "global"
+
+    return ".".join([rep, freq_name, rlabel])
+
+
+def load_snapshot(path: Path) -> pd.DataFrame:
+    """
+    Load a snapshot of the data request's variables
+
+    Parameters
+    ----------
+    path
+        Path to the snapshot.
+
+        Files with a `.json` suffix are read as exported
+        by the data request software (i.e. keyed by `"Compound Name"`),
+        anything else as CSV with the same columns as
+        the data request's spreadsheets (`"Compound Name"`,
+        `"Physical Parameter"`, `"Cell Methods"` and `"Dimensions"`).
+
+    Returns
+    -------
+    :
+        Snapshot, with the columns [SNAPSHOT_COLUMNS][(m).].
+
+        Missing cell methods are `None`, dimensions are tuples.
+    """
+    if path.suffix == ".json":
+        with open(path) as fh:
+            raw = json.load(fh)["Compound Name"]
+
+        res = pd.DataFrame(
+            {
+                "compound_name": list(raw),
+                "variable_name": [v["physical_parameter_name"] for v in raw.values()],
+                "frequency": [v.get("frequency") for v in raw.values()],
+                "cell_methods": pd.Series(
+                    [v.get("cell_methods") or None for v in raw.values()], dtype=object
+                ),
+                "dimensions": [
+                    split_dimensions(v["dimensions"], separator=None)
+                    for v in raw.values()
+                ],
+            }
+        )
+
+    else:
+        raw_df = pd.read_csv(path)
+        res = pd.DataFrame(
+            {
+                "compound_name": raw_df["Compound Name"],
+                "variable_name": raw_df["Physical Parameter"],
+                "frequency": None,
+                "cell_methods": pd.Series(
+                    [None if pd.isna(cm) else cm for cm in raw_df["Cell Methods"]],
+                    dtype=object,
+                ),
+                "dimensions": [
+                    split_dimensions(dims, separator=",")
+                    for dims in raw_df["Dimensions"]
+                ],
+            }
+        )
+
+    return res.loc[:, list(SNAPSHOT_COLUMNS)]
+
+
+def get_labels_both(
+    combination: tuple[str | None, tuple[str, ...]],
+) -> tuple[str, ...]:
+    """
+    Get our labels and the data request's labels for a combination
+
+    Parameters
+    ----------
+    combination
+        Cell methods and dimensions
+
+    Returns
+    -------
+    :
+        Our temporal, vertical, horizontal and area label,
+        followed by the data request's (in the same order)
+    """
+    cell_methods, dimensions = combination
+
+    return (
+        *get_labels(cell_methods, dimensions),
+        *get_labels_dr(cell_methods or "", dimensions),
+    )
+
+
+def compare_to_dr(
+    snapshot: pd.DataFrame, max_workers: int | None = None
+) -> pd.DataFrame:
+    """
+    Compare our mapper with the data request's implementation
+
+    Parameters
+    ----------
+    snapshot
+        Variables to compare, e.g. from [load_snapshot][(m).]
+
+    max_workers
+        Maximum number of worker processes.
+
+        If `None` or one, everything is done in this process
+        (which is normally fastest, because there are few unique combinations
+        of cell methods and dimensions).
+
+    Returns
+    -------
+    :
+        Comparison, with the same index as `snapshot`.
+
+        For each label (see [LABEL_COLUMNS][cmip_branded_variable_mapper.bulk.]),
+        our label is in the column of the same name
+        and the data request's in the column with the suffix [DR_SUFFIX][(m).].
+        The same goes for the branded variables
+        (the data request's are converted to our format).
+        `matches` is whether the branded variables agree.
+    """
+    codes, uniques = factorize_inputs(
+        cell_methods=[
+            None if pd.isna(cm) else cm for cm in snapshot["cell_methods"].tolist()
+        ],
+        dimensions=snapshot["dimensions"].tolist(),
+    )
+    if max_workers is None or max_workers <= 1:
+        unique_labels_l = [get_labels_both(u) for u in uniques]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            unique_labels_l = list(
+                executor.map(
+                    get_labels_both,
+                    uniques,
+                    chunksize=max(len(uniques) // max_workers, 1),
+                )
+            )
+
+    unique_labels = np.asarray(unique_labels_l, dtype=object).reshape(
+        len(uniques), 2 * len(LABEL_COLUMNS)
+    )
+    labels = unique_labels[codes, :]
+
+    res = pd.DataFrame(
+        labels,
+        columns=[*LABEL_COLUMNS, *(f"{c}{DR_SUFFIX}" for c in LABEL_COLUMNS)],
+        index=snapshot.index,
+    )
+
+    n_labels = len(LABEL_COLUMNS)
+    suffixes = [
+        ("-".join(row[:n_labels]), "-".join(row[n_labels:]))
+        for row in unique_labels.tolist()
+    ]
+    variable_names = snapshot["variable_name"].tolist()
+    res.insert(0, "compound_name", snapshot["compound_name"].tolist())
+    res.insert(
+        1,
+        "branded_variable",
+        [f"{v}_{suffixes[c][0]}" for v, c in zip(variable_names, codes.tolist())],
+    )
+    res.insert(
+        2,
+        f"branded_variable{DR_SUFFIX}",
+        [f"{v}_{suffixes[c][1]}" for v, c in zip(variable_names, codes.tolist())],
+    )
+    res["matches"] = res["branded_variable"] == res[f"branded_variable{DR_SUFFIX}"]
+
+    return res
+
+
+def get_discrepancy_report(
+    comparison: pd.DataFrame, n_examples: int = 3
+) -> pd.DataFrame:
+    """
+    Group the discrepancies in a comparison by label
+
+    Parameters
+    ----------
+    comparison
+        Comparison, as returned by [compare_to_dr][(m).]
+
+    n_examples
+        Maximum number of example compound names for each discrepancy
+
+    Returns
+    -------
+    :
+        One row per label and pair of differing values
+        (columns `label`, `ours`, `dr`, `n_records` and `examples`),
+        sorted by label and then by the number of records (most first).
+
+        Empty if there are no discrepancies.
+    """
+    reports = []
+    for label in LABEL_COLUMNS:
+        differs = comparison[label] != comparison[f"{label}{DR_SUFFIX}"]
+        if not differs.any():
+            continue
+
+        grouped = comparison.loc[differs].groupby(
+            [label, f"{label}{DR_SUFFIX}"], sort=False
+        )["compound_name"]
+        report = pd.DataFrame(
+            {
+                "n_records": grouped.size(),
+                "examples": grouped.apply(
+                    lambda s: ", ".join(s.iloc[:n_examples].tolist())
+                ),
+            }
+        ).reset_index(names=["ours", "dr"])
+        report.insert(0, "label", label)
+        reports.append(report.sort_values("n_records", ascending=False, kind="stable"))
+
+    if not reports:
+        return pd.DataFrame(columns=["label", "ours", "dr", "n_records", "examples"])
+
+    return pd.concat(reports, ignore_index=True)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Get the parser of the command-line arguments
+
+    Returns
+    -------
+    :
+        Parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m cmip_branded_variable_mapper.dr_comparison",
+        description=(
+            "Compare our branded variables with the data request's "
+            "for a local snapshot of the data request's variables"
+        ),
+    )
+    parser.add_argument(
+        "snapshot",
+        type=Path,
+        help="Snapshot of the variables (JSON exported by the data request or CSV)",
+    )
+    parser.add_argument(
+        "--n-examples",
+        type=int,
+        default=3,
+        help="Maximum number of example compound names for each discrepancy",
+    )
+    parser.add_argument(
+        "--max-workers", type=int, help="Maximum number of processes to use"
+    )
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the command-line interface
+
+    Parameters
+    ----------
+    argv
+        Command-line arguments.
+
+        If not supplied, `sys.argv[1:]` is used.
+
+    Returns
+    -------
+    :
+        Exit code (1 if there are any discrepancies)
+    """
+    args = get_parser().parse_args(argv)
+
+    comparison = compare_to_dr(
+        load_snapshot(args.snapshot), max_workers=args.max_workers
+    )
+    report = get_discrepancy_report(comparison, n_examples=args.n_examples)
+
+    n_mismatched = int((~comparison["matches"]).sum())
+    print(f"{n_mismatched} of {len(comparison)} branded variables differ")
+    if not report.empty:
+        print(report.to_string(index=False))
+
+    return 1 if n_mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,41 @@ Determination of the horizontal label
 
 from __future__ import annotations
 
+from cmip_branded_variable_mapper.dimension_vocabulary import DIMENSION_VOCABULARY
+
+HORIZONTAL_LABEL_DIMENSIONS: tuple[str, ...] = (
+    "longitude",
+    "latitude",
+    "xant",
+    "yant",
+    "xgre",
+    "ygre",
+    "basin",
+    "site",
+    "oline",
+    "siline",
+    "gridlatitude",
+)
+"""
+Dimensions which are used to determine the horizontal label
+
+If you change the logic in [get_horizontal_label][(m).],
+make sure you update this too.
+"""
+
+_LONGITUDE = DIMENSION_VOCABULARY.intern("longitude")
+_LATITUDE = DIMENSION_VOCABULARY.intern("latitude")
+_LONGITUDE_LATITUDE = _LONGITUDE | _LATITUDE
+_XANT_YANT = DIMENSION_VOCABULARY.intern("xant") | DIMENSION_VOCABULARY.intern("yant")
+_XGRE_YGRE = DIMENSION_VOCABULARY.intern("xgre") | DIMENSION_VOCABULARY.intern("ygre")
+_BASIN = DIMENSION_VOCABULARY.intern("basin")
+_SITE = DIMENSION_VOCABULARY.intern("site")
+_OLINE = DIMENSION_VOCABULARY.intern("oline")
+_SILINE = DIMENSION_VOCABULARY.intern("siline")
+_LINES = _OLINE | _SILINE
+_GRIDLATITUDE = DIMENSION_VOCABULARY.intern("gridlatitude")
+_GRIDLATITUDE_BASIN = _GRIDLATITUDE | _BASIN
+
 
 def get_horizontal_label(
     dimensions: tuple[str, ...],
@@ -61,3 +96,113 @@ def get_horizontal_label(
         return "ht"
 
     return fallback
+
+
+def get_horizontal_label_from_mask(
+    dimensions_mask: int,
+    fallback: str = "hm",
+) -> str:
+    """
+    Get horizontal label from dimensions encoded as a bitmask
+
+    This follows exactly the same logic as [get_horizontal_label][(m).].
+
+    Parameters
+    ----------
+    dimensions_mask
+        Dimensions of the variable, encoded with
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+    fallback
+        Value to return if no other conditions are matched
+
+    Returns
+    -------
+    :
+        horizontal label to use for constructing the branded variable name
+    """
+    if (
+        (dimensions_mask & _LONGITUDE_LATITUDE == _LONGITUDE_LATITUDE)
+        or (dimensions_mask & _XANT_YANT == _XANT_YANT)
+        or (dimensions_mask & _XGRE_YGRE == _XGRE_YGRE)
+    ):
+        return "hxy"
+
+    latitude_present = dimensions_mask & _LATITUDE
+    if latitude_present and not (dimensions_mask & (_LONGITUDE | _BASIN)):
+        return "hy"
+
+    if dimensions_mask & _SITE:
+        return "hs"
+
+    if latitude_present and dimensions_mask & _BASIN:
+        return "hyb"
+
+    if (dimensions_mask & _LINES) or (
+        dimensions_mask & _GRIDLATITUDE_BASIN == _GRIDLATITUDE_BASIN
+    ):
+        return "ht"
+
+    return fallback
+
+
+def get_horizontal_match_from_mask(  # noqa: PLR0911
+    dimensions_mask: int,
+) -> tuple[str, str] | None:
+    """
+    Get the matching dimensions and horizontal label from a bitmask
+
+    This follows the same logic as [get_horizontal_label_from_mask][(m).],
+    but also returns the dimensions which matched
+    (e.g. for instrumentation).
+
+    Parameters
+    ----------
+    dimensions_mask
+        Dimensions of the variable, encoded with
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+    Returns
+    -------
+    :
+        Matching dimensions (separated by spaces) and horizontal label.
+
+        If no conditions are matched (i.e. the fallback is used), `None` is returned.
+
+    Examples
+    --------
+    >>> from cmip_branded_variable_mapper.dimension_vocabulary import (
+    ...     encode_dimensions,
+    ... )
+    >>> get_horizontal_match_from_mask(encode_dimensions(("xant", "yant", "time")))
+    ('xant yant', 'hxy')
+    """
+    if dimensions_mask & _LONGITUDE_LATITUDE == _LONGITUDE_LATITUDE:
+        return "longitude latitude", "hxy"
+
+    if dimensions_mask & _XANT_YANT == _XANT_YANT:
+        return "xant yant", "hxy"
+
+    if dimensions_mask & _XGRE_YGRE == _XGRE_YGRE:
+        return "xgre ygre", "hxy"
+
+    latitude_present = dimensions_mask & _LATITUDE
+    if latitude_present and not (dimensions_mask & (_LONGITUDE | _BASIN)):
+        return "latitude", "hy"
+
+    if dimensions_mask & _SITE:
+        return "site", "hs"
+
+    if latitude_present and dimensions_mask & _BASIN:
+        return "latitude basin", "hyb"
+
+    if dimensions_mask & _OLINE:
+        return "oline", "ht"
+
+    if dimensions_mask & _SILINE:
+        return "siline", "ht"
+
+    if dimensions_mask & _GRIDLATITUDE_BASIN == _GRIDLATITUDE_BASIN:
+        return "gridlatitude basin", "ht"
+
+    return None
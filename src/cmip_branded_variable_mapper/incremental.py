@@ -0,0 +1,451 @@
+"""
+Incremental re-mapping of a stored catalogue after the rules change
+
+When a single entry of a rule table changes
+(e.g. of the vertical dimensions in [LabelSpec][cmip_branded_variable_mapper.spec.]),
+only the records with that dimension (or cell methods containing that sub-string)
+can get a different branded variable.
+[IncrementalMapper][(m).] keeps inverted indexes
+from each dimension and each cell methods value to the records which have them.
+Cell methods are indexed by the normalised texts which the rules are matched against
+(see [ParsedCellMethods][cmip_branded_variable_mapper.cell_methods.]),
+so e.g. "area: mean time:  max" is found when the rule for "time: max" changes.
+When the spec is updated, the old and new rules are diffed
+(see [diff_specs][(m).]) and only the affected records are re-mapped.
+The result is a [ChangeSet][(m).] of the records whose branded variable changed.
+
+Like in [bulk][cmip_branded_variable_mapper.bulk],
+records are grouped into unique combinations of cell methods and dimensions,
+so the indexes (and the re-mapping) work on those combinations,
+of which there are far fewer than records.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+from attrs import define, field, frozen
+
+from cmip_branded_variable_mapper.bulk import factorize_inputs
+from cmip_branded_variable_mapper.cell_methods import parse_cell_methods_if_possible
+from cmip_branded_variable_mapper.spec import LabelSpec
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+
+@frozen
+class SpecDiff:
+    """
+    Difference between two specs, in terms of what it can affect
+    """
+
+    dimensions: frozenset[str]
+    """
+    Dimensions whose presence can lead to a different label
+    """
+
+    cell_methods_sub_strings: frozenset[str]
+    """
+    Sub-strings whose presence in the cell methods can lead to a different label
+    """
+
+    fallbacks: tuple[tuple[int, str], ...]
+    """
+    Labels whose fallback changed
+
+    Each element is the position of the label
+    (temporal, vertical, horizontal, area) and its old fallback.
+    Records which currently have the old fallback for that label are affected.
+    """
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Whether the specs give the same result for every record
+        """
+        return not (self.dimensions or self.cell_methods_sub_strings or self.fallbacks)
+
+
+def _diff_rule_table(
+    old: Iterable[tuple[str, str]], new: Iterable[tuple[str, str]], ordered: bool
+) -> set[str]:
+    old_d = dict(old)
+    new_d = dict(new)
+    res = {k for k in old_d.keys() | new_d.keys() if old_d.get(k) != new_d.get(k)}
+
+    if ordered:
+        common_old = [k for k in old_d if k in new_d]
+        common_new = [k for k in new_d if k in old_d]
+        if common_old != common_new:
+            # The priorities changed, anything in either table could be affected
+            res.update(common_old)
+
+    return res
+
+
+def diff_specs(old: LabelSpec, new: LabelSpec) -> SpecDiff:
+    """
+    Diff the rules of two specs
+
+    Parameters
+    ----------
+    old
+        Old spec
+
+    new
+        New spec
+
+    Returns
+    -------
+    :
+        What the differences between the specs can affect.
+
+        This is conservative, i.e. some records which have an affected
+        dimension or cell methods may still end up with the same labels,
+        but records without any can't change.
+
+    Examples
+    --------
+    >>> from attrs import evolve
+    >>> from cmip_branded_variable_mapper.mapper_classes import DimensionMapper
+    >>> old = LabelSpec.from_defaults()
+    >>> new = evolve(
+    ...     old,
+    ...     vertical_dimensions_mapper=DimensionMapper(
+    ...         {
+    ...             **old.vertical_dimensions_mapper.dimension_map,
+    ...             "height2m": "h02m",
+    ...         }
+    ...     ),
+    ... )
+    >>> sorted(diff_specs(old, new).dimensions)
+    ['height2m']
+    """
+    dimensions = _diff_rule_table(
+        old.temporal_dimensions_mapper.dimension_map.items(),
+        new.temporal_dimensions_mapper.dimension_map.items(),
+        ordered=True,
+    ) | _diff_rule_table(
+        old.vertical_dimensions_mapper.dimension_map.items(),
+        new.vertical_dimensions_mapper.dimension_map.items(),
+        ordered=True,
+    )
+
+    cell_methods_sub_strings = (
+        _diff_rule_table(
+            old.temporal_cell_methods_initial_mapper.sub_string_map.items(),
+            new.temporal_cell_methods_initial_mapper.sub_string_map.items(),
+            ordered=False,
+        )
+        | _diff_rule_table(
+            old.temporal_cell_methods_time4_mapper.sub_string_map.items(),
+            new.temporal_cell_methods_time4_mapper.sub_string_map.items(),
+            ordered=False,
+        )
+        | _diff_rule_table(
+            old.area_cell_methods_mapper.sub_string_map,
+            new.area_cell_methods_mapper.sub_string_map,
+            ordered=True,
+        )
+    )
+    if (
+        old.temporal_cell_methods_initial_required_dimension
+        != new.temporal_cell_methods_initial_required_dimension
+    ):
+        # Anything which matches the initial tests could be affected
+        cell_methods_sub_strings.update(
+            old.temporal_cell_methods_initial_mapper.sub_string_map,
+            new.temporal_cell_methods_initial_mapper.sub_string_map,
+        )
+
+    fallbacks = tuple(
+        (i, old_fallback)
+        for i, (old_fallback, new_fallback) in enumerate(
+            (
+                (old.temporal_fallback, new.temporal_fallback),
+                (old.vertical_fallback, new.vertical_fallback),
+                (old.horizontal_fallback, new.horizontal_fallback),
+                (old.area_fallback, new.area_fallback),
+            )
+        )
+        if old_fallback != new_fallback
+    )
+
+    return SpecDiff(
+        dimensions=frozenset(dimensions),
+        cell_methods_sub_strings=frozenset(cell_methods_sub_strings),
+        fallbacks=fallbacks,
+    )
+
+
+@frozen
+class ChangeSet:
+    """
+    Records whose branded variable changed
+    """
+
+    rows: npt.NDArray[np.intp]
+    """
+    Indexes of the records which changed (ascending)
+    """
+
+    old: list[str]
+    """
+    Old branded variable of each changed record
+    """
+
+    new: list[str]
+    """
+    New branded variable of each changed record
+    """
+
+    n_recomputed: int
+    """
+    Number of unique combinations of cell methods and dimensions
+    which were re-mapped
+    """
+
+    def __len__(self) -> int:
+        """
+        Get the number of changed records
+        """
+        return len(self.rows)
+
+
+def _get_matched_texts(cell_methods: str | None) -> tuple[str, ...]:
+    # Texts which the label rules match sub-strings against
+    parsed = parse_cell_methods_if_possible(cell_methods)
+    if parsed is None:
+        return ()
+
+    if isinstance(parsed, str):
+        return (parsed,)
+
+    return tuple(dict.fromkeys((parsed.temporal_text, parsed.area_text)))
+
+
+@define
+class IncrementalMapper:
+    """
+    Mapper of a stored catalogue which can be updated incrementally
+
+    Use [from_records][(c).] to initialise.
+    """
+
+    spec: LabelSpec
+    """
+    Spec with which the catalogue is currently mapped
+    """
+
+    variable_names: Sequence[str]
+    """
+    Variable name of each record
+    """
+
+    codes: npt.NDArray[np.intp]
+    """
+    Index of each record's combination of cell methods and dimensions in `uniques`
+    """
+
+    uniques: list[tuple[str | None, tuple[str, ...]]]
+    """
+    Unique combinations of cell methods and dimensions
+    """
+
+    unique_labels: list[tuple[str, str, str, str]]
+    """
+    Labels of each unique combination under [spec][(c).]
+    """
+
+    _dimension_index: dict[str, list[int]] = field(
+        init=False, factory=dict, repr=False, eq=False
+    )
+    """
+    Map from dimension to the unique combinations which have it
+    """
+
+    _cell_methods_index: dict[str, list[int]] = field(
+        init=False, factory=dict, repr=False, eq=False
+    )
+    """
+    Map from cell methods to the unique combinations which have them
+
+    The keys are the texts which the rules are matched against,
+    i.e. the `temporal_text` and `area_text` of the parsed cell methods
+    (or the raw cell methods if they can't be parsed).
+    """
+
+    def __attrs_post_init__(self) -> None:
+        """
+        Build the inverted indexes
+        """
+        for i, (cell_methods, dimensions) in enumerate(self.uniques):
+            for dimension in set(dimensions):
+                self._dimension_index.setdefault(dimension, []).append(i)
+
+            for text in _get_matched_texts(cell_methods):
+                self._cell_methods_index.setdefault(text, []).append(i)
+
+    @classmethod
+    def from_records(
+        cls,
+        variable_names: Sequence[str],
+        cell_methods: Sequence[str | None],
+        dimensions: Sequence[Sequence[str]],
+        spec: LabelSpec | None = None,
+    ) -> IncrementalMapper:
+        """
+        Initialise by mapping records
+
+        Parameters
+        ----------
+        variable_names
+            Variable name of each record
+
+        cell_methods
+            Cell methods of each record
+
+        dimensions
+            Dimensions of each record
+
+        spec
+            Spec with which to map.
+
+            If `None`, [LabelSpec.from_defaults][cmip_branded_variable_mapper.spec.]
+            is used.
+
+        Returns
+        -------
+        :
+            Initialised instance
+
+        Raises
+        ------
+        ValueError
+            The inputs are not all the same length
+        """
+        if not (len(variable_names) == len(cell_methods) == len(dimensions)):
+            msg = (
+                "variable_names, cell_methods and dimensions "
+                "must all be the same length. "
+                f"Received {len(variable_names)=}, {len(cell_methods)=} "
+                f"and {len(dimensions)=}"
+            )
+            raise ValueError(msg)
+
+        if spec is None:
+            spec = LabelSpec.from_defaults()
+
+        codes, uniques = factorize_inputs(
+            cell_methods=cell_methods, dimensions=dimensions
+        )
+
+        return cls(
+            spec=spec,
+            variable_names=variable_names,
+            codes=codes,
+            uniques=uniques,
+            unique_labels=[spec.get_labels(cm, dims) for cm, dims in uniques],
+        )
+
+    def get_branded_variables(
+        self, rows: npt.NDArray[np.intp] | None = None
+    ) -> list[str]:
+        """
+        Get the current branded variables
+
+        Parameters
+        ----------
+        rows
+            Indexes of the records of interest.
+
+            If `None`, all records are returned.
+
+        Returns
+        -------
+        :
+            Branded variable of each record of interest
+        """
+        suffixes = ["-".join(labels) for labels in self.unique_labels]
+        if rows is None:
+            return [
+                "_".join([variable_name, suffixes[code]])
+                for variable_name, code in zip(self.variable_names, self.codes.tolist())
+            ]
+
+        return [
+            "_".join([self.variable_names[row], suffixes[self.codes[row]]])
+            for row in rows.tolist()
+        ]
+
+    def find_affected(self, diff: SpecDiff) -> list[int]:
+        """
+        Find the unique combinations which may be affected by a change of spec
+
+        Parameters
+        ----------
+        diff
+            Difference between the specs
+
+        Returns
+        -------
+        :
+            Indexes of the affected unique combinations (ascending)
+        """
+        affected: set[int] = set()
+        for dimension in diff.dimensions:
+            affected.update(self._dimension_index.get(dimension, ()))
+
+        for sub_string in diff.cell_methods_sub_strings:
+            for cell_methods, combinations in self._cell_methods_index.items():
+                if sub_string in cell_methods:
+                    affected.update(combinations)
+
+        for position, old_fallback in diff.fallbacks:
+            affected.update(
+                i
+                for i, labels in enumerate(self.unique_labels)
+                if labels[position] == old_fallback
+            )
+
+        return sorted(affected)
+
+    def update(self, spec: LabelSpec) -> ChangeSet:
+        """
+        Update the spec, re-mapping only the affected records
+
+        Parameters
+        ----------
+        spec
+            New spec
+
+        Returns
+        -------
+        :
+            Records whose branded variable changed
+        """
+        affected = self.find_affected(diff_specs(self.spec, spec))
+
+        changed = []
+        new_unique_labels = list(self.unique_labels)
+        for i in affected:
+            labels = spec.get_labels(*self.uniques[i])
+            if labels != self.unique_labels[i]:
+                new_unique_labels[i] = labels
+                changed.append(i)
+
+        rows = np.flatnonzero(np.isin(self.codes, changed))
+        old = self.get_branded_variables(rows)
+
+        self.spec = spec
+        self.unique_labels = new_unique_labels
+
+        return ChangeSet(
+            rows=rows,
+            old=old,
+            new=self.get_branded_variables(rows),
+            n_recomputed=len(affected),
+        )
@@ -0,0 +1,390 @@
+"""
+Instrumentation of which rules decide each label
+
+When enabled, [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+records, for each label, which branch of the logic decided it
+(i.e. which rule key matched, e.g. the dimension "depth100m",
+or whether the fallback was used)
+and how long it took to derive the label.
+The time spent preparing the inputs
+(encoding the dimensions and parsing the cell methods),
+which all the labels share, is recorded separately.
+The labels are derived with the same label functions as the normal path,
+so the instrumented path can't drift from it.
+
+When disabled (the default), the only cost is a single check of a flag.
+
+Examples
+--------
+>>> from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+>>> with instrumented() as instrumentation:
+...     map_to_cmip_branded_variable(
+...         "tas", "area: time: mean", ("longitude", "latitude", "time", "height2m")
+...     )
+'tas_tavg-h2m-hxy-u'
+>>> instrumentation.snapshot()["labels"]["vertical_label"]["branches"]
+{'height2m -> h2m': 1}
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from attrs import define, field
+
+from cmip_branded_variable_mapper.area_label import (
+    AREA_LABEL_CELL_METHODS_MAPPER,
+    get_area_label,
+)
+from cmip_branded_variable_mapper.cell_methods import (
+    ParsedCellMethods,
+    parse_cell_methods_if_possible,
+)
+from cmip_branded_variable_mapper.dimension_vocabulary import (
+    encode_dimensions,
+    tokenize_dimensions,
+)
+from cmip_branded_variable_mapper.horizontal_label import (
+    get_horizontal_label_from_mask,
+    get_horizontal_match_from_mask,
+)
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+    TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER,
+    TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+    get_temporal_label_from_mask,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+    get_vertical_label_from_mask,
+)
+
+LABELS: tuple[str, ...] = (
+    "temporal_label",
+    "vertical_label",
+    "horizontal_label",
+    "area_label",
+)
+"""
+Labels which are instrumented
+"""
+
+FALLBACK_BRANCH = "fallback"
+"""
+Name of the branch used when no other conditions are matched
+"""
+
+
+@define
+class Instrumentation:
+    """
+    Counters and timings of the branches which decide each label
+    """
+
+    enabled: bool = False
+    """
+    Whether to record anything
+    """
+
+    calls: int = field(default=0, init=False)
+    """
+    Number of records which have been mapped while enabled
+    """
+
+    branch_counts: dict[str, Counter[str]] = field(init=False)
+    """
+    Number of times each branch decided each label, keyed by label
+    """
+
+    time_ns: dict[str, int] = field(init=False)
+    """
+    Total time spent deriving each label in nanoseconds, keyed by label
+    """
+
+    inputs_time_ns: int = field(default=0, init=False)
+    """
+    Total time spent preparing the inputs in nanoseconds
+
+    I.e. encoding the dimensions and parsing the cell methods,
+    which is shared by all the labels so isn't counted against any of them.
+    """
+
+    _lock: threading.Lock = field(
+        init=False, factory=threading.Lock, eq=False, repr=False
+    )
+
+    @branch_counts.default
+    def _branch_counts_default(self) -> dict[str, Counter[str]]:
+        return {label: Counter() for label in LABELS}
+
+    @time_ns.default
+    def _time_ns_default(self) -> dict[str, int]:
+        return {label: 0 for label in LABELS}
+
+    def record(
+        self, decisions: dict[str, tuple[str, int]], inputs_time_ns: int = 0
+    ) -> None:
+        """
+        Record the decisions made for a single record
+
+        Parameters
+        ----------
+        decisions
+            For each label, the branch which decided it
+            and the time it took in nanoseconds
+
+        inputs_time_ns
+            Time spent preparing the inputs in nanoseconds
+        """
+        with self._lock:
+            self.calls += 1
+            self.inputs_time_ns += inputs_time_ns
+            for label, (branch, elapsed_ns) in decisions.items():
+                self.branch_counts[label][branch] += 1
+                self.time_ns[label] += elapsed_ns
+
+    def reset(self) -> None:
+        """
+        Reset all the counters and timings
+        """
+        with self._lock:
+            self.calls = 0
+            self.inputs_time_ns = 0
+            for label in LABELS:
+                self.branch_counts[label].clear()
+                self.time_ns[label] = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Get a snapshot of the counters and timings
+
+        Returns
+        -------
+        :
+            Snapshot, made up only of JSON-serialisable types
+        """
+        with self._lock:
+            labels = {}
+            for label in LABELS:
+                branches = self.branch_counts[label]
+                total = sum(branches.values())
+                labels[label] = {
+                    "branches": dict(branches.most_common()),
+                    "fallback_fraction": (
+                        branches[FALLBACK_BRANCH] / total if total else 0.0
+                    ),
+                    "time_ns": self.time_ns[label],
+                    "mean_time_ns": self.time_ns[label] / total if total else 0.0,
+                }
+
+            return {
+                "calls": self.calls,
+                "inputs": {
+                    "time_ns": self.inputs_time_ns,
+                    "mean_time_ns": (
+                        self.inputs_time_ns / self.calls if self.calls else 0.0
+                    ),
+                },
+                "labels": labels,
+            }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """
+        Get a snapshot of the counters and timings as JSON
+
+        Parameters
+        ----------
+        **kwargs
+            Passed to [json.dumps][]
+
+        Returns
+        -------
+        :
+            Snapshot, as JSON
+        """
+        return json.dumps(self.snapshot(), **kwargs)
+
+
+INSTRUMENTATION = Instrumentation()
+"""
+Instrumentation used by
+[map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+"""
+
+
+@contextlib.contextmanager
+def instrumented(
+    instrumentation: Instrumentation = INSTRUMENTATION, reset: bool = True
+) -> Iterator[Instrumentation]:
+    """
+    Enable instrumentation within a context
+
+    Parameters
+    ----------
+    instrumentation
+        Instrumentation to enable
+
+    reset
+        Whether to reset the counters and timings on entry
+
+    Yields
+    ------
+    :
+        The enabled instrumentation
+    """
+    if reset:
+        instrumentation.reset()
+
+    enabled_before = instrumentation.enabled
+    instrumentation.enabled = True
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.enabled = enabled_before
+
+
+def get_branch(label: str, matches: Iterable[tuple[str, str] | None]) -> str:
+    """
+    Get the branch which decided a label
+
+    Parameters
+    ----------
+    label
+        Label
+
+    matches
+        Match (i.e. matching key and value, or `None`)
+        of each of the label's rule tables,
+        in the order in which the label function checks them
+        (e.g. from the `get_match` method of the table's mapper)
+
+    Returns
+    -------
+    :
+        `"<key> -> <label>"` for the first table whose match gave `label`,
+        otherwise (i.e. if the fallback was used) [FALLBACK_BRANCH][(m).]
+
+    Examples
+    --------
+    >>> get_branch(
+    ...     "d100m", [VERTICAL_LABEL_DIMENSIONS_MAPPER.get_match(("olayer100m",))]
+    ... )
+    'olayer100m -> d100m'
+    """
+    for match in matches:
+        if match is not None and match[1] == label:
+            return f"{match[0]} -> {label}"
+
+    return FALLBACK_BRANCH
+
+
+def map_to_cmip_branded_variable_instrumented(
+    variable_name: str,
+    cell_methods: str | None,
+    dimensions: Sequence[str] | str,
+    instrumentation: Instrumentation = INSTRUMENTATION,
+) -> str:
+    """
+    Map CMIP variable information into a branded variable, recording the decisions
+
+    The labels are derived with the same functions as
+    [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.],
+    each one is simply timed.
+    The branch which decided each label is then worked out
+    from the matches of the label's rule tables
+    (outside the timings).
+
+    Parameters
+    ----------
+    variable_name
+        Variable name
+
+    cell_methods
+        Cell methods associated with the variable
+
+    dimensions
+        Dimensions of the variable
+
+    instrumentation
+        Instrumentation in which to record the decisions
+
+    Returns
+    -------
+    :
+        Branded variable
+    """
+    start = time.perf_counter_ns()
+    dimensions_mask = encode_dimensions(dimensions)
+    cell_methods_h = parse_cell_methods_if_possible(cell_methods)
+    inputs_end = time.perf_counter_ns()
+    temporal_label = get_temporal_label_from_mask(cell_methods_h, dimensions_mask)
+    temporal_end = time.perf_counter_ns()
+    vertical_label = get_vertical_label_from_mask(dimensions_mask)
+    vertical_end = time.perf_counter_ns()
+    horizontal_label = get_horizontal_label_from_mask(dimensions_mask)
+    horizontal_end = time.perf_counter_ns()
+    area_label = get_area_label(cell_methods_h)
+    area_end = time.perf_counter_ns()
+
+    dimensions_t = (
+        tokenize_dimensions(dimensions)
+        if isinstance(dimensions, str)
+        else tuple(dimensions)
+    )
+    if isinstance(cell_methods_h, ParsedCellMethods):
+        temporal_text: str | None = cell_methods_h.temporal_text
+        area_text: str | None = cell_methods_h.area_text
+    else:
+        temporal_text = area_text = cell_methods_h
+
+    temporal_matches = [
+        None
+        if temporal_text is None
+        else TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER.get_match(temporal_text),
+        TEMPORAL_LABEL_DIMENSIONS_MAPPER.get_match(dimensions_t),
+        None
+        if temporal_text is None
+        else TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER.get_match(temporal_text),
+    ]
+    area_matches = [
+        None
+        if area_text is None
+        else AREA_LABEL_CELL_METHODS_MAPPER.get_match(area_text)
+    ]
+
+    instrumentation.record(
+        {
+            "temporal_label": (
+                get_branch(temporal_label, temporal_matches),
+                temporal_end - inputs_end,
+            ),
+            "vertical_label": (
+                get_branch(
+                    vertical_label,
+                    [VERTICAL_LABEL_DIMENSIONS_MAPPER.get_match(dimensions_t)],
+                ),
+                vertical_end - temporal_end,
+            ),
+            "horizontal_label": (
+                get_branch(
+                    horizontal_label, [get_horizontal_match_from_mask(dimensions_mask)]
+                ),
+                horizontal_end - vertical_end,
+            ),
+            "area_label": (
+                get_branch(area_label, area_matches),
+                area_end - horizontal_end,
+            ),
+        },
+        inputs_time_ns=inputs_end - start,
+    )
+
+    suffix = "-".join([temporal_label, vertical_label, horizontal_label, area_label])
+
+    return "_".join([variable_name, suffix])
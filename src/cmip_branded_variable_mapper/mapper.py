@@ -8,10 +8,21 @@ this is currently our source of truth for this mapping.
 
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 from cmip_branded_variable_mapper.area_label import get_area_label
-from cmip_branded_variable_mapper.horizontal_label import get_horizontal_label
-from cmip_branded_variable_mapper.temporal_label import get_temporal_label
-from cmip_branded_variable_mapper.vertical_label import get_vertical_label
+from cmip_branded_variable_mapper.branded_variable import BrandedVariable
+from cmip_branded_variable_mapper.cell_methods import parse_cell_methods_if_possible
+from cmip_branded_variable_mapper.dimension_vocabulary import encode_dimensions
+from cmip_branded_variable_mapper.horizontal_label import (
+    get_horizontal_label_from_mask,
+)
+from cmip_branded_variable_mapper.instrumentation import (
+    INSTRUMENTATION,
+    map_to_cmip_branded_variable_instrumented,
+)
+from cmip_branded_variable_mapper.temporal_label import get_temporal_label_from_mask
+from cmip_branded_variable_mapper.vertical_label import get_vertical_label_from_mask
 
 
 def map_to_cmip_branded_variable(
@@ -52,13 +63,115 @@ def map_to_cmip_branded_variable(
     ... )
     'hfds_tavg-u-hxy-sea'
     """
-    temporal_label = get_temporal_label(
-        cell_methods=cell_methods, dimensions=dimensions
-    )
-    vertical_label = get_vertical_label(dimensions=dimensions)
-    horizontal_label = get_horizontal_label(dimensions=dimensions)
-    area_label = get_area_label(cell_methods=cell_methods)
+    if INSTRUMENTATION.enabled:
+        return map_to_cmip_branded_variable_instrumented(
+            variable_name=variable_name,
+            cell_methods=cell_methods,
+            dimensions=dimensions,
+        )
 
-    suffix = "-".join([temporal_label, vertical_label, horizontal_label, area_label])
+    suffix = "-".join(get_labels(cell_methods=cell_methods, dimensions=dimensions))
 
     return "_".join([variable_name, suffix])
+
+
+def map_to_cmip_branded_variable_record(
+    variable_name: str, cell_methods: str | None, dimensions: tuple[str, ...]
+) -> BrandedVariable:
+    """
+    Map CMIP variable information into a branded variable record
+
+    This is the same as [map_to_cmip_branded_variable][(m).],
+    except that the variable name and labels are returned separately.
+
+    Parameters
+    ----------
+    variable_name
+        Variable name
+
+    cell_methods
+        Cell methods associated with the variable
+
+    dimensions
+        Dimensions of the variable
+
+    Returns
+    -------
+    :
+        Branded variable
+
+    Examples
+    --------
+    >>> res = map_to_cmip_branded_variable_record(
+    ...     variable_name="hfds",
+    ...     cell_methods="area: mean where sea time: mean",
+    ...     dimensions=("longitude", "latitude", "time"),
+    ... )
+    >>> res.area_label
+    'sea'
+    >>> str(res)
+    'hfds_tavg-u-hxy-sea'
+    """
+    if INSTRUMENTATION.enabled:
+        return BrandedVariable.from_string(
+            map_to_cmip_branded_variable_instrumented(
+                variable_name=variable_name,
+                cell_methods=cell_methods,
+                dimensions=dimensions,
+            )
+        )
+
+    return BrandedVariable(
+        variable_name, *get_labels(cell_methods=cell_methods, dimensions=dimensions)
+    )
+
+
+def get_labels(
+    cell_methods: str | None, dimensions: Sequence[str] | str
+) -> tuple[str, str, str, str]:
+    """
+    Get all the labels for a given combination of cell methods and dimensions
+
+    Every entry point of the package derives its labels with this
+    (or with [LabelSpec.get_labels][cmip_branded_variable_mapper.spec.],
+    which follows the same logic),
+    so they all give the same result for the same inputs.
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods of the variable
+
+    dimensions
+        Dimensions of the variable.
+
+        Strings are split with
+        [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+
+    Returns
+    -------
+    :
+        Temporal, vertical, horizontal and area label (in that order)
+
+    Examples
+    --------
+    >>> get_labels(
+    ...     "area: mean where snow over sea_ice time: mean",
+    ...     ("longitude", "latitude", "time"),
+    ... )
+    ('tavg', 'u', 'hxy', 'si')
+    """
+    # Encode once, then all the dimension checks are cheap mask tests
+    dimensions_mask = encode_dimensions(dimensions)
+
+    # Parse once (cached), then each label only checks the clauses it needs
+    cell_methods_h = parse_cell_methods_if_possible(cell_methods)
+
+    return (
+        get_temporal_label_from_mask(
+            cell_methods=cell_methods_h, dimensions_mask=dimensions_mask
+        ),
+        get_vertical_label_from_mask(dimensions_mask=dimensions_mask),
+        get_horizontal_label_from_mask(dimensions_mask=dimensions_mask),
+        get_area_label(cell_methods=cell_methods_h),
+    )
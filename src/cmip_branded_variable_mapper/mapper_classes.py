@@ -9,10 +9,35 @@ because there is a coupling between the mapping and the matching algorithms
 from __future__ import annotations
 
 import itertools
-from typing import Any
+from collections.abc import Iterable
+from typing import Any, Literal
 
 import attr
-from attrs import define, field
+from attrs import define, field, validators
+
+from cmip_branded_variable_mapper.dimension_vocabulary import DIMENSION_VOCABULARY
+from cmip_branded_variable_mapper.sub_string_automaton import (
+    SubStringAutomaton,
+    iter_sub_string_pairs,
+)
+
+AUTOMATON_ENGINE_MIN_KEYS: int = 50
+"""
+Minimum number of keys for which the `"auto"` engine uses an automaton
+
+Below this, scanning the cell methods once per key is faster
+(see `scripts/benchmark-sub-string-mapper-engines.py`).
+"""
+
+AUTOMATON_VALIDATION_MIN_KEYS: int = 1000
+"""
+Minimum number of keys for which sub-string maps are validated with an automaton
+
+Below this, checking every pair of keys is faster.
+Above it, the automaton's (roughly) linear scaling wins
+(see [iter_sub_string_pairs][cmip_branded_variable_mapper.sub_string_automaton.]).
+Either way, the same clash is reported.
+"""
 
 
 @define
@@ -37,7 +62,17 @@ class CellMethodsSubStringMapper:
 
         The key here is that the keys can't lead to accidental clashes
         """
-        for k1, k2 in itertools.permutations(value.keys(), r=2):
+        keys = tuple(value.keys())
+        if len(keys) >= AUTOMATON_VALIDATION_MIN_KEYS:
+            # Report the same clash as checking every permutation in order would
+            clash = min(iter_sub_string_pairs(keys), default=None)
+            pairs: Iterable[tuple[str, str]] = (
+                () if clash is None else ((keys[clash[0]], keys[clash[1]]),)
+            )
+        else:
+            pairs = itertools.permutations(keys, r=2)
+
+        for k1, k2 in pairs:
             if k1 in k2:
                 msg = (
                     f"{k1!r} is a subset of {k2!r}. "
@@ -68,6 +103,32 @@ class CellMethodsSubStringMapper:
 
         return None
 
+    def get_match(self, cell_methods: str) -> tuple[str, str] | None:
+        """
+        Get the matching sub-string and metadata value for a given value of cell_methods
+
+        This follows the same logic as [get_value][(c).],
+        but also returns the sub-string which matched
+        (e.g. for instrumentation).
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods
+
+        Returns
+        -------
+        :
+            Matching sub-string and metadata value.
+
+            If no matches are found, `None` is returned.
+        """
+        for sub_string, value in self.sub_string_map.items():
+            if sub_string in cell_methods:
+                return sub_string, value
+
+        return None
+
 
 @define
 class DimensionMapper:
@@ -78,8 +139,71 @@ class DimensionMapper:
     dimension_map: dict[str, str]
     """
     Map from dimensions to the metadata value to use
+
+    If more than one dimension is present,
+    the value of the dimension which comes first in this map is used.
     """
 
+    engine: Literal["scan", "index"] = field(
+        default="index", validator=validators.in_(("scan", "index"))
+    )
+    """
+    Engine to use for finding matches
+
+    - `"scan"`: check whether each dimension in
+      [dimension_map][(c).] is present in turn
+    - `"index"`: look up each of the given dimensions
+      in a pre-computed index of dimension to (priority, value)
+      so the cost scales with the number of given dimensions,
+      not the size of [dimension_map][(c).]
+
+    Both engines give exactly the same result.
+    """
+
+    _index: dict[str, tuple[int, str]] | None = field(
+        init=False, default=None, eq=False, repr=False
+    )
+
+    _bit_index: dict[int, tuple[int, str]] = field(
+        init=False, factory=dict, eq=False, repr=False
+    )
+
+    _mask: int = field(init=False, default=0, eq=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        """
+        Build the indexes
+        """
+        if self.engine == "index":
+            self._index = {
+                dimension: (priority, value)
+                for priority, (dimension, value) in enumerate(
+                    self.dimension_map.items()
+                )
+            }
+
+        self._bit_index = {
+            DIMENSION_VOCABULARY.intern(dimension): (priority, value)
+            for priority, (dimension, value) in enumerate(self.dimension_map.items())
+        }
+        self._mask = sum(self._bit_index)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Get the state for pickling
+
+        The indexes are left out, because the bits assigned by
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+        differ between processes.
+        """
+        return {"dimension_map": self.dimension_map, "engine": self.engine}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Restore the state after unpickling, rebuilding the indexes
+        """
+        type(self).__init__(self, **state)
+
     def get_value(self, dimensions: tuple[str, ...]) -> str | None:
         """
         Get the metadata value for a given value of dimensions
@@ -96,12 +220,98 @@ class DimensionMapper:
 
             If no matches are found, `None` is returned.
         """
+        if (index := self._index) is not None:
+            best: tuple[int, str] | None = None
+            for dimension in dimensions:
+                if (match := index.get(dimension)) is not None and (
+                    best is None or match < best
+                ):
+                    best = match
+
+            if best is None:
+                return None
+
+            return best[1]
+
         for dimension, value in self.dimension_map.items():
             if dimension in dimensions:
                 return value
 
         return None
 
+    def get_value_from_mask(self, dimensions_mask: int) -> str | None:
+        """
+        Get the metadata value for dimensions encoded as a bitmask
+
+        Parameters
+        ----------
+        dimensions_mask
+            Dimensions to check, encoded with
+            [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+        Returns
+        -------
+        :
+            Metadata value.
+
+            If no matches are found, `None` is returned.
+        """
+        hits = dimensions_mask & self._mask
+        if not hits:
+            return None
+
+        bit_index = self._bit_index
+        bit = hits & -hits
+        best = bit_index[bit]
+        hits ^= bit
+        while hits:
+            bit = hits & -hits
+            if (match := bit_index[bit]) < best:
+                best = match
+
+            hits ^= bit
+
+        return best[1]
+
+    def get_match(self, dimensions: tuple[str, ...]) -> tuple[str, str] | None:
+        """
+        Get the matching dimension and metadata value for given dimensions
+
+        This follows the same logic as [get_value][(c).],
+        but also returns the dimension which matched
+        (e.g. for instrumentation).
+
+        Parameters
+        ----------
+        dimensions
+            Dimensions to check
+
+        Returns
+        -------
+        :
+            Matching dimension and metadata value.
+
+            If no matches are found, `None` is returned.
+        """
+        if (index := self._index) is not None:
+            best: tuple[int, str, str] | None = None
+            for dimension in dimensions:
+                if (match := index.get(dimension)) is not None and (
+                    best is None or match[0] < best[0]
+                ):
+                    best = (match[0], dimension, match[1])
+
+            if best is None:
+                return None
+
+            return best[1], best[2]
+
+        for dimension, value in self.dimension_map.items():
+            if dimension in dimensions:
+                return dimension, value
+
+        return None
+
 
 @define
 class CellMethodsSubStringMapperOrdered:
@@ -123,6 +333,37 @@ class CellMethodsSubStringMapperOrdered:
     These must be provide as a tuple of tuples to ensure that the ordering is preserved.
     """
 
+    engine: Literal["auto", "scan", "automaton"] = field(
+        default="auto", validator=validators.in_(("auto", "scan", "automaton"))
+    )
+    """
+    Engine to use for finding matches
+
+    - `"scan"`: check each sub-string in turn
+    - `"automaton"`: find all matches in a single pass over the cell methods
+      with a [SubStringAutomaton][cmip_branded_variable_mapper.sub_string_automaton.]
+    - `"auto"`: use `"automaton"` if there are at least
+      [AUTOMATON_ENGINE_MIN_KEYS][(m).] sub-strings, otherwise `"scan"`
+
+    Both engines give exactly the same result.
+    """
+
+    _automaton: SubStringAutomaton | None = field(
+        init=False, default=None, eq=False, repr=False
+    )
+
+    def __attrs_post_init__(self) -> None:
+        """
+        Build the automaton, if it is needed
+        """
+        if self.engine == "automaton" or (
+            self.engine == "auto"
+            and len(self.sub_string_map) >= AUTOMATON_ENGINE_MIN_KEYS
+        ):
+            self._automaton = SubStringAutomaton.from_patterns(
+                tuple(sub_string for sub_string, _ in self.sub_string_map)
+            )
+
     @sub_string_map.validator
     def sub_string_map_validator(
         self,
@@ -134,6 +375,21 @@ class CellMethodsSubStringMapperOrdered:
 
         The key here is that the keys can't lead to accidental clashes
         """
+        if len(value) >= AUTOMATON_VALIDATION_MIN_KEYS:
+            keys = tuple(k for k, _ in value)
+            for i, j in iter_sub_string_pairs(keys, reverse=True):
+                # Keys always checked in order,
+                # so only keys that come before this one can clash.
+                if i < j:
+                    msg = (
+                        f"{keys[i]!r} is a subset of {keys[j]!r}. "
+                        "You will need to re-order your mapper "
+                        "to avoid incorrect results."
+                    )
+                    raise AssertionError(msg)
+
+            return
+
         for i, v in enumerate(value[::-1]):
             # Keys always checked in order,
             # so we only need to check keys that come before this one.
@@ -149,7 +405,9 @@ class CellMethodsSubStringMapperOrdered:
 
     @classmethod
     def from_unordered(
-        cls, unordered_map: dict[str, str]
+        cls,
+        unordered_map: dict[str, str],
+        engine: Literal["auto", "scan", "automaton"] = "auto",
     ) -> CellMethodsSubStringMapperOrdered:
         """
         Initialise from an unordered map
@@ -159,6 +417,9 @@ class CellMethodsSubStringMapperOrdered:
         unordered_map
             Unordered map
 
+        engine
+            Engine to use for finding matches
+
         Returns
         -------
         :
@@ -169,7 +430,7 @@ class CellMethodsSubStringMapperOrdered:
             for key in sorted(unordered_map.keys(), key=len, reverse=True)
         )
 
-        return cls(sub_string_map=sub_string_map)
+        return cls(sub_string_map=sub_string_map, engine=engine)
 
     def get_value(self, cell_methods: str) -> str | None:
         """
@@ -187,8 +448,46 @@ class CellMethodsSubStringMapperOrdered:
 
             If no matches are found, `None` is returned.
         """
+        if self._automaton is not None:
+            if (i := self._automaton.first_match(cell_methods)) is None:
+                return None
+
+            return self.sub_string_map[i][1]
+
         for sub_string, value in self.sub_string_map:
             if sub_string in cell_methods:
                 return value
 
         return None
+
+    def get_match(self, cell_methods: str) -> tuple[str, str] | None:
+        """
+        Get the matching sub-string and metadata value for a given value of cell_methods
+
+        This follows the same logic as [get_value][(c).],
+        but also returns the sub-string which matched
+        (e.g. for instrumentation).
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods
+
+        Returns
+        -------
+        :
+            Matching sub-string and metadata value.
+
+            If no matches are found, `None` is returned.
+        """
+        if self._automaton is not None:
+            if (i := self._automaton.first_match(cell_methods)) is None:
+                return None
+
+            return self.sub_string_map[i]
+
+        for sub_string, value in self.sub_string_map:
+            if sub_string in cell_methods:
+                return sub_string, value
+
+        return None
@@ -0,0 +1,157 @@
+"""
+Mapping of many records under several versions of the spec at once
+
+This is useful for planning migrations from one version of the spec to another.
+Each unique combination of cell methods and dimensions is parsed only once
+and the parsed form is then evaluated against every spec
+(see [LabelSpec.get_labels_from_parsed][cmip_branded_variable_mapper.spec.]),
+rather than re-running the whole mapping once per version.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from cmip_branded_variable_mapper.bulk import BRANDED_VARIABLE_COLUMN, factorize_inputs
+from cmip_branded_variable_mapper.cell_methods import parse_cell_methods_if_possible
+from cmip_branded_variable_mapper.dimension_vocabulary import encode_dimensions
+from cmip_branded_variable_mapper.spec import LabelSpec
+
+CHANGED_COLUMN: str = "changed"
+"""
+Name of the column which flags records whose branded variable differs between specs
+"""
+
+
+def get_version_column(version: str) -> str:
+    """
+    Get the name of the column which holds the branded variables for a spec version
+
+    Parameters
+    ----------
+    version
+        Version of the spec
+
+    Returns
+    -------
+    :
+        Column name
+
+    Examples
+    --------
+    >>> get_version_column("2025-09-24")
+    'branded_variable_2025-09-24'
+    """
+    return f"{BRANDED_VARIABLE_COLUMN}_{version}"
+
+
+def map_to_cmip_branded_variables_multi_spec(
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str]],
+    specs: Sequence[LabelSpec],
+) -> pd.DataFrame:
+    """
+    Map many records of CMIP variable information under several specs at once
+
+    Parameters
+    ----------
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    specs
+        Specs to evaluate (e.g. loaded with
+        [load_spec][cmip_branded_variable_mapper.spec.]).
+
+        Each must have a different version.
+
+    Returns
+    -------
+    :
+        The branded variable of each record under each spec
+        (one column per spec, named with [get_version_column][(m).],
+        in the same order as `specs`)
+        and whether the branded variables differ between specs
+        (column [CHANGED_COLUMN][(m).]).
+
+    Raises
+    ------
+    ValueError
+        The inputs are not all the same length,
+        no specs are given or the specs' versions are not unique
+
+    Examples
+    --------
+    >>> from attrs import evolve
+    >>> current = LabelSpec.from_defaults()
+    >>> proposed = evolve(current, version="proposed", vertical_fallback="none")
+    >>> res = map_to_cmip_branded_variables_multi_spec(
+    ...     variable_names=["tas", "pr"],
+    ...     cell_methods=["area: time: mean", "area: time: mean"],
+    ...     dimensions=[
+    ...         ("longitude", "latitude", "time", "height2m"),
+    ...         ("longitude", "latitude", "time"),
+    ...     ],
+    ...     specs=[current, proposed],
+    ... )
+    >>> res["branded_variable_proposed"].tolist()
+    ['tas_tavg-h2m-hxy-u', 'pr_tavg-none-hxy-u']
+    >>> res["changed"].tolist()
+    [False, True]
+    """
+    if not (len(variable_names) == len(cell_methods) == len(dimensions)):
+        msg = (
+            "variable_names, cell_methods and dimensions must all be the same length. "
+            f"Received {len(variable_names)=}, {len(cell_methods)=} "
+            f"and {len(dimensions)=}"
+        )
+        raise ValueError(msg)
+
+    versions = [spec.version for spec in specs]
+    if not versions or len(set(versions)) != len(versions):
+        msg = f"At least one spec is needed and versions must be unique. {versions=}"
+        raise ValueError(msg)
+
+    codes, uniques = factorize_inputs(cell_methods=cell_methods, dimensions=dimensions)
+
+    # Parse each unique combination once, then evaluate every spec on it
+    unique_suffixes = np.empty((len(uniques), len(specs)), dtype=object)
+    for i, (cm, dims) in enumerate(uniques):
+        cell_methods_h = parse_cell_methods_if_possible(cm)
+        dimensions_mask = encode_dimensions(dims)
+        unique_suffixes[i, :] = [
+            "-".join(
+                spec.get_labels_from_parsed(
+                    cell_methods=cell_methods_h, dimensions_mask=dimensions_mask
+                )
+            )
+            for spec in specs
+        ]
+
+    # Only compare the (few) unique combinations
+    unique_changed = (unique_suffixes != unique_suffixes[:, :1]).any(axis=1)
+
+    codes_l = codes.tolist()
+    res = pd.DataFrame(
+        {
+            get_version_column(version): [
+                "_".join([variable_name, suffix])
+                for variable_name, suffix in zip(
+                    variable_names, unique_suffixes[codes_l, j].tolist()
+                )
+            ]
+            for j, version in enumerate(versions)
+        }
+    )
+    res[CHANGED_COLUMN] = unique_changed[codes]
+
+    return res
@@ -0,0 +1,298 @@
+"""
+Translation of the coordinates in netCDF files into CMIP dimension names
+
+The labels of a branded variable are derived from the CMIP names
+of a variable's dimensions (e.g. "longitude", "time", "height2m"),
+not the names used in a file (e.g. "lon", or a scalar "height" coordinate).
+The CMIP names are worked out from the metadata of the variable's coordinates,
+following the [CF conventions](https://cfconventions.org/):
+
+- each of the variable's dimensions which has a coordinate variable
+- each scalar coordinate listed in the variable's `coordinates` attribute
+- latitude and longitude auxiliary coordinates
+  listed in the variable's `coordinates` attribute (e.g. on curvilinear grids)
+
+Coordinates are recognised by their `standard_name` (or, failing that, `axis`).
+Scalar vertical coordinates (e.g. a height of 2 m) are recognised by their value
+(or, failing that, their name), pressure levels by their number.
+Any other coordinate (e.g. a model-level `lev` coordinate)
+is passed through under its own name,
+as the mapper falls back to generic labels for dimensions it doesn't know.
+Dimensions without a coordinate variable (e.g. bounds dimensions)
+carry no information, so are ignored.
+
+The exception is a scalar vertical coordinate which can't be named
+(e.g. a height of 5 m, which isn't in the rule tables).
+Its value decides the vertical label,
+so it raises [UnresolvedDimensionsError][(m).]
+rather than silently giving the wrong branded variable.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping
+
+from cmip_branded_variable_mapper.netcdf_header import NetCDFHeader, NetCDFVariable
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+)
+
+SCALAR_VERTICAL_COORDINATES: dict[str, tuple[str, dict[str, float], str]] = {
+    "height": ("height{:g}m", {"m": 1.0}, "m"),
+    "depth": ("depth{:g}m", {"m": 1.0}, "m"),
+    "air_pressure": ("p{:g}", {"Pa": 0.01, "hPa": 1.0}, "Pa"),
+}
+"""
+How to name scalar vertical coordinates, keyed by standard name
+
+Each value is the template of the CMIP dimension name,
+the factor which converts each supported unit into the template's unit
+and the unit assumed if the coordinate has no `units` attribute.
+"""
+
+
+class UnresolvedDimensionsError(ValueError):
+    """
+    Raised when the CMIP dimension names of a variable cannot be worked out
+    """
+
+    def __init__(self, variable_name: str, coordinates: list[str]) -> None:
+        """
+        Initialise the error
+
+        Parameters
+        ----------
+        variable_name
+            Name of the variable
+
+        coordinates
+            Names of the coordinates which could not be recognised
+        """
+        super().__init__(
+            f"Could not work out the CMIP dimension names of {variable_name!r}. "
+            f"Unrecognised coordinate(s): {', '.join(coordinates)}"
+        )
+
+
+def _get_text_attribute(variable: NetCDFVariable, name: str) -> str | None:
+    value = variable.attributes.get(name)
+
+    return value if isinstance(value, str) else None
+
+
+def get_time_dimension(coordinate: NetCDFVariable, cell_methods: str | None) -> str:
+    """
+    Get the CMIP name of a time coordinate
+
+    Parameters
+    ----------
+    coordinate
+        Time coordinate
+
+    cell_methods
+        Cell methods of the variable
+
+    Returns
+    -------
+    :
+        "time3" for climatologies of the diurnal cycle,
+        "time2" for other climatologies,
+        "time1" for instantaneous values (which have no bounds),
+        "time" otherwise
+    """
+    if "climatology" in coordinate.attributes:
+        if cell_methods is not None and "within days" in cell_methods:
+            return "time3"
+
+        return "time2"
+
+    if "bounds" not in coordinate.attributes:
+        return "time1"
+
+    return "time"
+
+
+def get_scalar_vertical_dimension(
+    coordinate: NetCDFVariable, value: float
+) -> str | None:
+    """
+    Get the CMIP name of a scalar vertical coordinate
+
+    Parameters
+    ----------
+    coordinate
+        Scalar vertical coordinate
+
+    value
+        Value of the coordinate
+
+    Returns
+    -------
+    :
+        CMIP name (e.g. "height2m", "p850"),
+        `None` if the coordinate doesn't match any dimension in the rule tables
+    """
+    standard_name = _get_text_attribute(coordinate, "standard_name")
+    if standard_name not in SCALAR_VERTICAL_COORDINATES:
+        return None
+
+    template, factors, default_units = SCALAR_VERTICAL_COORDINATES[standard_name]
+    units = _get_text_attribute(coordinate, "units") or default_units
+    if units not in factors:
+        return None
+
+    name = template.format(round(value * factors[units], 6))
+    if name not in VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map:
+        return None
+
+    return name
+
+
+def get_coordinate_dimension(  # noqa: PLR0911
+    coordinate: NetCDFVariable,
+    size: int | None,
+    cell_methods: str | None,
+    scalar_values: Mapping[str, float],
+) -> str | None:
+    """
+    Get the CMIP name of a coordinate
+
+    Parameters
+    ----------
+    coordinate
+        Coordinate
+
+    size
+        Number of values of the coordinate, `None` for scalar coordinates
+
+    cell_methods
+        Cell methods of the variable
+
+    scalar_values
+        Value of each scalar variable in the file, keyed by variable name
+
+    Returns
+    -------
+    :
+        CMIP name, the coordinate's own name if it isn't recognised
+        or `None` if it is a scalar vertical coordinate which can't be named
+    """
+    standard_name = _get_text_attribute(coordinate, "standard_name")
+    axis = _get_text_attribute(coordinate, "axis")
+
+    if standard_name == "longitude" or (standard_name is None and axis == "X"):
+        return "longitude"
+
+    if standard_name == "latitude" or (standard_name is None and axis == "Y"):
+        return "latitude"
+
+    if standard_name == "time" or (standard_name is None and axis == "T"):
+        return get_time_dimension(coordinate, cell_methods=cell_methods)
+
+    if size is None and standard_name in SCALAR_VERTICAL_COORDINATES:
+        if coordinate.name in scalar_values:
+            name = get_scalar_vertical_dimension(
+                coordinate, value=scalar_values[coordinate.name]
+            )
+            if name is not None:
+                return name
+
+        if coordinate.name in VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map:
+            return coordinate.name
+
+        return None
+
+    if standard_name == "air_pressure" and size is not None:
+        name = f"plev{size}"
+        if name in VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map:
+            return name
+
+    return coordinate.name
+
+
+def get_cmip_dimensions(
+    header: NetCDFHeader,
+    variable: NetCDFVariable,
+    scalar_values: Mapping[str, float] | None = None,
+) -> tuple[str, ...]:
+    """
+    Get the CMIP dimension names of a variable in a netCDF file
+
+    Parameters
+    ----------
+    header
+        Header of the file
+
+    variable
+        Variable
+
+    scalar_values
+        Value of each scalar variable in the file, keyed by variable name
+        (e.g. from [read_scalar_values][cmip_branded_variable_mapper.netcdf_header.]).
+
+        Without these, scalar vertical coordinates can only be named
+        if their name is a dimension name (e.g. "height2m").
+
+    Returns
+    -------
+    :
+        CMIP dimension names
+
+    Raises
+    ------
+    UnresolvedDimensionsError
+        One of the variable's scalar vertical coordinates could not be named
+    """
+    if scalar_values is None:
+        scalar_values = {}
+
+    variables = {v.name: v for v in header.variables}
+    cell_methods = _get_text_attribute(variable, "cell_methods")
+
+    # Coordinates whose name must be recognised, with their size
+    coordinates: list[tuple[NetCDFVariable, int | None]] = []
+    for dimension in variable.dimensions:
+        coordinate = variables.get(dimension)
+        if coordinate is not None and coordinate.dimensions == (dimension,):
+            coordinates.append((coordinate, header.dimensions[dimension]))
+
+    auxiliary_names = (_get_text_attribute(variable, "coordinates") or "").split()
+    for auxiliary_name in auxiliary_names:
+        coordinate = variables.get(auxiliary_name)
+        if coordinate is None:
+            continue
+
+        if not coordinate.dimensions:
+            coordinates.append((coordinate, None))
+
+        elif _get_text_attribute(coordinate, "standard_name") in (
+            "latitude",
+            "longitude",
+        ):
+            coordinates.append(
+                (
+                    coordinate,
+                    math.prod(header.dimensions[d] for d in coordinate.dimensions),
+                )
+            )
+
+    res: list[str] = []
+    unresolved: list[str] = []
+    for coordinate, size in coordinates:
+        name = get_coordinate_dimension(
+            coordinate,
+            size=size,
+            cell_methods=cell_methods,
+            scalar_values=scalar_values,
+        )
+        if name is None:
+            unresolved.append(coordinate.name)
+
+        elif name not in res:
+            res.append(name)
+
+    if unresolved:
+        raise UnresolvedDimensionsError(variable.name, unresolved)
+
+    return tuple(res)
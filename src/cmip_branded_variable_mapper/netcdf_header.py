@@ -0,0 +1,597 @@
+"""
+Reading of netCDF headers
+
+Only the header (dimensions, attributes and variable definitions) is read,
+the data is never touched.
+The only exception is [read_scalar_values][(m).],
+which reads the single value of each scalar variable on request
+(e.g. the height of a near-surface field).
+
+Files in the classic formats
+(classic, 64-bit offset and 64-bit data, i.e. CDF-1, CDF-2 and CDF-5)
+are memory-mapped and their header is parsed directly,
+following the [netCDF format specification](https://docs.unidata.ucar.edu/netcdf-c/current/file_format_specifications.html).
+Only the pages which hold the header are ever read from disk.
+
+Files in the netCDF-4 (HDF5) format are read with the optional
+[netCDF4](https://unidata.github.io/netcdf4-python/) package,
+which also only reads the metadata unless data is requested.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Union
+
+from attrs import define, field, frozen
+
+AttributeValue = Union[str, tuple[Union[int, float], ...]]
+"""
+Value of an attribute
+
+Character attributes are strings, all other attributes are tuples of numbers.
+"""
+
+CLASSIC_MAGIC = b"CDF"
+"""
+Bytes at the start of every file in one of the classic formats
+"""
+
+HDF5_MAGIC = b"\x89HDF\r\n\x1a\n"
+"""
+Bytes at the start of every netCDF-4 (HDF5) file
+"""
+
+CLASSIC_FORMATS = {1: "classic", 2: "64bit_offset", 5: "64bit_data"}
+"""
+Name of each classic format, keyed by the version byte in the file
+"""
+
+NC_DIMENSION = 0x0A
+NC_VARIABLE = 0x0B
+NC_ATTRIBUTE = 0x0C
+
+NC_CHAR = 2
+NC_TYPES: dict[int, tuple[str, int]] = {
+    1: ("b", 1),  # byte
+    NC_CHAR: ("s", 1),  # char
+    3: ("h", 2),  # short
+    4: ("i", 4),  # int
+    5: ("f", 4),  # float
+    6: ("d", 8),  # double
+    7: ("B", 1),  # ubyte
+    8: ("H", 2),  # ushort
+    9: ("I", 4),  # uint
+    10: ("q", 8),  # int64
+    11: ("Q", 8),  # uint64
+}
+"""
+Struct format character and size of each netCDF type, keyed by the type's code
+"""
+
+
+class NetCDFHeaderError(ValueError):
+    """
+    Raised when the header of a netCDF file cannot be read
+    """
+
+    def __init__(self, path: Path, reason: str) -> None:
+        """
+        Initialise the error
+
+        Parameters
+        ----------
+        path
+            Path to the file
+
+        reason
+            Reason the header could not be read
+        """
+        super().__init__(f"Could not read the header of {path}. {reason}")
+
+
+@frozen
+class NetCDFVariable:
+    """
+    Definition of a variable in a netCDF file
+    """
+
+    name: str
+    """
+    Name of the variable
+    """
+
+    dimensions: tuple[str, ...]
+    """
+    Names of the variable's dimensions
+    """
+
+    attributes: dict[str, AttributeValue] = field(factory=dict)
+    """
+    Attributes of the variable
+    """
+
+    begin: int | None = None
+    """
+    Offset of the variable's data from the start of the file
+
+    Only available for files in the classic formats.
+    """
+
+    nc_type: int | None = None
+    """
+    Code of the variable's type (a key of [NC_TYPES][(m).])
+
+    Only available for files in the classic formats.
+    """
+
+
+@frozen
+class NetCDFHeader:
+    """
+    Header of a netCDF file
+    """
+
+    format: str
+    """
+    Format of the file
+
+    One of the values of [CLASSIC_FORMATS][(m).] or `"netcdf4"`
+    (or `"xarray"` for headers built from the metadata of an xarray dataset).
+    """
+
+    dimensions: dict[str, int]
+    """
+    Size of each dimension, keyed by dimension name
+
+    The size of the record (unlimited) dimension is the current number of records.
+    """
+
+    attributes: dict[str, AttributeValue]
+    """
+    Global attributes
+    """
+
+    variables: tuple[NetCDFVariable, ...]
+    """
+    Variables in the file
+    """
+
+    header_size: int | None = None
+    """
+    Size of the header in bytes
+
+    Only available for files in the classic formats.
+    """
+
+    attribute_list_span: tuple[int, int] | None = None
+    """
+    Start and end offset of the list of global attributes in the file
+
+    Only available for files in the classic formats.
+    """
+
+    attribute_spans: dict[str, tuple[int, int]] = field(factory=dict)
+    """
+    Start and end offset of each global attribute in the file, keyed by name
+
+    Only available for files in the classic formats.
+    Together with [attribute_list_span][(c).],
+    this allows global attributes to be edited in place.
+    """
+
+    @property
+    def data_start(self) -> int | None:
+        """
+        Offset from the start of the file at which the data starts
+
+        The header can grow up to this offset without moving any data.
+        `None` if the file has no variables or is not in a classic format.
+        """
+        return min(
+            (v.begin for v in self.variables if v.begin is not None), default=None
+        )
+
+    @property
+    def data_variables(self) -> tuple[NetCDFVariable, ...]:
+        """
+        Variables which hold data, rather than describing other variables
+
+        This excludes coordinate variables (variables named after a dimension)
+        and variables referred to by the `bounds`, `climatology`
+        or `coordinates` attributes of other variables.
+        """
+        auxiliary = set(self.dimensions)
+        for variable in self.variables:
+            for key in ("bounds", "climatology", "coordinates"):
+                value = variable.attributes.get(key)
+                if isinstance(value, str):
+                    auxiliary.update(value.split())
+
+        return tuple(v for v in self.variables if v.name not in auxiliary)
+
+
+@define
+class _ClassicHeaderParser:
+    """
+    Parser of the header of a file in one of the classic formats
+    """
+
+    path: Path
+    buffer: mmap.mmap
+    version: int
+    position: int = 4
+
+    @property
+    def _size_format(self) -> str:
+        # Sizes and counts are 64-bit in the 64-bit data format
+        return ">Q" if self.version == 5 else ">I"  # noqa: PLR2004
+
+    def _unpack(self, fmt: str) -> tuple[Any, ...]:
+        start = self.position
+        size = struct.calcsize(fmt)
+        if start + size > len(self.buffer):
+            raise NetCDFHeaderError(self.path, "The header is truncated.")
+
+        self.position = start + size
+
+        return struct.unpack_from(fmt, self.buffer, start)
+
+    def read_bytes(self, n: int) -> bytes:
+        # Values are padded to a multiple of four bytes
+        (res,) = self._unpack(f"{-(-n // 4) * 4}s")
+        return bytes(res[:n])
+
+    def read_size(self) -> int:
+        (res,) = self._unpack(self._size_format)
+        return int(res)
+
+    def read_offset(self) -> int:
+        (res,) = self._unpack(">I" if self.version == 1 else ">Q")
+        return int(res)
+
+    def read_name(self) -> str:
+        return self.read_bytes(self.read_size()).decode("utf-8")
+
+    def read_list_header(self, tag: int) -> int:
+        (list_tag,) = self._unpack(">I")
+        n = self.read_size()
+        if list_tag not in (0, tag):
+            msg = f"Expected tag {tag:#x} or absent, found {list_tag:#x}."
+            raise NetCDFHeaderError(self.path, msg)
+
+        return n
+
+    def read_attributes(
+        self, spans: dict[str, tuple[int, int]] | None = None
+    ) -> dict[str, AttributeValue]:
+        res: dict[str, AttributeValue] = {}
+        for _ in range(self.read_list_header(NC_ATTRIBUTE)):
+            start = self.position
+            name = self.read_name()
+            (nc_type,) = self._unpack(">I")
+            if nc_type not in NC_TYPES:
+                msg = f"Attribute {name!r} has unknown type {nc_type}."
+                raise NetCDFHeaderError(self.path, msg)
+
+            n = self.read_size()
+            fmt, size = NC_TYPES[nc_type]
+            raw = self.read_bytes(n * size)
+            if nc_type == NC_CHAR:
+                res[name] = raw.decode("utf-8").rstrip("\x00")
+            else:
+                res[name] = struct.unpack_from(f">{n}{fmt}", raw)
+
+            if spans is not None:
+                spans[name] = (start, self.position)
+
+        return res
+
+    def parse(self) -> NetCDFHeader:
+        n_records = self.read_size()
+        dimensions: list[tuple[str, int]] = []
+        for _ in range(self.read_list_header(NC_DIMENSION)):
+            name = self.read_name()
+            dimensions.append((name, self.read_size()))
+
+        attribute_list_start = self.position
+        attribute_spans: dict[str, tuple[int, int]] = {}
+        attributes = self.read_attributes(spans=attribute_spans)
+        attribute_list_span = (attribute_list_start, self.position)
+
+        variables = []
+        for _ in range(self.read_list_header(NC_VARIABLE)):
+            name = self.read_name()
+            dim_ids = [self.read_size() for _ in range(self.read_size())]
+            variable_attributes = self.read_attributes()
+            (nc_type,) = self._unpack(">I")
+            self.read_size()  # size
+            begin = self.read_offset()
+            try:
+                variable_dimensions = tuple(dimensions[i][0] for i in dim_ids)
+            except IndexError as exc:
+                msg = f"Variable {name!r} refers to an unknown dimension."
+                raise NetCDFHeaderError(self.path, msg) from exc
+
+            variables.append(
+                NetCDFVariable(
+                    name=name,
+                    dimensions=variable_dimensions,
+                    attributes=variable_attributes,
+                    begin=begin,
+                    nc_type=nc_type,
+                )
+            )
+
+        return NetCDFHeader(
+            format=CLASSIC_FORMATS[self.version],
+            dimensions={
+                # A size of zero marks the record dimension
+                name: size if size else n_records
+                for name, size in dimensions
+            },
+            attributes=attributes,
+            variables=tuple(variables),
+            header_size=self.position,
+            attribute_list_span=attribute_list_span,
+            attribute_spans=attribute_spans,
+        )
+
+
+def encode_classic_attribute_list(
+    encoded_attributes: list[bytes], file_format: str
+) -> bytes:
+    """
+    Encode a list of attributes for a file in one of the classic formats
+
+    Parameters
+    ----------
+    encoded_attributes
+        Encoded attributes
+        (e.g. from [encode_classic_text_attribute][(m).]
+        or copied from a file using
+        [NetCDFHeader.attribute_spans][(m).NetCDFHeader.])
+
+    file_format
+        Format of the file (one of the values of [CLASSIC_FORMATS][(m).])
+
+    Returns
+    -------
+    :
+        Encoded list of attributes
+    """
+    size_format = ">Q" if file_format == CLASSIC_FORMATS[5] else ">I"
+    if not encoded_attributes:
+        # Absent
+        return struct.pack(">I", 0) + struct.pack(size_format, 0)
+
+    return (
+        struct.pack(">I", NC_ATTRIBUTE)
+        + struct.pack(size_format, len(encoded_attributes))
+        + b"".join(encoded_attributes)
+    )
+
+
+def encode_classic_text_attribute(name: str, value: str, file_format: str) -> bytes:
+    """
+    Encode a text attribute for a file in one of the classic formats
+
+    Parameters
+    ----------
+    name
+        Name of the attribute
+
+    value
+        Value of the attribute
+
+    file_format
+        Format of the file (one of the values of [CLASSIC_FORMATS][(m).])
+
+    Returns
+    -------
+    :
+        Encoded attribute
+    """
+    size_format = ">Q" if file_format == CLASSIC_FORMATS[5] else ">I"
+
+    def encode_sized(raw: bytes) -> bytes:
+        # Size, then the bytes padded to a multiple of four bytes
+        return struct.pack(size_format, len(raw)) + raw + b"\x00" * (-len(raw) % 4)
+
+    encoded_name = encode_sized(name.encode("utf-8"))
+    encoded_value = encode_sized(value.encode("utf-8"))
+
+    return encoded_name + struct.pack(">I", NC_CHAR) + encoded_value
+
+
+def read_classic_header(path: Path) -> NetCDFHeader:
+    """
+    Read the header of a file in one of the classic formats
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    Returns
+    -------
+    :
+        Header of the file
+
+    Raises
+    ------
+    NetCDFHeaderError
+        The file is not in one of the classic formats or its header is invalid
+    """
+    with open(path, "rb") as fh:
+        magic = fh.read(4)
+        if len(magic) < 4 or magic[:3] != CLASSIC_MAGIC:  # noqa: PLR2004
+            raise NetCDFHeaderError(path, "It is not in a classic netCDF format.")
+
+        if magic[3] not in CLASSIC_FORMATS:
+            msg = f"Unknown classic format version {magic[3]}."
+            raise NetCDFHeaderError(path, msg)
+
+        # Only the pages we touch (i.e. the header) are read from disk
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _ClassicHeaderParser(
+                path=path, buffer=buffer, version=magic[3]
+            ).parse()
+
+
+def _to_attribute_value(value: Any) -> AttributeValue:
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+
+    import numpy as np
+
+    return tuple(np.atleast_1d(value).tolist())
+
+
+def read_netcdf4_header(path: Path) -> NetCDFHeader:
+    """
+    Read the header of a netCDF-4 file
+
+    This requires the optional [netCDF4](https://unidata.github.io/netcdf4-python/)
+    package.
+    Only the root group is read.
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    Returns
+    -------
+    :
+        Header of the file
+
+    Raises
+    ------
+    ImportError
+        netCDF4 is not installed
+    """
+    try:
+        import netCDF4
+    except ImportError as exc:
+        msg = (
+            f"Reading netCDF-4 files (like {path}) requires netCDF4. "
+            "Please install it "
+            "(e.g. `pip install 'cmip-branded-variable-mapper[netcdf]'`)."
+        )
+        raise ImportError(msg) from exc
+
+    with netCDF4.Dataset(path, "r") as ds:
+        return NetCDFHeader(
+            format="netcdf4",
+            dimensions={name: len(dim) for name, dim in ds.dimensions.items()},
+            attributes={k: _to_attribute_value(ds.getncattr(k)) for k in ds.ncattrs()},
+            variables=tuple(
+                NetCDFVariable(
+                    name=name,
+                    dimensions=tuple(variable.dimensions),
+                    attributes={
+                        k: _to_attribute_value(variable.getncattr(k))
+                        for k in variable.ncattrs()
+                    },
+                )
+                for name, variable in ds.variables.items()
+            ),
+        )
+
+
+def read_scalar_values(path: Path, header: NetCDFHeader) -> dict[str, int | float]:
+    """
+    Read the value of each numeric scalar variable in a netCDF file
+
+    Scalar variables hold a single value,
+    so only a few bytes are read for each.
+    Reading the values of netCDF-4 files requires the optional
+    [netCDF4](https://unidata.github.io/netcdf4-python/) package.
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    header
+        Header of the file
+
+    Returns
+    -------
+    :
+        Value of each numeric scalar variable, keyed by variable name
+    """
+    scalars = [v for v in header.variables if not v.dimensions]
+    if not scalars:
+        return {}
+
+    if header.format == "netcdf4":
+        import netCDF4
+        import numpy as np
+
+        with netCDF4.Dataset(path, "r") as ds:
+            values = {v.name: ds.variables[v.name][...] for v in scalars}
+
+        return {
+            k: v.item()
+            for k, v in values.items()
+            if np.issubdtype(v.dtype, np.number) and not np.ma.is_masked(v)
+        }
+
+    res: dict[str, int | float] = {}
+    with open(path, "rb") as fh:
+        for variable in scalars:
+            if (
+                variable.begin is None
+                or variable.nc_type is None
+                or variable.nc_type == NC_CHAR
+                or variable.nc_type not in NC_TYPES
+            ):
+                continue
+
+            fmt, size = NC_TYPES[variable.nc_type]
+            fh.seek(variable.begin)
+            raw = fh.read(size)
+            if len(raw) == size:
+                (res[variable.name],) = struct.unpack(f">{fmt}", raw)
+
+    return res
+
+
+def read_header(path: Path) -> NetCDFHeader:
+    """
+    Read the header of a netCDF file
+
+    The format is detected from the first bytes of the file.
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    Returns
+    -------
+    :
+        Header of the file
+
+    Raises
+    ------
+    NetCDFHeaderError
+        The file is not a netCDF file or its header is invalid
+    """
+    with open(path, "rb") as fh:
+        magic = fh.read(len(HDF5_MAGIC))
+
+    if magic.startswith(CLASSIC_MAGIC):
+        return read_classic_header(path)
+
+    if magic == HDF5_MAGIC:
+        return read_netcdf4_header(path)
+
+    raise NetCDFHeaderError(path, "It is not a netCDF file.")
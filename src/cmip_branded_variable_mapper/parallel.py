@@ -0,0 +1,194 @@
+"""
+Mapping of many records in parallel
+
+The records are split into chunks, each of which is mapped
+by a worker in a process pool.
+Each chunk is mapped with
+[map_to_cmip_branded_variables][cmip_branded_variable_mapper.bulk.],
+so the labels are only derived once
+per unique combination of cell methods and dimensions in the chunk.
+
+If the workers are started by forking,
+they inherit the records from the parent process,
+so only the bounds of each chunk have to be sent to the workers.
+Otherwise, each chunk's records are pickled and sent to the worker.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+Chunk = tuple[Sequence[str], Sequence["str | None"], Sequence["Sequence[str] | str"]]
+"""
+Variable names, cell methods and dimensions of a chunk of records
+"""
+
+_records: Chunk | None = None
+"""
+Records inherited by the worker from the parent process, if any
+"""
+
+
+def initialise_worker(records: Chunk | None = None) -> None:
+    """
+    Initialise a worker
+
+    Parameters
+    ----------
+    records
+        Records inherited from the parent process, if any
+    """
+    global _records  # noqa: PLW0603
+    if records is not None:
+        _records = records
+
+
+def map_chunk(chunk: Chunk) -> list[str]:
+    """
+    Map a chunk of records
+
+    Parameters
+    ----------
+    chunk
+        Variable names, cell methods and dimensions of the records
+
+    Returns
+    -------
+    :
+        Branded variable of each record
+    """
+    variable_names, cell_methods, dimensions = chunk
+
+    return map_to_cmip_branded_variables(
+        variable_names=variable_names,
+        cell_methods=cell_methods,
+        dimensions=dimensions,
+    )
+
+
+def map_chunk_bounds(bounds: tuple[int, int]) -> list[str]:
+    """
+    Map a chunk of the records inherited from the parent process
+
+    Parameters
+    ----------
+    bounds
+        Start (inclusive) and stop (exclusive) index of the chunk
+
+    Returns
+    -------
+    :
+        Branded variable of each record in the chunk
+    """
+    if _records is None:
+        msg = "No records were inherited, was the worker initialised with them?"
+        raise AssertionError(msg)
+
+    start, stop = bounds
+    variable_names, cell_methods, dimensions = _records
+
+    return map_chunk(
+        (variable_names[start:stop], cell_methods[start:stop], dimensions[start:stop])
+    )
+
+
+def map_to_cmip_branded_variables_parallel(  # noqa: PLR0913
+    variable_names: Sequence[str],
+    cell_methods: Sequence[str | None],
+    dimensions: Sequence[Sequence[str] | str],
+    max_workers: int | None = None,
+    chunk_size: int = 50_000,
+    mp_context: BaseContext | None = None,
+) -> list[str]:
+    """
+    Map many records of CMIP variable information into branded variables in parallel
+
+    Parameters
+    ----------
+    variable_names
+        Variable name of each record
+
+    cell_methods
+        Cell methods of each record
+
+    dimensions
+        Dimensions of each record
+
+    max_workers
+        Maximum number of worker processes.
+
+        Passed to [concurrent.futures.ProcessPoolExecutor][],
+        if `None`, the number of processors is used.
+
+    chunk_size
+        Maximum number of records sent to a worker at once
+
+        If there is only one chunk, the records are mapped in this process
+        (starting workers would only slow things down).
+
+    mp_context
+        Multiprocessing context to use to start the workers
+
+    Returns
+    -------
+    :
+        Branded variable of each record, in the same order as the inputs
+
+    Raises
+    ------
+    ValueError
+        The inputs are not all the same length or `chunk_size` is less than one
+    """
+    if not (len(variable_names) == len(cell_methods) == len(dimensions)):
+        msg = (
+            "variable_names, cell_methods and dimensions must all be the same length. "
+            f"Received {len(variable_names)=}, {len(cell_methods)=} "
+            f"and {len(dimensions)=}"
+        )
+        raise ValueError(msg)
+
+    if chunk_size < 1:
+        msg = f"chunk_size must be at least one. Received {chunk_size=}"
+        raise ValueError(msg)
+
+    records = (variable_names, cell_methods, dimensions)
+    if len(variable_names) <= chunk_size:
+        return map_chunk(records)
+
+    context = mp_context if mp_context is not None else multiprocessing.get_context()
+    bounds = [
+        (start, start + chunk_size)
+        for start in range(0, len(variable_names), chunk_size)
+    ]
+    if context.get_start_method() == "fork":
+        # Forked workers inherit the initialiser's arguments without pickling
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=initialise_worker,
+            initargs=(records,),
+        ) as executor:
+            # Executor.map returns the results in the order of the chunks
+            return list(
+                itertools.chain.from_iterable(executor.map(map_chunk_bounds, bounds))
+            )
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        chunks = (
+            (
+                variable_names[start:stop],
+                cell_methods[start:stop],
+                dimensions[start:stop],
+            )
+            for start, stop in bounds
+        )
+        return list(itertools.chain.from_iterable(executor.map(map_chunk, chunks)))
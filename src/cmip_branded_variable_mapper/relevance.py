@@ -0,0 +1,270 @@
+"""
+Which inputs can change each label
+
+Each label only depends on a small part of its inputs.
+For example, the vertical label only depends on the dimensions
+in [VERTICAL_LABEL_DIMENSIONS_MAPPER][cmip_branded_variable_mapper.vertical_label.].
+Projecting inputs onto the parts which are relevant
+before using them as cache keys means that records
+which only differ in irrelevant ways (e.g. `landUse` vs. `spectband`)
+share cache entries.
+Likewise, cell methods are projected onto the clauses
+which each label actually reads
+(e.g. the area label only reads the values of the qualifiers and comments).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Literal
+
+from attrs import frozen
+
+from cmip_branded_variable_mapper.cell_methods import (
+    ParsedCellMethods,
+    parse_cell_methods_if_possible,
+)
+from cmip_branded_variable_mapper.dimension_vocabulary import tokenize_dimensions
+from cmip_branded_variable_mapper.horizontal_label import HORIZONTAL_LABEL_DIMENSIONS
+from cmip_branded_variable_mapper.mapper_classes import DimensionMapper
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+)
+
+
+@frozen
+class LabelRelevance:
+    """
+    Inputs which can change a label
+    """
+
+    dimensions: frozenset[str]
+    """
+    Dimensions which can change the label
+
+    The presence or absence of any other dimension has no effect on the label.
+    """
+
+    uses_cell_methods: bool
+    """
+    Whether the label can be changed by the cell methods
+    """
+
+    cell_methods_part: Literal["temporal_text", "area_text"] | None = None
+    """
+    Part of the parsed cell methods which can change the label
+
+    This is the name of the attribute of
+    [ParsedCellMethods][cmip_branded_variable_mapper.cell_methods.]
+    which holds the relevant clauses.
+    If `None`, all of the cell methods can change the label.
+    Only used if [uses_cell_methods][(c).] is `True`.
+    """
+
+    def project_cell_methods(self, cell_methods: str | None) -> str | None:
+        """
+        Project cell methods onto the relevant clauses
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods to project
+
+        Returns
+        -------
+        :
+            Relevant clauses of the cell methods.
+
+            Passing these to the label function
+            gives the same result as passing `cell_methods`.
+            If the cell methods can't be parsed, they are returned unchanged.
+            If they can be parsed but [cell_methods_part][(c).] is `None`,
+            their canonical form is returned.
+            If [uses_cell_methods][(c).] is `False`, `None` is returned.
+
+        Examples
+        --------
+        >>> relevance = LabelRelevance(
+        ...     dimensions=frozenset(),
+        ...     uses_cell_methods=True,
+        ...     cell_methods_part="area_text",
+        ... )
+        >>> relevance.project_cell_methods("area: mean where sea time:  max")
+        'sea'
+        >>> relevance.project_cell_methods('"time: max"')
+        '"time: max"'
+        """
+        if not self.uses_cell_methods:
+            return None
+
+        cell_methods_h = parse_cell_methods_if_possible(cell_methods)
+        if not isinstance(cell_methods_h, ParsedCellMethods):
+            return cell_methods_h
+
+        if self.cell_methods_part == "temporal_text":
+            return cell_methods_h.temporal_text
+
+        if self.cell_methods_part == "area_text":
+            return cell_methods_h.area_text
+
+        return str(cell_methods_h)
+
+    def project_dimensions(self, dimensions: Iterable[str] | str) -> tuple[str, ...]:
+        """
+        Project dimensions onto the relevant dimensions
+
+        None of the labels depend on the order of the dimensions,
+        so the result is sorted to make it canonical.
+
+        Parameters
+        ----------
+        dimensions
+            Dimensions to project.
+
+            If a string is given, it is first split with
+            [tokenize_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.].
+
+        Returns
+        -------
+        :
+            Relevant dimensions, sorted
+
+        Examples
+        --------
+        >>> relevance = LabelRelevance(
+        ...     dimensions=frozenset({"time", "time1"}), uses_cell_methods=True
+        ... )
+        >>> relevance.project_dimensions(("longitude", "time1", "landUse"))
+        ('time1',)
+        >>> relevance.project_dimensions("longitude, time1, landUse")
+        ('time1',)
+        """
+        if isinstance(dimensions, str):
+            dimensions = tokenize_dimensions(dimensions)
+
+        return tuple(sorted(d for d in dimensions if d in self.dimensions))
+
+
+def get_temporal_label_relevance(
+    dimensions_mapper: DimensionMapper = TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+    cell_methods_initial_required_dimension: str = "time",
+) -> LabelRelevance:
+    """
+    Get the inputs which can change the temporal label
+
+    The parameters have the same meaning as in
+    [get_temporal_label][cmip_branded_variable_mapper.temporal_label.].
+
+    Parameters
+    ----------
+    dimensions_mapper
+        Mapper used to get values based on dimensions
+
+    cell_methods_initial_required_dimension
+        Dimension required for the result of the initial cell methods tests
+        to be used
+
+    Returns
+    -------
+    :
+        Inputs which can change the temporal label
+    """
+    return LabelRelevance(
+        dimensions=frozenset(
+            {
+                *dimensions_mapper.dimension_map,
+                cell_methods_initial_required_dimension,
+                "time4",
+            }
+        ),
+        uses_cell_methods=True,
+        cell_methods_part="temporal_text",
+    )
+
+
+def get_vertical_label_relevance(
+    dimensions_mapper: DimensionMapper = VERTICAL_LABEL_DIMENSIONS_MAPPER,
+) -> LabelRelevance:
+    """
+    Get the inputs which can change the vertical label
+
+    Parameters
+    ----------
+    dimensions_mapper
+        Mapper used to get values based on dimensions
+
+    Returns
+    -------
+    :
+        Inputs which can change the vertical label
+    """
+    return LabelRelevance(
+        dimensions=frozenset(dimensions_mapper.dimension_map),
+        uses_cell_methods=False,
+    )
+
+
+def get_horizontal_label_relevance() -> LabelRelevance:
+    """
+    Get the inputs which can change the horizontal label
+
+    Returns
+    -------
+    :
+        Inputs which can change the horizontal label
+    """
+    return LabelRelevance(
+        dimensions=frozenset(HORIZONTAL_LABEL_DIMENSIONS), uses_cell_methods=False
+    )
+
+
+def get_area_label_relevance() -> LabelRelevance:
+    """
+    Get the inputs which can change the area label
+
+    Returns
+    -------
+    :
+        Inputs which can change the area label
+    """
+    return LabelRelevance(
+        dimensions=frozenset(), uses_cell_methods=True, cell_methods_part="area_text"
+    )
+
+
+def get_default_relevance() -> dict[str, LabelRelevance]:
+    """
+    Get the inputs which can change each label, given the default mappers
+
+    Returns
+    -------
+    :
+        Inputs which can change each label, keyed by label name.
+
+        `"branded_variable"` gives the inputs which can change any label.
+
+    Examples
+    --------
+    >>> relevance = get_default_relevance()
+    >>> relevance["area_label"].dimensions
+    frozenset()
+    >>> relevance["area_label"].cell_methods_part
+    'area_text'
+    >>> "landUse" in relevance["branded_variable"].dimensions
+    False
+    """
+    res = {
+        "temporal_label": get_temporal_label_relevance(),
+        "vertical_label": get_vertical_label_relevance(),
+        "horizontal_label": get_horizontal_label_relevance(),
+        "area_label": get_area_label_relevance(),
+    }
+    res["branded_variable"] = LabelRelevance(
+        dimensions=frozenset().union(*(v.dimensions for v in res.values())),
+        uses_cell_methods=any(v.uses_cell_methods for v in res.values()),
+    )
+
+    return res
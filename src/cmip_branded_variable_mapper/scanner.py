@@ -0,0 +1,392 @@
+r"""
+Scanning of netCDF files for the branded variables of their data variables
+
+Only the header of each file is read
+(see [netcdf_header][cmip_branded_variable_mapper.netcdf_header]),
+so scanning is limited by metadata I/O, not by the volume of data.
+Headers are read concurrently by a pool of threads.
+
+The variables' coordinates are translated into CMIP dimension names
+before they are passed to the mapper
+(see [netcdf_dimensions][cmip_branded_variable_mapper.netcdf_dimensions]).
+For example, to scan a directory
+
+```sh
+cmip-branded-variable-scanner /path/to/archive -o branded-variables.csv
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import contextlib
+import functools
+import os
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from attrs import frozen
+
+from cmip_branded_variable_mapper.cli import (
+    FORMATS,
+    infer_format,
+    open_stream,
+    write_records,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.netcdf_dimensions import get_cmip_dimensions
+from cmip_branded_variable_mapper.netcdf_header import (
+    NetCDFHeader,
+    read_header,
+    read_scalar_values,
+)
+
+T = TypeVar("T")
+
+NETCDF_SUFFIXES = (".nc", ".nc4")
+"""
+Suffixes of the files which are treated as netCDF files when scanning directories
+"""
+
+
+@frozen
+class ScannedVariable:
+    """
+    A data variable found while scanning
+    """
+
+    variable_name: str
+    """
+    Name of the variable
+    """
+
+    cell_methods: str | None
+    """
+    Cell methods of the variable (`None` if it has no `cell_methods` attribute)
+    """
+
+    dimensions: tuple[str, ...]
+    """
+    CMIP names of the variable's dimensions
+    """
+
+    branded_variable: str
+    """
+    Branded variable
+    """
+
+
+@frozen
+class ScanResult:
+    """
+    Result of scanning a file
+    """
+
+    path: Path
+    """
+    Path to the file
+    """
+
+    variables: tuple[ScannedVariable, ...] = ()
+    """
+    Data variables in the file
+    """
+
+    error: str | None = None
+    """
+    Error raised while reading the file's header
+    (or translating its coordinates into CMIP dimension names), if any
+    """
+
+
+def scan_header(
+    header: NetCDFHeader,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+    scalar_values: Mapping[str, float] | None = None,
+) -> tuple[ScannedVariable, ...]:
+    """
+    Get the branded variables of the data variables in a header
+
+    Parameters
+    ----------
+    header
+        Header of a netCDF file
+
+    mapper
+        Function used to map variables to branded variables
+
+    scalar_values
+        Value of each scalar variable in the file, keyed by variable name,
+        passed to
+        [get_cmip_dimensions][cmip_branded_variable_mapper.netcdf_dimensions.]
+
+    Returns
+    -------
+    :
+        Data variables in the header
+
+    Raises
+    ------
+    UnresolvedDimensionsError
+        The CMIP dimension names of a data variable could not be worked out
+    """
+    res = []
+    for variable in header.data_variables:
+        cell_methods = variable.attributes.get("cell_methods")
+        if not isinstance(cell_methods, str):
+            cell_methods = None
+
+        dimensions = get_cmip_dimensions(header, variable, scalar_values=scalar_values)
+        res.append(
+            ScannedVariable(
+                variable_name=variable.name,
+                cell_methods=cell_methods,
+                dimensions=dimensions,
+                branded_variable=mapper(variable.name, cell_methods, dimensions),
+            )
+        )
+
+    return tuple(res)
+
+
+def scan_file(
+    path: Path,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+) -> ScanResult:
+    """
+    Scan a file for the branded variables of its data variables
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    mapper
+        Function used to map variables to branded variables
+
+    Returns
+    -------
+    :
+        Result of the scan.
+
+        If the header could not be read
+        (or the coordinates translated into CMIP dimension names),
+        the error is recorded rather than raised,
+        so one bad file doesn't stop a scan.
+    """
+    try:
+        header = read_header(path)
+        variables = scan_header(
+            header, mapper=mapper, scalar_values=read_scalar_values(path, header)
+        )
+    except (OSError, ValueError, ImportError) as exc:
+        return ScanResult(path=path, error=str(exc))
+
+    return ScanResult(path=path, variables=variables)
+
+
+def find_netcdf_files(
+    paths: Iterable[Path], suffixes: tuple[str, ...] = NETCDF_SUFFIXES
+) -> Iterator[Path]:
+    """
+    Find netCDF files
+
+    Directories are walked lazily, so files are yielded as soon as they are found.
+
+    Parameters
+    ----------
+    paths
+        Files and directories to search.
+
+        Files are always yielded, whatever their suffix.
+
+    suffixes
+        Suffixes of the files to yield when walking directories
+
+    Yields
+    ------
+    :
+        Paths to netCDF files
+    """
+    for path in paths:
+        if not path.is_dir():
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith(suffixes):
+                    yield Path(root) / file
+
+
+def iter_concurrently(
+    func: Callable[[Path], T], paths: Iterable[Path], max_workers: int | None = None
+) -> Iterator[T]:
+    """
+    Apply a function to paths concurrently, using a pool of threads
+
+    Unlike [concurrent.futures.Executor.map][],
+    only a bounded number of paths are in flight at once,
+    so memory use doesn't grow with the number of paths
+    (and `paths` can be a lazy iterator over a huge archive).
+
+    Parameters
+    ----------
+    func
+        Function to apply
+
+    paths
+        Paths to apply the function to
+
+    max_workers
+        Maximum number of threads.
+
+        If `None`, the same default as [concurrent.futures.ThreadPoolExecutor][]
+        is used.
+
+    Yields
+    ------
+    :
+        Result of applying the function to each path, in the same order as `paths`
+    """
+    if max_workers is None:
+        # The same default as ThreadPoolExecutor
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    max_in_flight = 4 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: collections.deque[Future[T]] = collections.deque()
+        for path in paths:
+            in_flight.append(executor.submit(func, path))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def scan_files(
+    paths: Iterable[Path],
+    max_workers: int | None = None,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+) -> Iterator[ScanResult]:
+    """
+    Scan files concurrently
+
+    Parameters
+    ----------
+    paths
+        Paths to the files to scan
+
+    max_workers
+        Maximum number of threads, passed to [iter_concurrently][(m).]
+
+    mapper
+        Function used to map variables to branded variables
+
+    Yields
+    ------
+    :
+        Result of scanning each file, in the same order as `paths`
+    """
+    yield from iter_concurrently(
+        functools.partial(scan_file, mapper=mapper), paths, max_workers=max_workers
+    )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Get the parser of the command-line arguments
+
+    Returns
+    -------
+    :
+        Parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="cmip-branded-variable-scanner",
+        description=(
+            "Get the branded variables of the data variables in netCDF files. "
+            "Only the files' headers are read."
+        ),
+    )
+    parser.add_argument(
+        "paths", nargs="+", type=Path, help="Files and directories to scan"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="File to write (default: standard output)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS,
+        help="Format of the output (default: inferred from the suffix, else csv)",
+    )
+    parser.add_argument(
+        "--max-workers", type=int, help="Maximum number of threads to use"
+    )
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the command-line interface
+
+    Parameters
+    ----------
+    argv
+        Command-line arguments.
+
+        If not supplied, `sys.argv[1:]` is used.
+
+    Returns
+    -------
+    :
+        Exit code (1 if any file could not be scanned)
+    """
+    args = get_parser().parse_args(argv)
+    output_format = args.output_format or infer_format(args.output)
+
+    n_errors = 0
+
+    def iter_rows() -> Iterator[dict[str, Any]]:
+        nonlocal n_errors
+        for result in scan_files(
+            find_netcdf_files(args.paths), max_workers=args.max_workers
+        ):
+            if result.error is not None:
+                n_errors += 1
+                print(f"error: {result.error}", file=sys.stderr)
+
+            for variable in result.variables:
+                yield {
+                    "path": str(result.path),
+                    "variable_name": variable.variable_name,
+                    "cell_methods": variable.cell_methods or "",
+                    "dimensions": " ".join(variable.dimensions),
+                    "branded_variable": variable.branded_variable,
+                }
+
+    with contextlib.ExitStack() as stack:
+        fh_out = stack.enter_context(open_stream(args.output, "w", sys.stdout))
+        write_records(iter_rows(), fh_out, output_format)
+
+    return 1 if n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,555 @@
+"""
+Label rules (Tables F1-F4 of Taylor et al.) as data
+
+The rules are normally taken from the module-level mappers
+(e.g. [VERTICAL_LABEL_DIMENSIONS_MAPPER][cmip_branded_variable_mapper.vertical_label.]).
+A [LabelSpec][(m).] instead holds a complete set of rules,
+so different revisions of the specification can be loaded from files
+(see [load_spec][(m).]) and switched between without changing any code.
+
+Spec files are TOML (this requires Python 3.11+ or the optional
+[tomli](https://github.com/hukkin/tomli) package) or JSON with the same structure,
+see the files in [SPEC_DIRECTORY][(m).] for examples.
+
+Building the mappers validates their keys, which gets expensive for big tables.
+[load_spec][(m).] therefore caches the built spec on disk,
+keyed by a hash of the file's content,
+so later loads of the same file skip parsing and validation entirely.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from attrs import asdict, evolve, frozen
+
+from cmip_branded_variable_mapper.area_label import (
+    AREA_LABEL_CELL_METHODS_MAPPER,
+    get_area_label,
+)
+from cmip_branded_variable_mapper.cell_methods import (
+    ParsedCellMethods,
+    parse_cell_methods_if_possible,
+)
+from cmip_branded_variable_mapper.compiled import CompiledMapper, compile_mapper
+from cmip_branded_variable_mapper.dimension_vocabulary import (
+    DIMENSION_VOCABULARY,
+    encode_dimensions,
+)
+from cmip_branded_variable_mapper.horizontal_label import (
+    get_horizontal_label_from_mask,
+)
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapper,
+    CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+from cmip_branded_variable_mapper.temporal_label import (
+    TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER,
+    TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER,
+    TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+    get_temporal_label_from_mask,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    VERTICAL_LABEL_DIMENSIONS_MAPPER,
+    get_vertical_label_from_mask,
+)
+
+SPEC_DIRECTORY: Path = Path(__file__).parent / "specs"
+"""
+Directory which holds the spec files shipped with the package
+"""
+
+DEFAULT_SPEC_VERSION: str = "2025-09-24"
+"""
+Version of the spec implemented by the module-level mappers
+"""
+
+DEFAULT_SPEC_PATH: Path = SPEC_DIRECTORY / f"taylor-et-al-{DEFAULT_SPEC_VERSION}.toml"
+"""
+Path to the spec file with the same rules as the module-level mappers
+"""
+
+CACHE_DIR_ENV_VAR: str = "CMIP_BRANDED_VARIABLE_MAPPER_CACHE_DIR"
+"""
+Environment variable which, if set, overrides the default cache directory
+"""
+
+_CACHE_FORMAT = b"cmip-branded-variable-mapper-spec-cache-v1\x00"
+"""
+Prefix of the hashed content, bump this if the pickled classes change
+
+The package version is hashed too,
+so each release (which may change the pickled classes) has its own cache.
+"""
+
+
+@frozen
+class LabelSpec:
+    """
+    Complete set of rules for deriving the labels
+
+    The attributes have the same meaning as the parameters of
+    [compile_mapper][cmip_branded_variable_mapper.compiled.].
+    """
+
+    version: str
+    """
+    Version of the spec
+    """
+
+    temporal_cell_methods_initial_mapper: CellMethodsSubStringMapper
+    """
+    Mapper to use to get the temporal label based on cell methods
+    in the 'initial' tests
+    """
+
+    temporal_cell_methods_initial_required_dimension: str
+    """
+    Dimension required for the result of the 'initial' tests to be used
+    """
+
+    temporal_dimensions_mapper: DimensionMapper
+    """
+    Mapper to use to get the temporal label based on dimensions
+    """
+
+    temporal_cell_methods_time4_mapper: CellMethodsSubStringMapper
+    """
+    Mapper to use to get the temporal label based on cell methods
+    if "time4" is in dimensions
+    """
+
+    temporal_fallback: str
+    """
+    Temporal label to use if no other conditions are matched
+    """
+
+    vertical_dimensions_mapper: DimensionMapper
+    """
+    Mapper to use to get the vertical label based on dimensions
+    """
+
+    vertical_fallback: str
+    """
+    Vertical label to use if no other conditions are matched
+    """
+
+    horizontal_fallback: str
+    """
+    Horizontal label to use if no other conditions are matched
+    """
+
+    area_cell_methods_mapper: CellMethodsSubStringMapperOrdered
+    """
+    Mapper to use to get the area label based on cell methods
+    """
+
+    area_fallback: str
+    """
+    Area label to use if no other conditions are matched
+    """
+
+    def __attrs_post_init__(self) -> None:
+        """
+        Intern the required dimension, so it is seen when dimensions are encoded
+
+        The dimensions in the mappers are interned when the mappers are built.
+        """
+        DIMENSION_VOCABULARY.intern(
+            self.temporal_cell_methods_initial_required_dimension
+        )
+
+    @classmethod
+    def from_defaults(cls) -> LabelSpec:
+        """
+        Initialise from the module-level mappers
+
+        Returns
+        -------
+        :
+            Spec with the same rules as
+            [map_to_cmip_branded_variable][cmip_branded_variable_mapper.mapper.]
+        """
+        return cls(
+            version=DEFAULT_SPEC_VERSION,
+            temporal_cell_methods_initial_mapper=(
+                TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER
+            ),
+            temporal_cell_methods_initial_required_dimension="time",
+            temporal_dimensions_mapper=TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+            temporal_cell_methods_time4_mapper=(
+                TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER
+            ),
+            temporal_fallback="ti",
+            vertical_dimensions_mapper=VERTICAL_LABEL_DIMENSIONS_MAPPER,
+            vertical_fallback="u",
+            horizontal_fallback="hm",
+            area_cell_methods_mapper=AREA_LABEL_CELL_METHODS_MAPPER,
+            area_fallback="u",
+        )
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> LabelSpec:
+        """
+        Initialise from the content of a spec file
+
+        Parameters
+        ----------
+        raw
+            Content of the spec file
+
+        Returns
+        -------
+        :
+            Initialised instance
+
+        Raises
+        ------
+        ValueError
+            A required entry is missing from `raw`
+        """
+        try:
+            temporal = raw["temporal"]
+            vertical = raw["vertical"]
+            area = raw["area"]
+
+            return cls(
+                version=str(raw["version"]),
+                temporal_cell_methods_initial_mapper=CellMethodsSubStringMapper(
+                    sub_string_map=dict(temporal["cell_methods_initial"])
+                ),
+                temporal_cell_methods_initial_required_dimension=temporal[
+                    "cell_methods_initial_required_dimension"
+                ],
+                temporal_dimensions_mapper=DimensionMapper(
+                    dimension_map=dict(temporal["dimensions"])
+                ),
+                temporal_cell_methods_time4_mapper=CellMethodsSubStringMapper(
+                    sub_string_map=dict(temporal["cell_methods_time4"])
+                ),
+                temporal_fallback=temporal["fallback"],
+                vertical_dimensions_mapper=DimensionMapper(
+                    dimension_map=dict(vertical["dimensions"])
+                ),
+                vertical_fallback=vertical["fallback"],
+                horizontal_fallback=raw["horizontal"]["fallback"],
+                area_cell_methods_mapper=CellMethodsSubStringMapperOrdered.from_unordered(
+                    dict(area["cell_methods"])
+                ),
+                area_fallback=area["fallback"],
+            )
+
+        except KeyError as exc:
+            msg = f"The spec is missing the required entry {exc}"
+            raise ValueError(msg) from exc
+
+    def compile(self, max_cached_suffixes: int = 65536) -> CompiledMapper:
+        """
+        Compile the spec into a single, specialised function
+
+        Parameters
+        ----------
+        max_cached_suffixes
+            Passed to [compile_mapper][cmip_branded_variable_mapper.compiled.]
+
+        Returns
+        -------
+        :
+            Compiled mapper
+        """
+        kwargs = asdict(self, recurse=False)
+        kwargs.pop("version")
+
+        return compile_mapper(**kwargs, max_cached_suffixes=max_cached_suffixes)
+
+    def get_labels(
+        self, cell_methods: str | None, dimensions: tuple[str, ...]
+    ) -> tuple[str, str, str, str]:
+        """
+        Get all the labels according to this spec
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods of the variable
+
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Temporal, vertical, horizontal and area label (in that order)
+        """
+        return self.get_labels_from_parsed(
+            cell_methods=parse_cell_methods_if_possible(cell_methods),
+            dimensions_mask=encode_dimensions(dimensions),
+        )
+
+    def get_labels_from_parsed(
+        self,
+        cell_methods: str | ParsedCellMethods | None,
+        dimensions_mask: int,
+    ) -> tuple[str, str, str, str]:
+        """
+        Get all the labels according to this spec from already parsed inputs
+
+        This allows the same parsed inputs to be evaluated against many specs.
+
+        Parameters
+        ----------
+        cell_methods
+            Cell methods of the variable, parsed with
+            [parse_cell_methods_if_possible][cmip_branded_variable_mapper.cell_methods.]
+
+        dimensions_mask
+            Dimensions of the variable, encoded with
+            [encode_dimensions][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+        Returns
+        -------
+        :
+            Temporal, vertical, horizontal and area label (in that order)
+        """
+        return (
+            get_temporal_label_from_mask(
+                cell_methods=cell_methods,
+                dimensions_mask=dimensions_mask,
+                cell_methods_initial_mapper=self.temporal_cell_methods_initial_mapper,
+                cell_methods_initial_required_dimension=(
+                    self.temporal_cell_methods_initial_required_dimension
+                ),
+                dimensions_mapper=self.temporal_dimensions_mapper,
+                cell_methods_time4_mapper=self.temporal_cell_methods_time4_mapper,
+                fallback=self.temporal_fallback,
+            ),
+            get_vertical_label_from_mask(
+                dimensions_mask=dimensions_mask,
+                dimensions_mapper=self.vertical_dimensions_mapper,
+                fallback=self.vertical_fallback,
+            ),
+            get_horizontal_label_from_mask(
+                dimensions_mask=dimensions_mask, fallback=self.horizontal_fallback
+            ),
+            get_area_label(
+                cell_methods=cell_methods,
+                cell_methods_mapper=self.area_cell_methods_mapper,
+                fallback=self.area_fallback,
+            ),
+        )
+
+    def map_to_cmip_branded_variable(
+        self,
+        variable_name: str,
+        cell_methods: str | None,
+        dimensions: tuple[str, ...],
+    ) -> str:
+        """
+        Map CMIP variable information into a branded variable according to this spec
+
+        Parameters
+        ----------
+        variable_name
+            Variable name
+
+        cell_methods
+            Cell methods associated with the variable
+
+        dimensions
+            Dimensions of the variable
+
+        Returns
+        -------
+        :
+            Branded variable
+        """
+        return "_".join(
+            [variable_name, "-".join(self.get_labels(cell_methods, dimensions))]
+        )
+
+
+def parse_spec_file(content: bytes, suffix: str) -> dict[str, Any]:
+    """
+    Parse the content of a spec file
+
+    Parameters
+    ----------
+    content
+        Content of the file
+
+    suffix
+        Suffix of the file, `".json"` for JSON, anything else is parsed as TOML
+
+    Returns
+    -------
+    :
+        Parsed content
+
+    Raises
+    ------
+    ImportError
+        The content is TOML, the Python version is less than 3.11
+        and tomli is not installed
+    """
+    if suffix == ".json":
+        res: dict[str, Any] = json.loads(content)
+        return res
+
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        try:
+            import tomli as tomllib
+        except ImportError as exc:
+            msg = (
+                "Reading TOML spec files on Python < 3.11 requires tomli. "
+                "Please install it "
+                "(e.g. `pip install 'cmip-branded-variable-mapper[toml]'`) "
+                "or use a JSON spec file."
+            )
+            raise ImportError(msg) from exc
+
+    return tomllib.loads(content.decode("utf-8"))
+
+
+def get_default_cache_dir() -> Path:
+    """
+    Get the default directory in which to cache loaded specs
+
+    Returns
+    -------
+    :
+        The value of [CACHE_DIR_ENV_VAR][(m).] if set,
+        otherwise `cmip-branded-variable-mapper`
+        in the user's cache directory (`$XDG_CACHE_HOME` or `~/.cache`).
+    """
+    if cache_dir := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(cache_dir)
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+
+    return base / "cmip-branded-variable-mapper"
+
+
+def get_cache_path(content: bytes, cache_dir: Path) -> Path:
+    """
+    Get the path in which a spec is cached
+
+    Parameters
+    ----------
+    content
+        Content of the spec file
+
+    cache_dir
+        Directory in which specs are cached
+
+    Returns
+    -------
+    :
+        Path to the cache file,
+        named by a hash of `content` and the version of this package
+    """
+    from importlib.metadata import version
+
+    package_version = version("cmip_branded_variable_mapper").encode()
+    key = hashlib.sha256(
+        _CACHE_FORMAT + package_version + b"\x00" + content
+    ).hexdigest()
+
+    return cache_dir / f"spec-{key}.pickle"
+
+
+def _read_cache(path: Path) -> LabelSpec | None:
+    try:
+        with open(path, "rb") as fh:
+            res = pickle.load(fh)  # noqa: S301
+    except Exception:
+        # Missing, corrupt or from an incompatible version, just rebuild it
+        return None
+
+    if not isinstance(res, LabelSpec):
+        return None
+
+    # Unpickling doesn't run __attrs_post_init__, this does
+    return evolve(res)
+
+
+def _write_cache(path: Path, spec: LabelSpec) -> None:
+    # Write then rename, so readers never see a half-written file
+    with contextlib.suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(spec, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def load_spec(
+    path: Path = DEFAULT_SPEC_PATH,
+    cache_dir: Path | None = None,
+    use_cache: bool = True,
+) -> LabelSpec:
+    """
+    Load a spec from a file
+
+    Parameters
+    ----------
+    path
+        Path to the spec file
+
+    cache_dir
+        Directory in which to cache the loaded spec.
+
+        If `None`, [get_default_cache_dir][(m).] is used.
+        The cache holds pickles, so it should only be writable by trusted users.
+        Failures to write the cache are ignored.
+
+    use_cache
+        Whether to use (and fill) the cache
+
+    Returns
+    -------
+    :
+        Loaded spec
+
+    Examples
+    --------
+    >>> spec = load_spec(use_cache=False)
+    >>> spec.map_to_cmip_branded_variable(
+    ...     variable_name="tas",
+    ...     cell_methods="area: time: mean",
+    ...     dimensions=("longitude", "latitude", "time", "height2m"),
+    ... )
+    'tas_tavg-h2m-hxy-u'
+    """
+    content = path.read_bytes()
+
+    if use_cache:
+        cache_path = get_cache_path(
+            content, cache_dir if cache_dir is not None else get_default_cache_dir()
+        )
+        if (cached := _read_cache(cache_path)) is not None:
+            return cached
+
+    res = LabelSpec.from_dict(parse_spec_file(content, suffix=path.suffix))
+
+    if use_cache:
+        _write_cache(cache_path, res)
+
+    return res
@@ -0,0 +1,475 @@
+"""
+Stamping of branded variables into netCDF files, in place
+
+The branded variable(s) of each file's data variable(s)
+are written into a global attribute (by default `branded_variable`).
+The variables' coordinates are first translated into CMIP dimension names
+(see [netcdf_dimensions][cmip_branded_variable_mapper.netcdf_dimensions]).
+Files in which they can't be translated are not stamped.
+
+For files in the classic formats, only the header is re-written.
+This is only possible if the header has room to grow,
+i.e. if there is enough free space between the end of the header
+and the start of the data
+(e.g. because the file was written with `h_minfree` or by a tool which pads headers).
+If not, the file is reported as needing a full re-write instead,
+because adding the attribute would mean moving all the data.
+
+For netCDF-4 files, the attribute is written with the optional
+[netCDF4](https://unidata.github.io/netcdf4-python/) package,
+which doesn't re-write the data either.
+
+For example, to see what would be done to the files in a directory
+
+```sh
+cmip-branded-variable-stamper /path/to/archive --dry-run
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import functools
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Callable
+
+from attrs import evolve, frozen
+
+from cmip_branded_variable_mapper.cli import (
+    FORMATS,
+    infer_format,
+    open_stream,
+    write_records,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.netcdf_dimensions import (
+    UnresolvedDimensionsError,
+)
+from cmip_branded_variable_mapper.netcdf_header import (
+    NetCDFHeader,
+    encode_classic_attribute_list,
+    encode_classic_text_attribute,
+    read_header,
+    read_scalar_values,
+)
+from cmip_branded_variable_mapper.scanner import (
+    find_netcdf_files,
+    iter_concurrently,
+    scan_header,
+)
+
+DEFAULT_ATTRIBUTE = "branded_variable"
+"""
+Default name of the global attribute in which to write the branded variable
+"""
+
+ACTIONS = ("stamp", "unchanged", "rewrite", "skip", "unresolved", "error")
+"""
+Possible actions for a file
+
+- `"stamp"`: the attribute can be (or has been) written in place
+- `"unchanged"`: the attribute already has the right value
+- `"rewrite"`: the header has no room, so the file needs a full re-write
+- `"skip"`: the file has no data variables
+- `"unresolved"`: the CMIP dimension names of a data variable
+  could not be worked out from its coordinates
+- `"error"`: the file could not be read (or written)
+"""
+
+
+@frozen
+class StampPlan:
+    """
+    What will be (or was) done to a file
+    """
+
+    path: Path
+    """
+    Path to the file
+    """
+
+    action: str
+    """
+    Action for the file (one of [ACTIONS][(m).])
+    """
+
+    value: str | None = None
+    """
+    Value of the attribute
+    """
+
+    reason: str | None = None
+    """
+    Reason for the action, if it isn't `"stamp"` or `"unchanged"`
+    """
+
+    header_size: int | None = None
+    """
+    Current size of the header in bytes (classic formats only)
+    """
+
+    new_header_size: int | None = None
+    """
+    Size of the header after stamping in bytes (classic formats only)
+    """
+
+    data_start: int | None = None
+    """
+    Offset at which the data starts (classic formats only)
+
+    The header can't grow beyond this.
+    """
+
+
+def get_stamp_value(
+    header: NetCDFHeader,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+    scalar_values: Mapping[str, float] | None = None,
+) -> str | None:
+    """
+    Get the value to stamp into a file
+
+    Parameters
+    ----------
+    header
+        Header of the file
+
+    mapper
+        Function used to map variables to branded variables
+
+    scalar_values
+        Value of each scalar variable in the file, keyed by variable name,
+        passed to [scan_header][cmip_branded_variable_mapper.scanner.]
+
+    Returns
+    -------
+    :
+        Branded variables of the file's data variables, separated by spaces.
+
+        `None` if the file has no data variables.
+
+    Raises
+    ------
+    UnresolvedDimensionsError
+        The CMIP dimension names of a data variable could not be worked out
+    """
+    branded_variables = dict.fromkeys(
+        v.branded_variable
+        for v in scan_header(header, mapper=mapper, scalar_values=scalar_values)
+    )
+    if not branded_variables:
+        return None
+
+    return " ".join(branded_variables)
+
+
+def encode_stamped_header(
+    header: NetCDFHeader, raw_header: bytes, attribute: str, value: str
+) -> bytes:
+    """
+    Encode the header of a file in one of the classic formats, with a new attribute
+
+    Everything in the header apart from the global attributes is copied as is,
+    so the variables' offsets (and hence their data) are unchanged.
+
+    Parameters
+    ----------
+    header
+        Header of the file
+
+    raw_header
+        Raw bytes of the header
+
+    attribute
+        Name of the global attribute to set
+
+    value
+        Value of the attribute
+
+    Returns
+    -------
+    :
+        Encoded header
+    """
+    if header.attribute_list_span is None:
+        msg = f"{header.format} headers can't be encoded"
+        raise TypeError(msg)
+
+    list_start, list_end = header.attribute_list_span
+    encoded_attributes = [
+        raw_header[start:end]
+        for name, (start, end) in header.attribute_spans.items()
+        if name != attribute
+    ]
+    encoded_attributes.append(
+        encode_classic_text_attribute(attribute, value, file_format=header.format)
+    )
+
+    return (
+        raw_header[:list_start]
+        + encode_classic_attribute_list(encoded_attributes, file_format=header.format)
+        + raw_header[list_end:]
+    )
+
+
+def _stamp_netcdf4(path: Path, attribute: str, value: str) -> None:
+    import netCDF4
+
+    with netCDF4.Dataset(path, "a") as ds:
+        ds.setncattr(attribute, value)
+
+
+def _plan_stamp(
+    path: Path,
+    attribute: str,
+    mapper: Callable[[str, str | None, tuple[str, ...]], str],
+) -> tuple[StampPlan, bytes | None]:
+    # Returns the plan and, for classic files which can be stamped, the new header
+    try:
+        header = read_header(path)
+        scalar_values = read_scalar_values(path, header)
+    except (OSError, ValueError, ImportError) as exc:
+        return StampPlan(path=path, action="error", reason=str(exc)), None
+
+    try:
+        value = get_stamp_value(header, mapper=mapper, scalar_values=scalar_values)
+    except UnresolvedDimensionsError as exc:
+        return StampPlan(path=path, action="unresolved", reason=str(exc)), None
+
+    if value is None:
+        return StampPlan(path=path, action="skip", reason="No data variables"), None
+
+    if header.attributes.get(attribute) == value:
+        return StampPlan(path=path, action="unchanged", value=value), None
+
+    if header.header_size is None:
+        # netCDF-4, the library handles where the attribute goes
+        return StampPlan(path=path, action="stamp", value=value), None
+
+    with open(path, "rb") as fh:
+        raw_header = fh.read(header.header_size)
+
+    new_header = encode_stamped_header(
+        header, raw_header=raw_header, attribute=attribute, value=value
+    )
+    plan = StampPlan(
+        path=path,
+        action="stamp",
+        value=value,
+        header_size=header.header_size,
+        new_header_size=len(new_header),
+        data_start=header.data_start,
+    )
+    if header.data_start is not None and len(new_header) > header.data_start:
+        plan = evolve(
+            plan,
+            action="rewrite",
+            reason=(
+                f"The header needs {len(new_header) - header.data_start} more bytes "
+                "than there is room for before the data"
+            ),
+        )
+
+    # Pad with zeros, so no trace of a longer old header is left
+    return plan, new_header + b"\x00" * max(header.header_size - len(new_header), 0)
+
+
+def stamp_file(
+    path: Path,
+    attribute: str = DEFAULT_ATTRIBUTE,
+    dry_run: bool = False,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+) -> StampPlan:
+    """
+    Stamp the branded variable into a file, in place
+
+    Parameters
+    ----------
+    path
+        Path to the file
+
+    attribute
+        Name of the global attribute in which to write the branded variable
+
+    dry_run
+        If `True`, only work out what would be done, don't write anything
+
+    mapper
+        Function used to map variables to branded variables
+
+    Returns
+    -------
+    :
+        What was done (or would be done, if `dry_run` is `True`).
+
+        Errors are recorded rather than raised, so one bad file doesn't stop a run.
+    """
+    plan, new_header = _plan_stamp(path, attribute=attribute, mapper=mapper)
+    if dry_run or plan.action != "stamp" or plan.value is None:
+        return plan
+
+    try:
+        if new_header is None:
+            _stamp_netcdf4(path, attribute=attribute, value=plan.value)
+        else:
+            with open(path, "r+b") as fh:
+                fh.write(new_header)
+
+    except (OSError, ImportError) as exc:
+        return evolve(plan, action="error", reason=str(exc))
+
+    return plan
+
+
+def stamp_files(
+    paths: Iterable[Path],
+    attribute: str = DEFAULT_ATTRIBUTE,
+    dry_run: bool = False,
+    max_workers: int | None = None,
+    mapper: Callable[
+        [str, str | None, tuple[str, ...]], str
+    ] = map_to_cmip_branded_variable,
+) -> Iterator[StampPlan]:
+    """
+    Stamp the branded variable into many files concurrently
+
+    Parameters
+    ----------
+    paths
+        Paths to the files
+
+    attribute
+        Name of the global attribute in which to write the branded variable
+
+    dry_run
+        If `True`, only work out what would be done, don't write anything
+
+    max_workers
+        Maximum number of threads,
+        passed to [iter_concurrently][cmip_branded_variable_mapper.scanner.]
+
+    mapper
+        Function used to map variables to branded variables
+
+    Yields
+    ------
+    :
+        What was done to each file, in the same order as `paths`
+    """
+    yield from iter_concurrently(
+        functools.partial(
+            stamp_file, attribute=attribute, dry_run=dry_run, mapper=mapper
+        ),
+        paths,
+        max_workers=max_workers,
+    )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Get the parser of the command-line arguments
+
+    Returns
+    -------
+    :
+        Parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="cmip-branded-variable-stamper",
+        description=(
+            "Write the branded variable into a global attribute of netCDF files, "
+            "in place. Files whose header has no room "
+            "are reported as needing a full re-write."
+        ),
+    )
+    parser.add_argument(
+        "paths", nargs="+", type=Path, help="Files and directories to stamp"
+    )
+    parser.add_argument(
+        "--attribute",
+        default=DEFAULT_ATTRIBUTE,
+        help=f"Global attribute to write (default: {DEFAULT_ATTRIBUTE})",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only write out the plan, don't change any files",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="File in which to write the plan (default: standard output)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS,
+        help="Format of the plan (default: inferred from the suffix, else csv)",
+    )
+    parser.add_argument(
+        "--max-workers", type=int, help="Maximum number of threads to use"
+    )
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the command-line interface
+
+    Parameters
+    ----------
+    argv
+        Command-line arguments.
+
+        If not supplied, `sys.argv[1:]` is used.
+
+    Returns
+    -------
+    :
+        Exit code (1 if any file needs a full re-write or could not be stamped)
+    """
+    args = get_parser().parse_args(argv)
+    output_format = args.output_format or infer_format(args.output)
+
+    n_failures = 0
+
+    def iter_rows() -> Iterator[dict[str, Any]]:
+        nonlocal n_failures
+        for plan in stamp_files(
+            find_netcdf_files(args.paths),
+            attribute=args.attribute,
+            dry_run=args.dry_run,
+            max_workers=args.max_workers,
+        ):
+            if plan.action in ("rewrite", "unresolved", "error"):
+                n_failures += 1
+
+            yield {
+                "path": str(plan.path),
+                "action": plan.action,
+                "value": plan.value or "",
+                "reason": plan.reason or "",
+                "header_size": "" if plan.header_size is None else plan.header_size,
+                "new_header_size": (
+                    "" if plan.new_header_size is None else plan.new_header_size
+                ),
+                "data_start": "" if plan.data_start is None else plan.data_start,
+            }
+
+    with contextlib.ExitStack() as stack:
+        fh_out = stack.enter_context(open_stream(args.output, "w", sys.stdout))
+        write_records(iter_rows(), fh_out, output_format)
+
+    return 1 if n_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Multi-pattern sub-string matching
+
+This is an implementation of the
+[Aho-Corasick algorithm](https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm).
+It finds all the patterns which appear in a string
+with a single pass over the string,
+rather than one pass per pattern.
+
+[iter_sub_string_pairs][(m).] uses the same automaton
+to find every pattern which is a sub-string of another pattern
+in time roughly linear in the total length of the patterns
+(plus the number of such pairs),
+rather than checking every pair of patterns.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+
+from attrs import define
+
+
+@define
+class SubStringAutomaton:
+    """
+    Automaton which finds which patterns are sub-strings of a given string
+
+    Patterns are identified by their index in
+    [patterns][(c).].
+    Where more than one pattern matches,
+    a lower index means a higher priority.
+
+    Use [from_patterns][(c).] to initialise.
+    """
+
+    patterns: tuple[str, ...]
+    """
+    Patterns to search for
+    """
+
+    goto: tuple[dict[str, int], ...]
+    """
+    Trie of the patterns
+
+    `goto[state][character]` is the state reached
+    by appending `character` to the prefix represented by `state`.
+    """
+
+    fail: tuple[int, ...]
+    """
+    Failure links
+
+    `fail[state]` is the state representing the longest proper suffix
+    of the prefix represented by `state` which is also in the trie.
+    """
+
+    outputs: tuple[tuple[int, ...], ...]
+    """
+    Indexes of the patterns which end at each state (following failure links)
+
+    The empty pattern matches everywhere, hence is only included
+    in the output of the root state.
+    """
+
+    best_output: tuple[int, ...]
+    """
+    Lowest pattern index which ends at each state, -1 if no pattern ends there
+    """
+
+    transitions: tuple[dict[str, int], ...] | None
+    """
+    Complete transition table
+
+    `transitions[state].get(character, 0)` is the next state
+    (transitions back to the root state are not stored).
+    If `None`, the transitions are derived
+    from [goto][(c).] and [fail][(c).] while searching instead.
+    """
+
+    @classmethod
+    def from_patterns(
+        cls, patterns: tuple[str, ...], build_transitions: bool = True
+    ) -> SubStringAutomaton:
+        """
+        Build the automaton from a collection of patterns
+
+        Parameters
+        ----------
+        patterns
+            Patterns to search for
+
+        build_transitions
+            Should the complete transition table be built?
+
+            This makes searching faster,
+            but costs memory proportional to the number of states
+            times the number of unique characters in the patterns.
+
+        Returns
+        -------
+        :
+            Initialised automaton
+        """
+        goto: list[dict[str, int]] = [{}]
+        ends: list[list[int]] = [[]]
+        for i, pattern in enumerate(patterns):
+            state = 0
+            for character in pattern:
+                if character not in goto[state]:
+                    goto.append({})
+                    ends.append([])
+                    goto[state][character] = len(goto) - 1
+
+                state = goto[state][character]
+
+            ends[state].append(i)
+
+        fail = [0] * len(goto)
+        outputs: list[tuple[int, ...]] = [tuple(ends[0])] + [() for _ in goto[1:]]
+        # Breadth-first, so the failure state is always processed before the state
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fail_outputs = outputs[fail[state]] if fail[state] else ()
+            if not fail_outputs:
+                outputs[state] = tuple(ends[state])
+            elif not ends[state]:
+                outputs[state] = fail_outputs
+            else:
+                outputs[state] = tuple(sorted({*ends[state], *fail_outputs}))
+
+            for character, child in goto[state].items():
+                if state:
+                    fail_state = fail[state]
+                    while fail_state and character not in goto[fail_state]:
+                        fail_state = fail[fail_state]
+
+                    fail[child] = goto[fail_state].get(character, 0)
+
+                queue.append(child)
+
+        transitions = _build_transitions(goto, fail) if build_transitions else None
+
+        best_output = [o[0] if o else -1 for o in outputs]
+        if ends[0]:
+            # The empty pattern matches whatever state we are in
+            best_output = [
+                min(ends[0][0], o) if o >= 0 else ends[0][0] for o in best_output
+            ]
+
+        return cls(
+            patterns=patterns,
+            goto=tuple(goto),
+            fail=tuple(fail),
+            outputs=tuple(outputs),
+            best_output=tuple(best_output),
+            transitions=transitions,
+        )
+
+    def first_match(self, text: str) -> int | None:
+        """
+        Get the highest priority pattern which appears in a string
+
+        Parameters
+        ----------
+        text
+            String to search
+
+        Returns
+        -------
+        :
+            Index of the highest priority pattern which appears in `text`.
+
+            If no patterns appear in `text`, `None` is returned.
+        """
+        if self.transitions is None:
+            return min(self.find_all(text), default=None)
+
+        transitions = self.transitions
+        best_output = self.best_output
+
+        best = best_output[0]
+        state = 0
+        for character in text:
+            state = transitions[state].get(character, 0)
+            match = best_output[state]
+            if match >= 0 and (best < 0 or match < best):
+                if match == 0:
+                    return 0
+
+                best = match
+
+        if best < 0:
+            return None
+
+        return best
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over every occurence of every pattern in a string
+
+        Parameters
+        ----------
+        text
+            String to search
+
+        Yields
+        ------
+        :
+            End position (exclusive) of the occurence
+            and the index of the pattern which occurs
+        """
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+
+        for i in outputs[0]:
+            yield 0, i
+
+        state = 0
+        for position, character in enumerate(text, start=1):
+            while state and character not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(character, 0)
+            if state:
+                for i in outputs[state]:
+                    yield position, i
+
+    def find_all(self, text: str) -> set[int]:
+        """
+        Find all the patterns which appear in a string
+
+        Parameters
+        ----------
+        text
+            String to search
+
+        Returns
+        -------
+        :
+            Indexes of the patterns which appear in `text`
+        """
+        return {i for _, i in self.iter_matches(text)}
+
+
+def iter_sub_string_pairs(
+    patterns: tuple[str, ...], reverse: bool = False
+) -> Iterator[tuple[int, int]]:
+    """
+    Iterate over the pairs of patterns where one is a sub-string of the other
+
+    Parameters
+    ----------
+    patterns
+        Patterns to check
+
+    reverse
+        Should the containing patterns be iterated over in reverse order?
+
+    Yields
+    ------
+    :
+        Index of the contained pattern and index of the containing pattern.
+
+        Pairs are grouped by the containing pattern, in order of its index
+        (reversed if `reverse` is `True`).
+        Within each group, the contained patterns are in order of their index.
+        A pattern is never paired with itself,
+        but duplicated patterns are paired with each other.
+
+    Examples
+    --------
+    >>> list(iter_sub_string_pairs(("time", "time: mean", "mean", "area")))
+    [(0, 1), (2, 1)]
+    """
+    automaton = SubStringAutomaton.from_patterns(patterns, build_transitions=False)
+    indexes = range(len(patterns))
+    for j in reversed(indexes) if reverse else indexes:
+        contained = automaton.find_all(patterns[j])
+        contained.discard(j)
+        for i in sorted(contained):
+            yield i, j
+
+
+def _build_transitions(
+    goto: list[dict[str, int]], fail: list[int]
+) -> tuple[dict[str, int], ...]:
+    transitions: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+    # Breadth-first, so the failure state is always processed before the state
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        transitions[state] = {**transitions[fail[state]], **goto[state]}
+        queue.extend(goto[state].values())
+
+    return tuple(transitions)
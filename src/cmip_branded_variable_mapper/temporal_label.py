@@ -4,6 +4,8 @@ Determination of the temporal label
 
 from __future__ import annotations
 
+from cmip_branded_variable_mapper.cell_methods import ParsedCellMethods
+from cmip_branded_variable_mapper.dimension_vocabulary import DIMENSION_VOCABULARY
 from cmip_branded_variable_mapper.mapper_classes import (
     CellMethodsSubStringMapper,
     DimensionMapper,
@@ -49,9 +51,11 @@ Mapper from sub-strings of cell methods to the temporal label for "time4" data
 I.e. for data which has "time4" as a dimension
 """
 
+_TIME4 = DIMENSION_VOCABULARY.intern("time4")
+
 
 def get_temporal_label(  # noqa: PLR0913
-    cell_methods: str | None,
+    cell_methods: str | ParsedCellMethods | None,
     dimensions: tuple[str, ...],
     cell_methods_initial_mapper: CellMethodsSubStringMapper = (
         TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER
@@ -77,6 +81,10 @@ def get_temporal_label(  # noqa: PLR0913
     cell_methods
         Cell methods of the variable
 
+        If parsed cell methods are given,
+        only their `temporal_text`
+        (i.e. the methods which apply to time) is checked by the cell methods mappers.
+
     dimensions
         Dimensions of the variable
 
@@ -111,6 +119,9 @@ def get_temporal_label(  # noqa: PLR0913
     :
         Temporal label to use for constructing the branded variable name
     """
+    if isinstance(cell_methods, ParsedCellMethods):
+        cell_methods = cell_methods.temporal_text
+
     if cell_methods is not None:
         # Check cell methods first
         if (match := cell_methods_initial_mapper.get_value(cell_methods)) is not None:
@@ -128,3 +139,86 @@ def get_temporal_label(  # noqa: PLR0913
             return match
 
     return fallback
+
+
+def get_temporal_label_from_mask(  # noqa: PLR0913
+    cell_methods: str | ParsedCellMethods | None,
+    dimensions_mask: int,
+    cell_methods_initial_mapper: CellMethodsSubStringMapper = (
+        TEMPORAL_LABEL_CELL_METHODS_INITIAL_TESTS_MAPPER
+    ),
+    cell_methods_initial_required_dimension: str = "time",
+    dimensions_mapper: DimensionMapper = TEMPORAL_LABEL_DIMENSIONS_MAPPER,
+    cell_methods_time4_mapper: CellMethodsSubStringMapper = (
+        TEMPORAL_LABEL_CELL_METHODS_TIME4_TESTS_MAPPER
+    ),
+    fallback: str = "ti",
+) -> str:
+    """
+    Get temporal label from dimensions encoded as a bitmask
+
+    This follows exactly the same logic as [get_temporal_label][(m).],
+    see its documentation for further details on the parameters.
+
+    Parameters
+    ----------
+    cell_methods
+        Cell methods of the variable
+
+    dimensions_mask
+        Dimensions of the variable, encoded with
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+    cell_methods_initial_mapper
+        Mapper to use to get values based on cell methods in the 'initial' tests
+
+    cell_methods_initial_required_dimension
+        Dimension required for the result of using `cell_methods_initial_mapper`
+        to be returned.
+
+        This must already be interned in
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+        when `dimensions_mask` is encoded
+        (creating a [LabelSpec][cmip_branded_variable_mapper.spec.] does this).
+
+    dimensions_mapper
+        Mapper to use to get values based on dimensions
+
+    cell_methods_time4_mapper
+        Mapper to use to get values based on cell methods if "time4" is in dimensions
+
+    fallback
+        Value to return if no other conditions are matched
+
+    Returns
+    -------
+    :
+        Temporal label to use for constructing the branded variable name
+
+    Raises
+    ------
+    ValueError
+        `cell_methods_initial_required_dimension` has not been interned
+    """
+    if isinstance(cell_methods, ParsedCellMethods):
+        cell_methods = cell_methods.temporal_text
+
+    if cell_methods is not None:
+        # Check cell methods first
+        if (match := cell_methods_initial_mapper.get_value(cell_methods)) is not None:
+            if dimensions_mask & DIMENSION_VOCABULARY.get_bit(
+                cell_methods_initial_required_dimension
+            ):
+                return match
+
+            # We matched cell methods but not the required dimension,
+            # fall through to other tests
+
+    if (match := dimensions_mapper.get_value_from_mask(dimensions_mask)) is not None:
+        return match
+
+    if cell_methods is not None and dimensions_mask & _TIME4:
+        if (match := cell_methods_time4_mapper.get_value(cell_methods)) is not None:
+            return match
+
+    return fallback
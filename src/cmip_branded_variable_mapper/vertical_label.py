@@ -97,3 +97,36 @@ def get_vertical_label(
         return match
 
     return fallback
+
+
+def get_vertical_label_from_mask(
+    dimensions_mask: int,
+    dimensions_mapper: DimensionMapper = VERTICAL_LABEL_DIMENSIONS_MAPPER,
+    fallback: str = "u",
+) -> str:
+    """
+    Get vertical label from dimensions encoded as a bitmask
+
+    This follows exactly the same logic as [get_vertical_label][(m).].
+
+    Parameters
+    ----------
+    dimensions_mask
+        Dimensions of the variable, encoded with
+        [DIMENSION_VOCABULARY][cmip_branded_variable_mapper.dimension_vocabulary.]
+
+    dimensions_mapper
+        Mapper to use to get values based on dimensions
+
+    fallback
+        Value to return if no other conditions are matched
+
+    Returns
+    -------
+    :
+        Vertical label to use for constructing the branded variable name
+    """
+    if (match := dimensions_mapper.get_value_from_mask(dimensions_mask)) is not None:
+        return match
+
+    return fallback
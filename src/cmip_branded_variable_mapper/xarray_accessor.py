@@ -0,0 +1,297 @@
+"""
+[xarray](https://docs.xarray.dev) accessor for deriving branded variables
+
+This requires the optional xarray package.
+If xarray is installed, importing this module registers the `cmip_branding`
+accessor on [xarray.Dataset][] (see also [register_accessor][(m).]), for example
+
+```python
+import xarray as xr
+
+import cmip_branded_variable_mapper.xarray_accessor  # noqa: F401
+
+ds = xr.open_mfdataset("tas_*.nc")
+ds.cmip_branding.map()
+# {'tas': 'tas_tavg-h2m-hxy-u'}
+```
+
+The data variables' coordinates are translated into CMIP dimension names
+(e.g. "lat" into "latitude" and a scalar height of 2 m into "height2m",
+see [netcdf_dimensions][cmip_branded_variable_mapper.netcdf_dimensions])
+before they are passed to the mapper.
+Only metadata and the values of scalar coordinates are used,
+so no array data is ever loaded or computed
+(which matters for datasets backed by dask, e.g. from `open_mfdataset`).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+from typing import TYPE_CHECKING, Any, Callable
+
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.netcdf_dimensions import get_cmip_dimensions
+from cmip_branded_variable_mapper.netcdf_header import NetCDFHeader, NetCDFVariable
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+ACCESSOR_NAME = "cmip_branding"
+"""
+Name under which the accessor is registered
+"""
+
+CACHE_ATTRIBUTE = "cmip_branded_variables"
+"""
+Attribute of the dataset in which the branded variables are cached
+
+The value is a JSON string holding the version of the mapper
+(see [get_mapper_version][(m).])
+and a map from data variable names to branded variables,
+so it survives being written to (and read back from) netCDF.
+"""
+
+
+def get_mapper_version(mapper: Callable[..., str]) -> str:
+    """
+    Get the version of a mapper, used to check whether cached results are valid
+
+    Parameters
+    ----------
+    mapper
+        Function used to map variables to branded variables
+
+    Returns
+    -------
+    :
+        The mapper's qualified name,
+        the version of its spec (if it is the method of a spec)
+        and the version of this package.
+
+        Mappers are identified by name,
+        so if a mapper's rules change without any of these changing,
+        pass `refresh=True` to [CMIPBrandingAccessor.map][(m).].
+    """
+    from importlib.metadata import version
+
+    from cmip_branded_variable_mapper.spec import DEFAULT_SPEC_VERSION
+
+    # Objects without a qualified name (e.g. partials) fall back to their repr
+    name = getattr(mapper, "__qualname__", None) or repr(mapper)
+    name = f"{getattr(mapper, '__module__', None)}.{name}"
+    spec_version = getattr(getattr(mapper, "__self__", None), "version", None)
+    if mapper is map_to_cmip_branded_variable:
+        spec_version = DEFAULT_SPEC_VERSION
+
+    parts = [name, str(spec_version), version("cmip_branded_variable_mapper")]
+
+    return "/".join(parts)
+
+
+def get_header(ds: xr.Dataset) -> NetCDFHeader:
+    """
+    Get the equivalent of a netCDF header from a dataset's metadata
+
+    Each data variable's non-index coordinates
+    are listed in its `coordinates` attribute,
+    as they would be in a netCDF file.
+
+    Parameters
+    ----------
+    ds
+        Dataset
+
+    Returns
+    -------
+    :
+        Header, with `"xarray"` as its format
+    """
+    variables = []
+    for name, variable in ds.variables.items():
+        attributes: dict[str, Any] = dict(variable.attrs)
+        if name in ds.data_vars:
+            coordinates = [str(k) for k in ds[name].coords if k not in ds[name].dims]
+            if coordinates:
+                attributes["coordinates"] = " ".join(coordinates)
+
+        variables.append(
+            NetCDFVariable(
+                name=str(name),
+                dimensions=tuple(str(d) for d in variable.dims),
+                attributes=attributes,
+            )
+        )
+
+    return NetCDFHeader(
+        format="xarray",
+        dimensions={str(k): int(v) for k, v in ds.sizes.items()},
+        attributes=dict(ds.attrs),
+        variables=tuple(variables),
+    )
+
+
+def get_scalar_values(ds: xr.Dataset) -> dict[str, float]:
+    """
+    Get the value of each numeric scalar coordinate of a dataset
+
+    Parameters
+    ----------
+    ds
+        Dataset
+
+    Returns
+    -------
+    :
+        Value of each numeric scalar coordinate, keyed by coordinate name
+    """
+    import numpy as np
+
+    return {
+        str(name): coordinate.values.item()
+        for name, coordinate in ds.coords.items()
+        if not coordinate.dims and np.issubdtype(coordinate.dtype, np.number)
+    }
+
+
+class CMIPBrandingAccessor:
+    """
+    Accessor for deriving the branded variables of a dataset's data variables
+    """
+
+    def __init__(self, ds: xr.Dataset) -> None:
+        """
+        Initialise the accessor
+
+        Parameters
+        ----------
+        ds
+            Dataset to which the accessor is attached
+        """
+        self._ds = ds
+        # Cached attribute value, the mapper version it was checked against
+        # and its parsed form, to avoid re-parsing
+        self._parsed_cache: tuple[str, str, dict[str, str]] | None = None
+
+    def map(
+        self,
+        refresh: bool = False,
+        mapper: Callable[
+            [str, str | None, tuple[str, ...]], str
+        ] = map_to_cmip_branded_variable,
+    ) -> dict[str, str]:
+        """
+        Get the branded variable of each data variable
+
+        The result is cached in the dataset's attributes
+        (see [CACHE_ATTRIBUTE][(m).]), so repeated calls are free.
+        The cache is ignored if the dataset's data variables have changed since
+        or it was made by a different mapper
+        (or version of the mapper, see [get_mapper_version][(m).]),
+        but not if only the variables' attributes have (use `refresh` for that).
+
+        Parameters
+        ----------
+        refresh
+            Ignore (and overwrite) any cached result
+
+        mapper
+            Function used to map variables to branded variables
+
+        Returns
+        -------
+        :
+            Branded variable of each data variable, keyed by variable name.
+
+            Variables which describe other variables
+            (e.g. bounds, see
+            [NetCDFHeader.data_variables][cmip_branded_variable_mapper.netcdf_header.])
+            are not included.
+
+        Raises
+        ------
+        UnresolvedDimensionsError
+            The CMIP dimension names of a data variable could not be worked out
+        """
+        # Only metadata (and the values of scalar coordinates) is touched,
+        # the data is never loaded
+        header = get_header(self._ds)
+        data_variables = header.data_variables
+        mapper_version = get_mapper_version(mapper)
+        if not refresh:
+            cached = self._ds.attrs.get(CACHE_ATTRIBUTE)
+            if isinstance(cached, str):
+                if (
+                    self._parsed_cache is not None
+                    and self._parsed_cache[0] is cached
+                    and self._parsed_cache[1] == mapper_version
+                ):
+                    parsed: dict[str, str] | None = self._parsed_cache[2]
+                else:
+                    parsed = _parse_cache(cached, mapper_version=mapper_version)
+
+                if parsed is not None and set(parsed) == {
+                    v.name for v in data_variables
+                }:
+                    self._parsed_cache = (cached, mapper_version, parsed)
+                    return dict(parsed)
+
+        scalar_values = get_scalar_values(self._ds)
+        res: dict[str, str] = {}
+        for variable in data_variables:
+            cell_methods = variable.attributes.get("cell_methods")
+            res[variable.name] = mapper(
+                variable.name,
+                cell_methods if isinstance(cell_methods, str) else None,
+                get_cmip_dimensions(header, variable, scalar_values=scalar_values),
+            )
+
+        cached = json.dumps({"mapper": mapper_version, "branded_variables": res})
+        self._ds.attrs[CACHE_ATTRIBUTE] = cached
+        self._parsed_cache = (cached, mapper_version, res)
+
+        return dict(res)
+
+
+def _parse_cache(cached: str, mapper_version: str) -> dict[str, str] | None:
+    # Returns `None` if the cache is invalid or was made by a different mapper
+    try:
+        raw = json.loads(cached)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(raw, dict) or raw.get("mapper") != mapper_version:
+        return None
+
+    branded_variables = raw.get("branded_variables")
+    if not isinstance(branded_variables, dict):
+        return None
+
+    return branded_variables
+
+
+def register_accessor() -> None:
+    """
+    Register the accessor on [xarray.Dataset][] (if it isn't already)
+
+    Raises
+    ------
+    ImportError
+        xarray is not installed
+    """
+    try:
+        import xarray as xr
+    except ImportError as exc:
+        msg = (
+            "The xarray accessor requires xarray. "
+            "Please install it "
+            "(e.g. `pip install 'cmip-branded-variable-mapper[xarray]'`)."
+        )
+        raise ImportError(msg) from exc
+
+    if not hasattr(xr.Dataset, ACCESSOR_NAME):
+        xr.register_dataset_accessor(ACCESSOR_NAME)(CMIPBrandingAccessor)
+
+
+with contextlib.suppress(ImportError):
+    register_accessor()
@@ -3,3 +3,144 @@ Re-useable fixtures etc. for tests
 
 See https://docs.pytest.org/en/7.1.x/reference/fixtures.html#conftest-py-sharing-fixtures-across-multiple-files
 """
+
+import struct
+
+import pytest
+
+
+def _scalar_values(variables):
+    return [value for _, _, _, *values in variables for value in values]
+
+
+def _encode_classic_netcdf(version, dimensions, attributes, variables, begin=0):
+    """
+    Encode a file in one of the classic formats
+
+    `variables` is a list of (name, dimensions, attributes) tuples,
+    or (name, dimensions, attributes, value) tuples for scalars with a value.
+    All variables are doubles.
+    The values of scalars come first in the data, starting at `begin`,
+    all other variables start straight after them.
+    """
+    size_fmt = ">Q" if version == 5 else ">I"
+    offset_fmt = ">I" if version == 1 else ">Q"
+
+    def size(n):
+        return struct.pack(size_fmt, n)
+
+    def padded(b):
+        return b + b"\x00" * (-len(b) % 4)
+
+    def name(s):
+        return size(len(s.encode())) + padded(s.encode())
+
+    def attrs(d):
+        if not d:
+            return b"\x00" * 4 + size(0)
+
+        out = struct.pack(">I", 0x0C) + size(len(d))
+        for k, v in d.items():
+            if isinstance(v, str):
+                out += (
+                    name(k) + struct.pack(">I", 2) + size(len(v)) + padded(v.encode())
+                )
+            else:
+                out += name(k) + struct.pack(">I", 4) + size(len(v))
+                out += struct.pack(f">{len(v)}i", *v)
+
+        return out
+
+    dim_names = list(dimensions)
+    out = b"CDF" + bytes([version]) + size(0)
+    out += struct.pack(">I", 0x0A) + size(len(dimensions))
+    for k, v in dimensions.items():
+        out += name(k) + size(v)
+
+    out += attrs(attributes)
+    out += struct.pack(">I", 0x0B) + size(len(variables))
+    n_values = len(_scalar_values(variables))
+    i_value = 0
+    for var_name, var_dims, var_attrs, *value in variables:
+        out += name(var_name) + size(len(var_dims))
+        for d in var_dims:
+            out += size(dim_names.index(d))
+
+        out += attrs(var_attrs) + struct.pack(">I", 6) + size(8)
+        if value:
+            out += struct.pack(offset_fmt, begin + 8 * i_value)
+            i_value += 1
+        else:
+            out += struct.pack(offset_fmt, begin + 8 * n_values)
+
+    return out
+
+
+def _write_classic_netcdf(  # noqa: PLR0913
+    path, version, dimensions, attributes, variables, data_size=64, header_padding=0
+):
+    """
+    Write a file in one of the classic formats
+
+    The data starts `header_padding` bytes after the end of the header.
+    It holds the values of any scalars,
+    then a repeating pattern (so we can check it's untouched).
+    """
+    header_size = len(
+        _encode_classic_netcdf(version, dimensions, attributes, variables)
+    )
+    path.write_bytes(
+        _encode_classic_netcdf(
+            version,
+            dimensions,
+            attributes,
+            variables,
+            begin=header_size + header_padding,
+        )
+        + b"\x00" * header_padding
+        + b"".join(struct.pack(">d", v) for v in _scalar_values(variables))
+        + bytes(range(256)) * (data_size // 256)
+        + bytes(range(data_size % 256))
+    )
+
+    return header_size
+
+
+@pytest.fixture
+def write_classic_netcdf():
+    """
+    Function which writes a netCDF file in one of the classic formats
+    """
+    return _write_classic_netcdf
+
+
+@pytest.fixture
+def tas_netcdf_spec():
+    """
+    Dimensions, attributes and variables of a typical near-surface temperature file
+    """
+    return dict(
+        dimensions={"time": 0, "lat": 2, "lon": 3, "bnds": 2},
+        attributes={"Conventions": "CF-1.7", "realization_index": (1,)},
+        variables=[
+            (
+                "time",
+                ("time",),
+                {"bounds": "time_bnds", "standard_name": "time", "axis": "T"},
+            ),
+            ("time_bnds", ("time", "bnds"), {}),
+            ("lat", ("lat",), {"standard_name": "latitude", "axis": "Y"}),
+            ("lon", ("lon",), {"standard_name": "longitude", "axis": "X"}),
+            (
+                "height",
+                (),
+                {"standard_name": "height", "units": "m", "axis": "Z"},
+                2.0,
+            ),
+            (
+                "tas",
+                ("time", "lat", "lon"),
+                {"cell_methods": "area: time: mean", "coordinates": "height"},
+            ),
+        ],
+    )
@@ -0,0 +1,138 @@
+"""
+Tests of `cmip_branded_variable_mapper.arrow`
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from cmip_branded_variable_mapper.arrow import (
+    INPUT_COLUMNS,
+    map_to_arrow_table,
+    to_categorical,
+)
+from cmip_branded_variable_mapper.bulk import (
+    BRANDED_VARIABLE_COLUMN,
+    LABEL_COLUMNS,
+    map_to_cmip_branded_variables,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return (
+        raw["Physical Parameter"].tolist(),
+        [None if pd.isnull(v) else v for v in raw["Cell Methods"]],
+        [tuple(v.split(", ")) for v in raw["Dimensions"]],
+    )
+
+
+@pytest.mark.parametrize(
+    "values, exp",
+    (
+        pytest.param(
+            ["tas", "pr", "tas"],
+            pd.Categorical.from_codes([0, 1, 0], categories=["tas", "pr"]),
+            id="strings",
+        ),
+        pytest.param(
+            [None, "area: time: mean", np.nan, "area: time: mean"],
+            pd.Categorical.from_codes([-1, 0, -1, 0], categories=["area: time: mean"]),
+            id="missing",
+        ),
+        pytest.param(
+            [("longitude", "latitude"), ["longitude", "latitude"], ("site",)],
+            pd.Categorical.from_codes(
+                [0, 0, 1], categories=["longitude latitude", "site"]
+            ),
+            id="sequences",
+        ),
+        pytest.param(
+            [("longitude", "latitude"), "longitude latitude", None, ("site",)],
+            pd.Categorical.from_codes(
+                [0, 0, -1, 1], categories=["longitude latitude", "site"]
+            ),
+            id="sequences-and-joined-strings",
+        ),
+        pytest.param(
+            [],
+            pd.Categorical.from_codes([], categories=[]),
+            id="empty",
+        ),
+    ),
+)
+def test_to_categorical(values, exp):
+    pdt.assert_extension_array_equal(to_categorical(values), exp)
+
+
+def test_to_categorical_categorical_passed_through():
+    values = pd.Categorical(["a", "b"])
+
+    assert to_categorical(values) is values
+    pdt.assert_extension_array_equal(to_categorical(pd.Series(values)), values)
+
+
+def test_pyarrow_missing(monkeypatch, test_cases):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError, match="requires pyarrow"):
+        map_to_arrow_table(*test_cases)
+
+
+def test_map_to_arrow_table(test_cases):
+    pa = pytest.importorskip("pyarrow")
+
+    res = map_to_arrow_table(*test_cases)
+
+    assert res.column_names == [
+        *INPUT_COLUMNS,
+        BRANDED_VARIABLE_COLUMN,
+        *LABEL_COLUMNS,
+    ]
+    for field in res.schema:
+        assert pa.types.is_dictionary(field.type)
+
+    # Only a few dozen distinct labels
+    assert len(res.column("temporal_label").chunk(0).dictionary) < 20
+    assert res.column(
+        BRANDED_VARIABLE_COLUMN
+    ).to_pylist() == map_to_cmip_branded_variables(*test_cases)
+    assert res.column("dimensions").to_pylist() == [" ".join(d) for d in test_cases[2]]
+
+
+def test_parquet_round_trip(tmp_path, test_cases):
+    pytest.importorskip("pyarrow")
+    from cmip_branded_variable_mapper.arrow import map_to_parquet, read_parquet
+
+    variable_names, cell_methods, dimensions = test_cases
+    # Make sure missing values survive
+    cell_methods = [None, *cell_methods[1:]]
+
+    path = tmp_path / "mapped.parquet"
+    map_to_parquet(path, variable_names, cell_methods, dimensions)
+
+    res = read_parquet(path)
+
+    for column in res.columns:
+        assert isinstance(res[column].dtype, pd.CategoricalDtype)
+
+    assert res["variable_name"].tolist() == variable_names
+    assert pd.isna(res["cell_methods"].iloc[0])
+    assert res["cell_methods"].iloc[1:].tolist() == cell_methods[1:]
+    assert res[BRANDED_VARIABLE_COLUMN].tolist() == map_to_cmip_branded_variables(
+        variable_names, cell_methods, dimensions
+    )
+
+    res_subset = read_parquet(path, columns=["area_label"])
+    assert res_subset.columns.tolist() == ["area_label"]
+    assert isinstance(res_subset["area_label"].dtype, pd.CategoricalDtype)
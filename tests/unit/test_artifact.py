@@ -0,0 +1,160 @@
+"""
+Tests of `cmip_branded_variable_mapper.artifact`
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.artifact import (
+    ArtifactMapper,
+    LookupArtifact,
+    build_artifact,
+)
+from cmip_branded_variable_mapper.mapper import get_labels, map_to_cmip_branded_variable
+
+TEST_DATA_DIR = Path(__file__).parents[1] / "test-data"
+
+
+@pytest.fixture(scope="module")
+def cmip7_variables():
+    raw = pd.read_csv(TEST_DATA_DIR / "CMIP7-variables-for-branding.csv")
+
+    return [
+        (
+            compound_name,
+            variable_name,
+            None if pd.isnull(cell_methods) else cell_methods,
+            tuple(dimensions.split(", ")),
+        )
+        for compound_name, variable_name, cell_methods, dimensions in zip(
+            raw["Compound Name"],
+            raw["Physical Parameter"],
+            raw["Cell Methods"],
+            raw["Dimensions"],
+        )
+    ]
+
+
+@pytest.fixture(scope="module")
+def artifact(cmip7_variables, tmp_path_factory):
+    path = tmp_path_factory.mktemp("artifact") / "cmip7.lookup"
+    compound_names, variable_names, cell_methods, dimensions = zip(*cmip7_variables)
+    build_artifact(
+        path,
+        compound_names=compound_names,
+        variable_names=variable_names,
+        cell_methods=cell_methods,
+        dimensions=dimensions,
+    )
+
+    res = LookupArtifact.from_path(path)
+    yield res
+    res.close()
+
+
+def test_artifact_matches_live_mapper(artifact, cmip7_variables):
+    assert artifact.n_records == len(cmip7_variables)
+
+    for compound_name, variable_name, cell_methods, dimensions in cmip7_variables:
+        exp = map_to_cmip_branded_variable(variable_name, cell_methods, dimensions)
+
+        assert artifact.get_by_compound_name(compound_name) == exp
+        assert artifact.get(variable_name, cell_methods, dimensions) == exp
+        assert artifact.get_labels(
+            variable_name, cell_methods, dimensions
+        ) == get_labels(cell_methods, dimensions)
+
+
+def test_artifact_unknown(artifact):
+    assert artifact.get_by_compound_name("Amon.junk") is None
+    assert artifact.get("tas", None, ("junk",)) is None
+    assert artifact.get_labels("tas", None, ("junk",)) is None
+    # No cell methods is not the same as empty cell methods
+    assert artifact.get("tas", "", ("longitude", "latitude", "time")) is None
+
+
+def test_artifact_mapper(artifact, cmip7_variables):
+    calls = []
+
+    def fallback(variable_name, cell_methods, dimensions):
+        calls.append((variable_name, cell_methods, dimensions))
+        return map_to_cmip_branded_variable(variable_name, cell_methods, dimensions)
+
+    mapper = ArtifactMapper(artifact, fallback=fallback)
+
+    _, variable_name, cell_methods, dimensions = cmip7_variables[0]
+    assert mapper.map_to_cmip_branded_variable(
+        variable_name, cell_methods, dimensions
+    ) == map_to_cmip_branded_variable(variable_name, cell_methods, dimensions)
+    assert not calls
+
+    assert (
+        mapper.map_to_cmip_branded_variable(
+            "tas", "area: time: mean", ("longitude", "latitude", "time", "junk")
+        )
+        == "tas_tavg-u-hxy-u"
+    )
+    assert calls == [
+        ("tas", "area: time: mean", ("longitude", "latitude", "time", "junk"))
+    ]
+
+
+def test_artifact_matches_fallback_edge_cases(tmp_path):
+    records = [
+        ("x", "area: mean where snow over sea_ice time: mean"),
+        ("y", "area: mean time:  maximum"),
+        ("z", '"time: max"'),
+    ]
+    dimensions = ("longitude", "latitude", "time")
+    path = tmp_path / "edge-cases.lookup"
+    build_artifact(
+        path,
+        compound_names=[f"Amon.{v}" for v, _ in records],
+        variable_names=[v for v, _ in records],
+        cell_methods=[cm for _, cm in records],
+        dimensions=[dimensions] * len(records),
+    )
+
+    artifact = LookupArtifact.from_path(path)
+    mapper = ArtifactMapper(artifact)
+    for variable_name, cell_methods in records:
+        res = artifact.get(variable_name, cell_methods, dimensions)
+
+        assert res == mapper.fallback(variable_name, cell_methods, dimensions)
+
+    assert artifact.get_by_compound_name("Amon.x") == "x_tavg-u-hxy-si"
+    artifact.close()
+
+
+def test_build_artifact_length_mismatch(tmp_path):
+    with pytest.raises(ValueError, match="must all be the same length"):
+        build_artifact(
+            tmp_path / "out.lookup",
+            compound_names=["Amon.tas"],
+            variable_names=["tas"],
+            cell_methods=[],
+            dimensions=[("time",)],
+        )
+
+
+def test_build_artifact_empty(tmp_path):
+    path = tmp_path / "empty.lookup"
+    build_artifact(
+        path, compound_names=[], variable_names=[], cell_methods=[], dimensions=[]
+    )
+
+    artifact = LookupArtifact.from_path(path)
+    assert artifact.n_records == 0
+    assert artifact.get("tas", None, ("time",)) is None
+    artifact.close()
+
+
+def test_not_an_artifact(tmp_path):
+    path = tmp_path / "junk.lookup"
+    path.write_bytes(b"junk" * 10)
+
+    with pytest.raises(ValueError, match=re.escape(f"{path} is not a lookup artifact")):
+        LookupArtifact.from_path(path)
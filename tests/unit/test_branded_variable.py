@@ -0,0 +1,109 @@
+"""
+Tests of `cmip_branded_variable_mapper.branded_variable`
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import attrs
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.branded_variable import BrandedVariable
+from cmip_branded_variable_mapper.instrumentation import instrumented
+from cmip_branded_variable_mapper.mapper import (
+    map_to_cmip_branded_variable,
+    map_to_cmip_branded_variable_record,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return [
+        (variable_name, None if pd.isnull(cm) else cm, tuple(dims.split(", ")))
+        for variable_name, cm, dims in zip(
+            raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+        )
+    ]
+
+
+def test_str_matches_mapper(test_cases):
+    for test_case in test_cases:
+        res = map_to_cmip_branded_variable_record(*test_case)
+
+        res_str = str(res)
+        assert res_str == map_to_cmip_branded_variable(*test_case)
+        # Cached
+        assert str(res) is res_str
+
+
+def test_instrumented_matches(test_cases):
+    with instrumented():
+        res = [map_to_cmip_branded_variable_record(*tc) for tc in test_cases[:50]]
+
+    assert res == [map_to_cmip_branded_variable_record(*tc) for tc in test_cases[:50]]
+
+
+def test_components():
+    res = BrandedVariable("tas", "tavg", "h2m", "hxy", "u")
+
+    assert res.labels == ("tavg", "h2m", "hxy", "u")
+    assert res.suffix == "tavg-h2m-hxy-u"
+    assert str(res) == "tas_tavg-h2m-hxy-u"
+
+
+def test_labels_interned():
+    res = BrandedVariable(*(sys.intern(v) + "" for v in ("t", "tavg", "u", "hm", "u")))
+
+    assert res.temporal_label is sys.intern("tavg")
+    assert res.vertical_label is res.area_label
+
+
+def test_eq_and_hash():
+    res = BrandedVariable("tas", "tavg", "h2m", "hxy", "u")
+    same = BrandedVariable.from_string("tas_tavg-h2m-hxy-u")
+    different = BrandedVariable("tas", "tavg", "h2m", "hxy", "lnd")
+
+    # The cache doesn't affect equality
+    str(res)
+    assert res == same
+    assert hash(res) == hash(same)
+    assert res != different
+    assert len({res, same, different}) == 2
+
+
+def test_slots_and_frozen():
+    res = BrandedVariable("tas", "tavg", "h2m", "hxy", "u")
+
+    assert not hasattr(res, "__dict__")
+    with pytest.raises(attrs.exceptions.FrozenInstanceError):
+        res.area_label = "lnd"
+
+
+@pytest.mark.parametrize(
+    "branded_variable",
+    ("tas_tavg-h2m-hxy-u", "sfcWind_tavg-h10m-hxy-u", "a_b_tpt-u-hm-u"),
+)
+def test_from_string_round_trip(branded_variable):
+    res = BrandedVariable.from_string(branded_variable)
+
+    assert str(res) == branded_variable
+    assert res == BrandedVariable(
+        branded_variable.rpartition("_")[0],
+        *branded_variable.rpartition("_")[2].split("-"),
+    )
+
+
+@pytest.mark.parametrize(
+    "branded_variable", ("tas", "tas_tavg-h2m-hxy", "_tavg-h2m-hxy-u")
+)
+def test_from_string_invalid(branded_variable):
+    with pytest.raises(ValueError, match=re.escape(f"{branded_variable=}")):
+        BrandedVariable.from_string(branded_variable)
@@ -0,0 +1,156 @@
+"""
+Tests of `cmip_branded_variable_mapper.bulk`
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.bulk import (
+    factorize_inputs,
+    map_dataframe_to_cmip_branded_variables,
+    map_to_cmip_branded_variables,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+TEST_DATA_DIR = Path(__file__).parents[1] / "test-data"
+
+
+@pytest.fixture(scope="module")
+def cmip7_variables():
+    return pd.read_csv(TEST_DATA_DIR / "CMIP7-variables-for-branding.csv")
+
+
+def test_factorize_inputs():
+    codes, uniques = factorize_inputs(
+        cell_methods=["area: time: mean", None, "area: time: mean", None],
+        dimensions=[
+            ("longitude", "latitude", "time"),
+            ["longitude", "latitude", "time"],
+            ["longitude", "latitude", "time"],
+            ("site", "time"),
+        ],
+    )
+
+    np.testing.assert_equal(codes, np.array([0, 1, 0, 2]))
+    assert uniques == [
+        ("area: time: mean", ("longitude", "latitude", "time")),
+        (None, ("longitude", "latitude", "time")),
+        (None, ("site", "time")),
+    ]
+
+
+def test_map_dataframe_matches_scalar(cmip7_variables):
+    res = map_dataframe_to_cmip_branded_variables(
+        cmip7_variables,
+        variable_name_column="Physical Parameter",
+        cell_methods_column="Cell Methods",
+        dimensions_column="Dimensions",
+        dimensions_are_strings=True,
+        dimensions_separator=",",
+    )
+
+    exp = [
+        map_to_cmip_branded_variable(
+            variable_name=row["Physical Parameter"],
+            cell_methods=row["Cell Methods"],
+            dimensions=tuple(v.strip() for v in row["Dimensions"].split(",")),
+        )
+        for _, row in cmip7_variables.iterrows()
+    ]
+
+    assert res.index.equals(cmip7_variables.index)
+    assert res["branded_variable"].tolist() == exp
+    assert (
+        res["temporal_label"]
+        + "-"
+        + res["vertical_label"]
+        + "-"
+        + res["horizontal_label"]
+        + "-"
+        + res["area_label"]
+    ).tolist() == [v.split("_", maxsplit=1)[1] for v in exp]
+
+
+def test_map_dataframe_sequence_dimensions_and_missing_cell_methods():
+    df = pd.DataFrame(
+        {
+            "variable_name": ["orog", "tas"],
+            "cell_methods": [np.nan, "area: time: mean"],
+            "dimensions": [
+                ("longitude", "latitude"),
+                ("longitude", "latitude", "time", "height2m"),
+            ],
+        },
+        index=["a", "b"],
+    )
+
+    res = map_dataframe_to_cmip_branded_variables(df)
+
+    exp = pd.DataFrame(
+        {
+            "branded_variable": ["orog_ti-u-hxy-u", "tas_tavg-h2m-hxy-u"],
+            "temporal_label": ["ti", "tavg"],
+            "vertical_label": ["u", "h2m"],
+            "horizontal_label": ["hxy", "hxy"],
+            "area_label": ["u", "u"],
+        },
+        index=["a", "b"],
+    )
+
+    pd.testing.assert_frame_equal(res, exp, check_dtype=False)
+
+
+def test_string_dimensions_match_scalar(cmip7_variables):
+    variable_names = cmip7_variables["Physical Parameter"].tolist()
+    cell_methods = [
+        None if pd.isna(cm) else cm for cm in cmip7_variables["Cell Methods"]
+    ]
+    dimensions = [d.replace(",", " ") for d in cmip7_variables["Dimensions"].tolist()]
+
+    exp = [
+        map_to_cmip_branded_variable(
+            variable_name=variable_name, cell_methods=cm, dimensions=dims
+        )
+        for variable_name, cm, dims in zip(variable_names, cell_methods, dimensions)
+    ]
+
+    res = map_to_cmip_branded_variables(
+        variable_names=variable_names,
+        cell_methods=cell_methods,
+        dimensions=dimensions,
+    )
+    assert res == exp
+    assert map_to_cmip_branded_variables(
+        ["tas"], ["area: time: mean"], ["longitude latitude time height2m"]
+    ) == ["tas_tavg-h2m-hxy-u"]
+
+    res_df = map_dataframe_to_cmip_branded_variables(
+        pd.DataFrame(
+            {
+                "variable_name": variable_names,
+                "cell_methods": cell_methods,
+                "dimensions": dimensions,
+            }
+        )
+    )
+    assert res_df["branded_variable"].tolist() == exp
+
+
+def test_map_to_cmip_branded_variables_length_mismatch():
+    with pytest.raises(
+        ValueError,
+        match=re.escape(
+            "variable_names, cell_methods and dimensions must all be the same length. "
+            "Received len(variable_names)=2, len(cell_methods)=1 "
+            "and len(dimensions)=1"
+        ),
+    ):
+        map_to_cmip_branded_variables(
+            variable_names=["tas", "pr"],
+            cell_methods=["area: time: mean"],
+            dimensions=[("longitude", "latitude", "time")],
+        )
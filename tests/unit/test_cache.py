@@ -0,0 +1,168 @@
+"""
+Tests of `cmip_branded_variable_mapper.cache`
+"""
+
+import threading
+
+import pytest
+
+from cmip_branded_variable_mapper.cache import CachedMapper, CacheInfo, LRUCache
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+
+def test_lru_cache_eviction_and_stats():
+    cache = LRUCache(maxsize=2)
+    calls = []
+
+    def compute(v):
+        def inner():
+            calls.append(v)
+            return v * 2
+
+        return inner
+
+    assert cache.get_or_compute("a", compute(1)) == 2
+    assert cache.get_or_compute("b", compute(2)) == 4
+    # Hit, "a" becomes most recently used
+    assert cache.get_or_compute("a", compute(1)) == 2
+    # Evicts "b"
+    assert cache.get_or_compute("c", compute(3)) == 6
+    assert cache.get_or_compute("b", compute(2)) == 4
+
+    assert calls == [1, 2, 3, 2]
+    assert cache.info() == CacheInfo(
+        hits=1, misses=4, evictions=2, maxsize=2, currsize=2
+    )
+
+    cache.reset_stats()
+    assert cache.info() == CacheInfo(
+        hits=0, misses=0, evictions=0, maxsize=2, currsize=2
+    )
+
+    cache.clear()
+    assert cache.info().currsize == 0
+
+
+def test_lru_cache_invalid_maxsize():
+    with pytest.raises(ValueError, match="maxsize"):
+        LRUCache(maxsize=0)
+
+
+def test_cached_mapper_list_and_tuple_share_key():
+    mapper = CachedMapper(maxsize=16)
+
+    res_tuple = mapper.map_to_cmip_branded_variable(
+        "tas", "area: time: mean", ("longitude", "latitude", "time", "height2m")
+    )
+    res_list = mapper.map_to_cmip_branded_variable(
+        "tas", "area: time: mean", ["longitude", "latitude", "time", "height2m"]
+    )
+
+    assert res_tuple == res_list == "tas_tavg-h2m-hxy-u"
+    info = mapper.cache_info()
+    assert info["map_to_cmip_branded_variable"].hits == 1
+    assert info["map_to_cmip_branded_variable"].misses == 1
+
+
+def test_cached_mapper_label_caches_shared_between_variables():
+    mapper = CachedMapper()
+
+    for variable_name in ("tas", "ts", "pr"):
+        res = mapper.map_to_cmip_branded_variable(
+            variable_name, "area: time: mean", ("longitude", "latitude", "time")
+        )
+        assert res == map_to_cmip_branded_variable(
+            variable_name, "area: time: mean", ("longitude", "latitude", "time")
+        )
+
+    info = mapper.cache_info()
+    assert info["map_to_cmip_branded_variable"].misses == 3
+    for label_cache in (
+        "get_temporal_label",
+        "get_vertical_label",
+        "get_horizontal_label",
+        "get_area_label",
+    ):
+        assert info[label_cache].misses == 1
+        assert info[label_cache].hits == 2
+
+    mapper.reset_stats()
+    assert all(v.hits == v.misses == 0 for v in mapper.cache_info().values())
+
+    mapper.cache_clear()
+    assert all(v.currsize == 0 for v in mapper.cache_info().values())
+
+
+def test_cached_mapper_thread_safe():
+    mapper = CachedMapper(maxsize=8)
+    dimensions = [("longitude", "latitude", f"time{i}") for i in ("", "1", "2", "3")]
+    errors = []
+
+    def work():
+        try:
+            for i in range(500):
+                dims = dimensions[i % len(dimensions)]
+                assert mapper.map_to_cmip_branded_variable(
+                    "v", None, dims
+                ) == map_to_cmip_branded_variable("v", None, dims)
+        except Exception as exc:  # pragma: no cover
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    info = mapper.cache_info()["map_to_cmip_branded_variable"]
+    assert info.hits + info.misses == 4 * 500
+
+
+def test_cached_mapper_irrelevant_dimensions_share_entries():
+    mapper = CachedMapper()
+
+    res_land_use = mapper.map_to_cmip_branded_variable(
+        "frac", "area: mean time: mean", ["longitude", "latitude", "landUse", "time"]
+    )
+    res_spectband = mapper.map_to_cmip_branded_variable(
+        "frac", "area: mean time: mean", ("time", "spectband", "latitude", "longitude")
+    )
+
+    assert res_land_use == res_spectband
+    info = mapper.cache_info()["map_to_cmip_branded_variable"]
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_cached_mapper_string_dimensions():
+    mapper = CachedMapper()
+
+    res = mapper.map_to_cmip_branded_variable(
+        "tas", "area: time: mean", "longitude latitude time height2m"
+    )
+
+    assert res == map_to_cmip_branded_variable(
+        "tas", "area: time: mean", "longitude latitude time height2m"
+    )
+    assert res == "tas_tavg-h2m-hxy-u"
+
+
+def test_cached_mapper_cell_methods_projection():
+    mapper = CachedMapper()
+    dimensions = ("longitude", "latitude", "time")
+
+    for cell_methods in (
+        "area: mean where sea time: mean",
+        "area: mean where sea time: maximum",
+        "area:  mean where sea  time: mean",
+    ):
+        assert mapper.map_to_cmip_branded_variable(
+            "x", cell_methods, dimensions
+        ) == map_to_cmip_branded_variable("x", cell_methods, dimensions)
+
+    info = mapper.cache_info()
+    # Only differs in whitespace, so shares every entry
+    assert info["map_to_cmip_branded_variable"].misses == 2
+    # Only the where clause is relevant
+    assert info["get_area_label"].misses == 1
+    assert info["get_temporal_label"].misses == 2
@@ -0,0 +1,177 @@
+"""
+Tests of `cmip_branded_variable_mapper.cell_methods`
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.area_label import get_area_label
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+from cmip_branded_variable_mapper.cell_methods import (
+    CellMethod,
+    CellMethodsParseError,
+    parse_cell_methods,
+)
+from cmip_branded_variable_mapper.columnar import map_to_cmip_branded_variables_columnar
+from cmip_branded_variable_mapper.horizontal_label import get_horizontal_label
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.spec import LabelSpec
+from cmip_branded_variable_mapper.temporal_label import get_temporal_label
+from cmip_branded_variable_mapper.vertical_label import get_vertical_label
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+def test_parse_climatology():
+    res = parse_cell_methods("time: mean within years time: mean over years")
+
+    assert res.methods == (
+        CellMethod(axes=("time",), method="mean", within="years"),
+        CellMethod(axes=("time",), method="mean", over="years"),
+    )
+
+
+def test_parse_where_over_and_comment():
+    res = parse_cell_methods(
+        "area: mean where sea_ice (comment: mask=siconc) "
+        "depth: sum where sea over all_area_types time: point"
+    )
+
+    assert res.methods == (
+        CellMethod(
+            axes=("area",),
+            method="mean",
+            where="sea_ice",
+            comments=("comment: mask=siconc",),
+        ),
+        CellMethod(axes=("depth",), method="sum", where="sea", over="all_area_types"),
+        CellMethod(axes=("time",), method="point"),
+    )
+    assert res.temporal_text == "time: point"
+    assert res.area_text == "sea_ice | sea | all_area_types | comment: mask=siconc"
+
+
+def test_whitespace_shares_result():
+    res = parse_cell_methods("area: time: mean where ice_sheet")
+
+    assert parse_cell_methods("  area:\ttime:  mean where\nice_sheet ") is res
+
+
+@pytest.mark.parametrize(
+    "cell_methods, error",
+    (
+        pytest.param("mean", "Expected an axis name, found 'mean'", id="no-axis"),
+        pytest.param("area: time:", "No method given", id="no-method"),
+        pytest.param("area: mean where", "No value given for 'where'", id="no-where"),
+        pytest.param("area: mean (comment", "Unbalanced parentheses", id="unbalanced"),
+        pytest.param("area: mean junk", "Unexpected token 'junk'", id="unexpected"),
+        pytest.param('"time: max"', "Invalid axis name '\"time'", id="quoted"),
+    ),
+)
+def test_parse_error(cell_methods, error):
+    with pytest.raises(CellMethodsParseError, match=re.escape(error)):
+        parse_cell_methods(cell_methods)
+
+
+def test_parsed_labels_match_string_labels():
+    raw = pd.read_csv(TEST_CASES_FILE)
+    n_parsed = 0
+    for cell_methods, dimensions in set(zip(raw["Cell Methods"], raw["Dimensions"])):
+        if pd.isnull(cell_methods):
+            continue
+
+        try:
+            parsed = parse_cell_methods(cell_methods)
+        except CellMethodsParseError:
+            continue
+
+        n_parsed += 1
+        dimensions_t = tuple(dimensions.split(", "))
+        assert get_temporal_label(parsed, dimensions_t) == get_temporal_label(
+            cell_methods, dimensions_t
+        )
+        assert get_area_label(parsed) == get_area_label(cell_methods)
+
+    assert n_parsed > 0
+
+
+@pytest.mark.parametrize(
+    "cell_methods",
+    (
+        pytest.param('"time: max"', id="quoted"),
+        pytest.param("'area: time: mean'", id="single-quoted"),
+        pytest.param("lat-lon: mean time: minimum", id="hyphen"),
+        pytest.param("area: time: mean (comment", id="unbalanced"),
+        pytest.param("time: max junk", id="unexpected"),
+    ),
+)
+def test_malformed_matches_string_labels(cell_methods):
+    dimensions = ("longitude", "latitude", "time")
+
+    with pytest.raises(CellMethodsParseError):
+        parse_cell_methods(cell_methods)
+
+    # Cell methods which can't be parsed fall back to matching on the raw string
+    exp = "-".join(
+        (
+            get_temporal_label(cell_methods, dimensions),
+            get_vertical_label(dimensions),
+            get_horizontal_label(dimensions),
+            get_area_label(cell_methods),
+        )
+    )
+    assert map_to_cmip_branded_variable("x", cell_methods, dimensions) == f"x_{exp}"
+
+
+def test_quoted_matches_string_labels():
+    res = map_to_cmip_branded_variable(
+        "x", '"time: max"', ("longitude", "latitude", "time")
+    )
+
+    assert res == "x_tmax-u-hxy-u"
+
+
+@pytest.mark.parametrize(
+    "cell_methods, exp",
+    (
+        pytest.param(
+            "area: mean where snow over sea_ice time: mean",
+            "x_tavg-u-hxy-si",
+            id="where-over",
+        ),
+        pytest.param(
+            "area: mean where sea time: mean over years",
+            "x_tavg-u-hxy-sea",
+            id="time-over",
+        ),
+        pytest.param(
+            "area: mean over land time: mean",
+            "x_tavg-u-hxy-lnd",
+            id="over-without-where",
+        ),
+        pytest.param(
+            "area: mean within sector time: mean",
+            "x_tavg-u-hxy-multi",
+            id="within-without-where",
+        ),
+    ),
+)
+def test_where_over_all_paths(cell_methods, exp):
+    dimensions = ("longitude", "latitude", "time")
+
+    assert map_to_cmip_branded_variable("x", cell_methods, dimensions) == exp
+    assert map_to_cmip_branded_variables(["x"], [cell_methods], [dimensions]) == [exp]
+    assert map_to_cmip_branded_variables_columnar(["x"], [cell_methods], [dimensions])[
+        "branded_variable"
+    ].tolist() == [exp]
+    assert (
+        LabelSpec.from_defaults().map_to_cmip_branded_variable(
+            "x", cell_methods, dimensions
+        )
+        == exp
+    )
@@ -0,0 +1,233 @@
+"""
+Tests of `cmip_branded_variable_mapper.cli`
+"""
+
+import csv
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.cli import main
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+TEST_CASES_COLUMNS = [
+    "--variable-name-column",
+    "Physical Parameter",
+    "--cell-methods-column",
+    "Cell Methods",
+    "--dimensions-column",
+    "Dimensions",
+]
+
+
+def test_csv_file(tmp_path):
+    out_file = tmp_path / "out.csv"
+
+    exit_code = main([str(TEST_CASES_FILE), "-o", str(out_file), *TEST_CASES_COLUMNS])
+
+    assert exit_code == 0
+
+    raw = pd.read_csv(TEST_CASES_FILE)
+    res = pd.read_csv(out_file)
+    pd.testing.assert_frame_equal(res.drop(columns="branded_variable"), raw)
+
+    exp = [
+        map_to_cmip_branded_variable(
+            variable_name=row["Physical Parameter"],
+            cell_methods=None
+            if pd.isnull(row["Cell Methods"])
+            else row["Cell Methods"],
+            dimensions=tuple(row["Dimensions"].split(", ")),
+        )
+        for _, row in raw.iterrows()
+    ]
+    assert res["branded_variable"].tolist() == exp
+
+
+def test_jsonl_stdin_to_csv_stdout(monkeypatch, capsys):
+    records = [
+        {
+            "variable_name": "tas",
+            "cell_methods": "area: time: mean",
+            "dimensions": ["longitude", "latitude", "time", "height2m"],
+        },
+        {"variable_name": "orog", "cell_methods": None, "dimensions": "latitude"},
+    ]
+    monkeypatch.setattr(
+        sys, "stdin", io.StringIO("\n".join(json.dumps(r) for r in records) + "\n")
+    )
+
+    exit_code = main(["--input-format", "jsonl", "--output-format", "csv"])
+
+    assert exit_code == 0
+    res = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [r["branded_variable"] for r in res] == [
+        "tas_tavg-h2m-hxy-u",
+        "orog_ti-u-hy-u",
+    ]
+
+
+def test_dimensions_separator_and_output_column(tmp_path):
+    in_file = tmp_path / "in.jsonl"
+    in_file.write_text(
+        json.dumps(
+            {"var": "hfds", "cm": "area: mean where sea time: mean", "dims": "x|y"}
+        )
+        + "\n"
+        + json.dumps({"var": "hfds", "cm": "", "dims": "longitude|latitude|time"})
+        + "\n"
+    )
+    out_file = tmp_path / "out.jsonl"
+
+    exit_code = main(
+        [
+            str(in_file),
+            "-o",
+            str(out_file),
+            "--variable-name-column",
+            "var",
+            "--cell-methods-column",
+            "cm",
+            "--dimensions-column",
+            "dims",
+            "--dimensions-separator",
+            "|",
+            "--branded-variable-column",
+            "brand",
+        ]
+    )
+
+    assert exit_code == 0
+    res = [json.loads(line) for line in out_file.read_text().splitlines()]
+    assert [r["brand"] for r in res] == ["hfds_ti-u-hm-sea", "hfds_tavg-u-hxy-u"]
+
+
+def test_dimensions_separator_is_stripped(tmp_path):
+    out_file = tmp_path / "out.csv"
+
+    exit_code = main(
+        [
+            str(TEST_CASES_FILE),
+            "-o",
+            str(out_file),
+            *TEST_CASES_COLUMNS,
+            "--dimensions-separator",
+            ",",
+        ]
+    )
+
+    assert exit_code == 0
+    raw = pd.read_csv(TEST_CASES_FILE)
+    res = pd.read_csv(out_file)
+    exp = [
+        map_to_cmip_branded_variable(
+            variable_name=variable_name,
+            cell_methods=None if pd.isnull(cell_methods) else cell_methods,
+            dimensions=tuple(dimensions.split(", ")),
+        )
+        for variable_name, cell_methods, dimensions in zip(
+            raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+        )
+    ]
+    assert res["branded_variable"].tolist() == exp
+    assert "clt_tavg-u-hxy-u" in exp
+
+
+def test_missing_column(tmp_path, capsys):
+    in_file = tmp_path / "in.csv"
+    in_file.write_text("variable_name,dimensions\ntas,time\n")
+
+    exit_code = main([str(in_file)])
+
+    assert exit_code == 1
+    assert "Record 1 has no 'cell_methods' column" in capsys.readouterr().err
+
+
+def test_jsonl_records_with_different_keys_to_csv(tmp_path):
+    in_file = tmp_path / "in.jsonl"
+    in_file.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in (
+                {
+                    "variable_name": "tas",
+                    "cell_methods": "area: time: mean",
+                    "dimensions": "longitude latitude time height2m",
+                    "comment": "first",
+                },
+                {
+                    "variable_name": "orog",
+                    "cell_methods": None,
+                    "dimensions": "longitude latitude",
+                    "extra": "dropped",
+                },
+            )
+        )
+    )
+    out_file = tmp_path / "out.csv"
+
+    with pytest.warns(UserWarning, match=re.escape("Record 2 has columns")):
+        exit_code = main([str(in_file), "-o", str(out_file)])
+
+    assert exit_code == 0
+    with open(out_file, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+
+    assert rows == [
+        {
+            "variable_name": "tas",
+            "cell_methods": "area: time: mean",
+            "dimensions": "longitude latitude time height2m",
+            "comment": "first",
+            "branded_variable": "tas_tavg-h2m-hxy-u",
+        },
+        {
+            "variable_name": "orog",
+            "cell_methods": "",
+            "dimensions": "longitude latitude",
+            "comment": "",
+            "branded_variable": "orog_ti-u-hxy-u",
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "line, reason",
+    (
+        pytest.param("{not json", "Expecting property name", id="malformed"),
+        pytest.param('["tas"]', "Expected a JSON object", id="not-an-object"),
+    ),
+)
+def test_invalid_jsonl_line(tmp_path, capsys, line, reason):
+    in_file = tmp_path / "in.jsonl"
+    in_file.write_text(
+        "\n".join(
+            [
+                json.dumps(
+                    {
+                        "variable_name": "tas",
+                        "cell_methods": "area: time: mean",
+                        "dimensions": ["time"],
+                    }
+                ),
+                "",
+                line,
+            ]
+        )
+    )
+
+    exit_code = main([str(in_file), "-o", str(tmp_path / "out.jsonl")])
+
+    assert exit_code == 1
+    err = capsys.readouterr().err
+    assert err.startswith("error: Line 3 is not a valid record.")
+    assert reason in err
@@ -0,0 +1,122 @@
+"""
+Tests of `cmip_branded_variable_mapper.columnar`
+"""
+
+import itertools
+import random
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.columnar import (
+    PRESENCE_MATRIX_COLUMNS,
+    factorize,
+    get_presence_matrix,
+    map_to_cmip_branded_variables_columnar,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+def test_factorize():
+    codes, uniques = factorize(
+        [("a", "b"), None, ["a", "b"], np.nan, ("c",)],
+    )
+
+    np.testing.assert_equal(codes, np.array([0, 1, 0, 1, 2]))
+    assert uniques == [("a", "b"), None, ("c",)]
+
+
+def test_get_presence_matrix():
+    res = get_presence_matrix(["latitude time junk", ("time4", "plev19")])
+
+    assert res.shape == (2, len(PRESENCE_MATRIX_COLUMNS))
+    assert [PRESENCE_MATRIX_COLUMNS[i] for i in np.flatnonzero(res[0])] == [
+        "time",
+        "latitude",
+    ]
+    assert set(PRESENCE_MATRIX_COLUMNS[i] for i in np.flatnonzero(res[1])) == {
+        "time4",
+        "plev19",
+    }
+
+
+def test_matches_scalar_on_test_data():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    res = map_to_cmip_branded_variables_columnar(
+        variable_names=raw["Physical Parameter"],
+        cell_methods=raw["Cell Methods"],
+        dimensions=raw["Dimensions"],
+    )
+
+    exp = [
+        map_to_cmip_branded_variable(
+            variable_name=row["Physical Parameter"],
+            cell_methods=row["Cell Methods"],
+            dimensions=tuple(v.strip() for v in row["Dimensions"].split(",")),
+        )
+        for _, row in raw.iterrows()
+    ]
+
+    assert res["branded_variable"].tolist() == exp
+
+
+def test_matches_scalar_synthetic():
+    rng = random.Random(7)  # noqa: S311
+    dimensions_pool = [
+        *PRESENCE_MATRIX_COLUMNS,
+        "landUse",
+        "spectband",
+    ]
+    cell_methods_pool = [
+        None,
+        "area: mean where land time: max",
+        "area: time: min where sea_ice",
+        "area: time: sum",
+        "area: mean where sector",
+        "area: mean (over land and sea ice) time: point",
+        "junk",
+    ]
+    n = 5000
+    variable_names = [f"v{i % 7}" for i in range(n)]
+    cell_methods = [rng.choice(cell_methods_pool) for _ in range(n)]
+    dimensions = [
+        tuple(rng.sample(dimensions_pool, rng.randint(0, 5))) for _ in range(n)
+    ]
+
+    res = map_to_cmip_branded_variables_columnar(
+        variable_names=variable_names,
+        cell_methods=cell_methods,
+        dimensions=dimensions,
+    )
+
+    exp = [
+        map_to_cmip_branded_variable(v, cm, dims)
+        for v, cm, dims in zip(variable_names, cell_methods, dimensions)
+    ]
+    assert res["branded_variable"].tolist() == exp
+    for label, label_idx in zip(
+        ("temporal_label", "vertical_label", "horizontal_label", "area_label"),
+        itertools.count(),
+    ):
+        assert isinstance(res[label].dtype, pd.CategoricalDtype)
+        assert res[label].tolist() == [
+            v.split("_", maxsplit=1)[1].split("-")[label_idx] for v in exp
+        ]
+
+
+def test_length_mismatch():
+    with pytest.raises(
+        ValueError,
+        match=re.escape("must all be the same length"),
+    ):
+        map_to_cmip_branded_variables_columnar(
+            variable_names=["tas"], cell_methods=[], dimensions=[]
+        )
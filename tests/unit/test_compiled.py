@@ -0,0 +1,137 @@
+"""
+Tests of `cmip_branded_variable_mapper.compiled`
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.compiled import compile_mapper
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return [
+        (
+            variable_name,
+            None if pd.isnull(cell_methods) else cell_methods,
+            tuple(dimensions.split(", ")),
+        )
+        for variable_name, cell_methods, dimensions in zip(
+            raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+        )
+    ]
+
+
+def test_matches_reference_on_test_data(test_cases):
+    compiled = compile_mapper()
+
+    # Twice, so we check both the derived and the remembered results
+    for _ in range(2):
+        for variable_name, cell_methods, dimensions in test_cases:
+            exp = map_to_cmip_branded_variable(variable_name, cell_methods, dimensions)
+
+            assert (
+                compiled.map_to_cmip_branded_variable(
+                    variable_name, cell_methods, dimensions
+                )
+                == exp
+            )
+            assert compiled.get_suffix(cell_methods, dimensions) == exp.split("_", 1)[1]
+
+
+def test_list_dimensions():
+    compiled = compile_mapper()
+
+    res = compiled.map_to_cmip_branded_variable(
+        "tas", "area: time: mean", ["longitude", "latitude", "time", "height2m"]
+    )
+
+    assert res == "tas_tavg-h2m-hxy-u"
+
+
+@pytest.mark.parametrize(
+    "cell_methods",
+    (
+        pytest.param("area: mean where snow over sea_ice time: mean", id="where-over"),
+        pytest.param("area: mean time:  maximum", id="whitespace"),
+        pytest.param('"time: max"', id="unparseable"),
+        pytest.param(None, id="none"),
+    ),
+)
+@pytest.mark.parametrize(
+    "dimensions",
+    (
+        pytest.param(("longitude", "latitude", "time"), id="tuple"),
+        pytest.param("longitude latitude time", id="string"),
+        pytest.param("longitude, latitude, time", id="string-commas"),
+    ),
+)
+def test_matches_reference(cell_methods, dimensions):
+    compiled = compile_mapper()
+
+    exp = map_to_cmip_branded_variable("x", cell_methods, dimensions)
+
+    assert compiled.map_to_cmip_branded_variable("x", cell_methods, dimensions) == exp
+    assert compiled.get_suffix(cell_methods, dimensions) == exp.split("_", 1)[1]
+
+
+def test_where_over():
+    compiled = compile_mapper()
+
+    res = compiled.map_to_cmip_branded_variable(
+        "x",
+        "area: mean where snow over sea_ice time: mean",
+        ("longitude", "latitude", "time"),
+    )
+
+    assert res == "x_tavg-u-hxy-si"
+
+
+def test_custom_mappers_and_fallbacks():
+    compiled = compile_mapper(
+        vertical_dimensions_mapper=DimensionMapper(dimension_map={"junk": "jnk"}),
+        vertical_fallback="vf",
+        horizontal_fallback="hf",
+        area_cell_methods_mapper=CellMethodsSubStringMapperOrdered.from_unordered({}),
+        area_fallback="af",
+    )
+
+    assert compiled.get_suffix("area: mean where sea", ("junk",)) == "ti-jnk-hf-af"
+    assert compiled.get_suffix(None, ("height2m",)) == "ti-vf-hf-af"
+    assert "_VERTICAL_DIMENSIONS = {'junk': (0, 'jnk')}" in compiled.source
+
+
+def test_dimension_priority():
+    compiled = compile_mapper()
+
+    # Only the dimensions which are present are looked up,
+    # the one which comes first in the table wins
+    for dimensions in (("time2", "time1"), ("time1", "time2")):
+        assert compiled.get_suffix(None, dimensions) == "tpt-u-hm-u"
+
+    assert compiled.get_suffix(None, ("alevel", "sdepth")) == "ti-sl-hm-u"
+    assert "'sdepth' in dims" not in compiled.source
+
+
+def test_max_cached_suffixes():
+    compiled = compile_mapper(max_cached_suffixes=1)
+
+    for dimensions in (("time",), ("time1",), ("time",)):
+        compiled.map_to_cmip_branded_variable("tas", None, dimensions)
+
+    assert compiled.map_to_cmip_branded_variable("tas", None, ("time1",)) == (
+        "tas_tpt-u-hm-u"
+    )
@@ -0,0 +1,166 @@
+"""
+Tests of `cmip_branded_variable_mapper.dimension_vocabulary`
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.dimension_vocabulary import (
+    DIMENSION_VOCABULARY,
+    NO_BIT,
+    DimensionVocabulary,
+    encode_dimensions,
+    tokenize_dimensions,
+)
+from cmip_branded_variable_mapper.horizontal_label import (
+    get_horizontal_label,
+    get_horizontal_label_from_mask,
+    get_horizontal_match_from_mask,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.temporal_label import (
+    get_temporal_label,
+    get_temporal_label_from_mask,
+)
+from cmip_branded_variable_mapper.vertical_label import (
+    get_vertical_label,
+    get_vertical_label_from_mask,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.mark.parametrize(
+    "dimensions",
+    (
+        "longitude latitude time",
+        "longitude, latitude, time",
+        "longitude,latitude,time",
+        "  longitude\tlatitude ,  time ",
+    ),
+)
+def test_tokenize_dimensions(dimensions):
+    assert tokenize_dimensions(dimensions) == ("longitude", "latitude", "time")
+
+
+def test_encode_decode():
+    vocabulary = DimensionVocabulary()
+    for dimension in ("longitude", "latitude", "time"):
+        vocabulary.intern(dimension)
+
+    mask = vocabulary.encode(("longitude", "latitude", "time"))
+    assert vocabulary.decode(mask) == ("longitude", "latitude", "time")
+
+    # All input types give the same mask
+    assert vocabulary.encode("time latitude longitude") == mask
+    assert vocabulary.encode(["latitude", "longitude", "time"]) == mask
+
+    # New dimensions get new bits, old masks are unaffected
+    vocabulary.intern("site")
+    mask_site = vocabulary.encode(("site", "time"))
+    assert vocabulary.decode(mask_site) == ("time", "site")
+    assert vocabulary.decode(mask) == ("longitude", "latitude", "time")
+
+
+def test_unknown_dimensions_are_not_interned():
+    vocabulary = DimensionVocabulary()
+    vocabulary.intern("time")
+
+    for i in range(1000):
+        assert vocabulary.encode(("time", f"unknown{i}")) == vocabulary.bits["time"]
+
+    assert vocabulary.encode(("landUse", "spectband")) == NO_BIT
+    assert list(vocabulary.bits) == ["time"]
+
+
+def test_intern_invalidates_cached_masks():
+    vocabulary = DimensionVocabulary()
+
+    assert vocabulary.encode(("site", "time")) == NO_BIT
+
+    site_bit = vocabulary.intern("site")
+
+    assert vocabulary.encode(("site", "time")) == site_bit
+
+
+def test_get_bit():
+    vocabulary = DimensionVocabulary()
+    time_bit = vocabulary.intern("time")
+
+    assert vocabulary.get_bit("time") == time_bit
+    with pytest.raises(ValueError, match=re.escape("'site' has not been interned")):
+        vocabulary.get_bit("site")
+
+    assert list(vocabulary.bits) == ["time"]
+
+
+def test_uninterned_required_dimension():
+    mask = encode_dimensions(("time",))
+
+    with pytest.raises(
+        ValueError, match=re.escape("'notInternedRequired' has not been interned")
+    ):
+        get_temporal_label_from_mask(
+            "time: max",
+            mask,
+            cell_methods_initial_required_dimension="notInternedRequired",
+        )
+
+    assert "notInternedRequired" not in DIMENSION_VOCABULARY.bits
+
+
+def test_encode_cache_is_bounded():
+    vocabulary = DimensionVocabulary(max_cached_masks=2)
+    for dimension in ("a", "b", "c"):
+        vocabulary.intern(dimension)
+
+    for dimensions in (("a",), ("b",), ("c",)):
+        vocabulary.encode(dimensions)
+
+    assert len(vocabulary._masks) <= 2
+    assert vocabulary.encode(("a", "c")) == 0b101
+
+
+def test_global_vocabulary_only_holds_rule_dimensions():
+    n_bits = len(DIMENSION_VOCABULARY.bits)
+
+    assert (
+        map_to_cmip_branded_variable(
+            "tas", "area: time: mean", ("longitude", "latitude", "time", "not_a_rule")
+        )
+        == "tas_tavg-u-hxy-u"
+    )
+    assert "not_a_rule" not in DIMENSION_VOCABULARY.bits
+    assert len(DIMENSION_VOCABULARY.bits) == n_bits
+
+
+def test_mask_label_functions_match_tuple_label_functions():
+    raw = pd.read_csv(TEST_CASES_FILE)
+    cell_methods = raw["Cell Methods"].tolist()
+    dimensions = [tokenize_dimensions(d) for d in raw["Dimensions"]]
+    # Some cases the catalogue doesn't cover
+    cell_methods.extend(["time: max", "time: max", "time: min", None])
+    dimensions.extend(
+        [
+            ("latitude", "longitude", "time4"),
+            ("xant", "yant", "time4"),
+            ("gridlatitude", "basin", "time"),
+            ("oline", "time1"),
+        ]
+    )
+
+    for cm, dims in zip(cell_methods, dimensions):
+        mask = encode_dimensions(dims)
+
+        assert get_temporal_label_from_mask(cm, mask) == get_temporal_label(cm, dims)
+        assert get_vertical_label_from_mask(mask) == get_vertical_label(dims)
+        assert get_horizontal_label_from_mask(mask) == get_horizontal_label(dims)
+        horizontal_match = get_horizontal_match_from_mask(mask)
+        assert (
+            "hm" if horizontal_match is None else horizontal_match[1]
+        ) == get_horizontal_label(dims)
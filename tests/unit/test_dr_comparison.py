@@ -0,0 +1,244 @@
+"""
+Tests of `cmip_branded_variable_mapper.dr_comparison`
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+from cmip_branded_variable_mapper.dr_comparison import (
+    SNAPSHOT_COLUMNS,
+    compare_to_dr,
+    compute_brand_dr,
+    get_discrepancy_report,
+    load_snapshot,
+    main,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return load_snapshot(TEST_CASES_FILE)
+
+
+@pytest.mark.parametrize(
+    "kwargs, exp",
+    (
+        pytest.param(
+            dict(
+                var_name="tas",
+                param_name="tas",
+                freq_name="mon",
+                cell_methods="area: time: mean",
+                dimensions=["longitude", "latitude", "time", "height2m"],
+            ),
+            "tas-tavg-h2m-hxy-u",
+            id="tas",
+        ),
+        pytest.param(
+            dict(
+                var_name="mrsos",
+                param_name="mrsos",
+                freq_name="day",
+                cell_methods="area: mean where land time: mean",
+                dimensions=["longitude", "latitude", "time", "sdepth1"],
+            ),
+            "mrsos-tavg-d10cm-hxy-lnd",
+            id="sdepth",
+        ),
+        pytest.param(
+            dict(
+                var_name="ta",
+                param_name="ta",
+                freq_name="subhrPt",
+                cell_methods="area: point time: point",
+                dimensions=["alevel", "site", "time1"],
+                extended_brand_name=True,
+            ),
+            "ta-tpt-l-hxys-u.subhrPt.site",
+            id="extended-site",
+        ),
+        pytest.param(
+            dict(
+                var_name="acabfIsGre",
+                param_name="acabf",
+                freq_name="mon",
+                cell_methods="area: mean where ice_sheet time: mean",
+                dimensions=["xgre", "ygre", "time"],
+                extended_brand_name=True,
+            ),
+            "acabf-tavg-u-hxy-is.mon.gre",
+            id="extended-greenland",
+        ),
+    ),
+)
+def test_compute_brand_dr(kwargs, exp):
+    assert compute_brand_dr(**kwargs) == exp
+
+
+def test_load_snapshot_csv(snapshot):
+    assert tuple(snapshot.columns) == SNAPSHOT_COLUMNS
+    assert len(snapshot) == len(pd.read_csv(TEST_CASES_FILE))
+
+    row = snapshot.set_index("compound_name").loc["3hr.clt"]
+    assert row["variable_name"] == "clt"
+    assert row["cell_methods"] == "area: time: mean"
+    assert row["dimensions"] == ("longitude", "latitude", "time")
+
+
+def test_load_snapshot_json(tmp_path):
+    path = tmp_path / "variables.json"
+    path.write_text(
+        json.dumps(
+            {
+                "Header": {},
+                "Compound Name": {
+                    "atmos.tas.tavg-h2m-hxy-u.mon.GLB": {
+                        "physical_parameter_name": "tas",
+                        "cell_methods": "area: time: mean",
+                        "frequency": "mon",
+                        "dimensions": "longitude latitude time height2m",
+                    },
+                    "atmos.orog.ti-u-hxy-u.fx.GLB": {
+                        "physical_parameter_name": "orog",
+                        "cell_methods": "",
+                        "frequency": "fx",
+                        "dimensions": "longitude latitude",
+                    },
+                },
+            }
+        )
+    )
+
+    res = load_snapshot(path)
+
+    exp = pd.DataFrame(
+        {
+            "compound_name": [
+                "atmos.tas.tavg-h2m-hxy-u.mon.GLB",
+                "atmos.orog.ti-u-hxy-u.fx.GLB",
+            ],
+            "variable_name": ["tas", "orog"],
+            "frequency": ["mon", "fx"],
+            "cell_methods": pd.Series(["area: time: mean", None], dtype=object),
+            "dimensions": [
+                ("longitude", "latitude", "time", "height2m"),
+                ("longitude", "latitude"),
+            ],
+        }
+    )
+    pdt.assert_frame_equal(res, exp)
+
+    comparison = compare_to_dr(res)
+    assert comparison["matches"].all()
+
+
+def test_compare_to_dr(snapshot):
+    res = compare_to_dr(snapshot)
+
+    pdt.assert_index_equal(res.index, snapshot.index)
+    assert res["branded_variable"].tolist() == map_to_cmip_branded_variables(
+        snapshot["variable_name"].tolist(),
+        snapshot["cell_methods"].tolist(),
+        snapshot["dimensions"].tolist(),
+    )
+
+    exp_dr = [
+        "_".join(brand.split("-", 1))
+        for brand in (
+            compute_brand_dr(
+                var_name="junk",
+                param_name=row.variable_name,
+                freq_name="junk",
+                cell_methods=row.cell_methods or "",
+                dimensions=row.dimensions,
+            )
+            for row in snapshot.itertuples()
+        )
+    ]
+    assert res["branded_variable_dr"].tolist() == exp_dr
+    assert (res["matches"] == (res["branded_variable"] == exp_dr)).all()
+
+
+def test_compare_to_dr_matches_scalar_mapper():
+    cell_methods = [
+        "area: mean where snow over sea_ice time: mean",
+        "area: mean time:  maximum",
+        '"area: time: mean"',
+        "area: mean (comment: over land and sea ice) time: point",
+        None,
+    ]
+    snapshot = pd.DataFrame(
+        {
+            "compound_name": [f"x{i}" for i in range(len(cell_methods))],
+            "variable_name": "x",
+            "frequency": None,
+            "cell_methods": pd.Series(cell_methods, dtype=object),
+            "dimensions": [("longitude", "latitude", "time", "height2m")]
+            * len(cell_methods),
+        }
+    )
+
+    res = compare_to_dr(snapshot)
+
+    assert res["branded_variable"].tolist() == [
+        map_to_cmip_branded_variable("x", cm, dims)
+        for cm, dims in zip(snapshot["cell_methods"], snapshot["dimensions"])
+    ]
+    assert res["branded_variable"].iloc[0] == "x_tavg-h2m-hxy-si"
+
+
+def test_compare_to_dr_parallel(snapshot):
+    pdt.assert_frame_equal(
+        compare_to_dr(snapshot, max_workers=2), compare_to_dr(snapshot)
+    )
+
+
+def test_discrepancy_report(snapshot):
+    comparison = compare_to_dr(snapshot)
+
+    res = get_discrepancy_report(comparison, n_examples=2)
+
+    assert list(res.columns) == ["label", "ours", "dr", "n_records", "examples"]
+    for _, group in res.groupby("label", sort=False):
+        assert group["n_records"].is_monotonic_decreasing
+
+    site = res.loc[(res["ours"] == "hs") & (res["dr"] == "hxys")].squeeze()
+    assert site["label"] == "horizontal_label"
+    assert (
+        site["n_records"]
+        == (
+            (comparison["horizontal_label"] == "hs")
+            & (comparison["horizontal_label_dr"] == "hxys")
+        ).sum()
+    )
+    assert len(site["examples"].split(", ")) == 2
+
+    # Every mismatched record is explained by at least one label
+    assert res["n_records"].sum() >= (~comparison["matches"]).sum()
+
+
+def test_discrepancy_report_no_discrepancies(snapshot):
+    comparison = compare_to_dr(snapshot)
+
+    res = get_discrepancy_report(comparison.loc[comparison["matches"]])
+
+    assert res.empty
+    assert list(res.columns) == ["label", "ours", "dr", "n_records", "examples"]
+
+
+def test_main(capsys):
+    assert main([str(TEST_CASES_FILE)]) == 1
+
+    out = capsys.readouterr().out
+    assert "branded variables differ" in out
+    assert "hxys" in out
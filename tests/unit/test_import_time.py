@@ -0,0 +1,140 @@
+"""
+Tests of how cheap it is to import `cmip_branded_variable_mapper`
+
+The imports are done in a fresh interpreter, so they are cold.
+What matters (and is checked) is which modules an import loads.
+Wall-clock budgets depend on the machine,
+so they are only checked if `CMIP_BRANDED_VARIABLE_MAPPER_CHECK_IMPORT_TIME`
+is set (e.g. when working on import times locally).
+"""
+
+import importlib.metadata
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cmip_branded_variable_mapper
+
+CHECK_IMPORT_TIME_ENV_VAR = "CMIP_BRANDED_VARIABLE_MAPPER_CHECK_IMPORT_TIME"
+"""
+Environment variable which turns on the checks of the import time budgets
+"""
+
+PACKAGE_IMPORT_BUDGET_US = 25_000
+"""
+Budget for importing the package, in microseconds
+
+This only includes our own code (the interpreter's start up isn't included).
+"""
+
+CLI_IMPORT_BUDGET_US = 250_000
+"""
+Budget for importing the command-line interface, in microseconds
+"""
+
+HEAVY_MODULES = {"numpy", "pandas"}
+"""
+Heavy dependencies, which are only needed for bulk operations
+"""
+
+
+def get_imported_modules(module: str) -> set[str]:
+    """
+    Get the modules which are loaded by importing a module in a fresh interpreter
+
+    Modules which the interpreter loads on start up are not included.
+    """
+    res = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "import json, sys; "
+            "before = set(sys.modules); "
+            f"import {module}; "
+            "print(json.dumps(sorted(set(sys.modules) - before)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return set(json.loads(res.stdout))
+
+
+def get_import_time_us(module: str, n_runs: int = 3) -> int:
+    """
+    Get the (fastest) cumulative import time of a module
+    """
+    times = []
+    for _ in range(n_runs):
+        res = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in res.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+
+            _, cumulative, name = line.split("|")
+            if name.strip() == module:
+                times.append(int(cumulative))
+
+    return min(times)
+
+
+@pytest.mark.parametrize(
+    "module", ("cmip_branded_variable_mapper", "cmip_branded_variable_mapper.cli")
+)
+def test_import_does_not_load_heavy_modules(module):
+    imported = get_imported_modules(module)
+
+    assert module in imported
+    assert not imported & HEAVY_MODULES
+
+
+def test_package_import_is_lazy():
+    imported = get_imported_modules("cmip_branded_variable_mapper")
+
+    assert not imported & {"attrs", "importlib.metadata", "typing"}
+    assert not any(m.startswith("cmip_branded_variable_mapper.") for m in imported)
+
+
+@pytest.mark.skipif(
+    not os.environ.get(CHECK_IMPORT_TIME_ENV_VAR),
+    reason=f"{CHECK_IMPORT_TIME_ENV_VAR} is not set",
+)
+@pytest.mark.parametrize(
+    "module, budget_us",
+    (
+        pytest.param(
+            "cmip_branded_variable_mapper", PACKAGE_IMPORT_BUDGET_US, id="package"
+        ),
+        pytest.param(
+            "cmip_branded_variable_mapper.cli", CLI_IMPORT_BUDGET_US, id="cli"
+        ),
+    ),
+)
+def test_import_time_budget(module, budget_us):
+    assert get_import_time_us(module) < budget_us
+
+
+def test_version():
+    assert cmip_branded_variable_mapper.__version__ == importlib.metadata.version(
+        "cmip_branded_variable_mapper"
+    )
+
+
+@pytest.mark.parametrize("name", cmip_branded_variable_mapper.__all__)
+def test_public_api(name):
+    assert name in dir(cmip_branded_variable_mapper)
+    assert callable(getattr(cmip_branded_variable_mapper, name))
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError, match="has no attribute 'junk'"):
+        cmip_branded_variable_mapper.junk
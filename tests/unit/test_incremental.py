@@ -0,0 +1,236 @@
+"""
+Tests of `cmip_branded_variable_mapper.incremental`
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from attrs import evolve
+
+from cmip_branded_variable_mapper.incremental import (
+    IncrementalMapper,
+    diff_specs,
+)
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapper,
+    CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+from cmip_branded_variable_mapper.spec import LabelSpec
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+DEFAULT_SPEC = LabelSpec.from_defaults()
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return (
+        raw["Physical Parameter"].tolist(),
+        [None if pd.isnull(v) else v for v in raw["Cell Methods"]],
+        [tuple(v.split(", ")) for v in raw["Dimensions"]],
+    )
+
+
+def with_vertical(spec, dimension_map):
+    return evolve(spec, vertical_dimensions_mapper=DimensionMapper(dimension_map))
+
+
+def with_area(spec, sub_string_map):
+    return evolve(
+        spec,
+        area_cell_methods_mapper=CellMethodsSubStringMapperOrdered(sub_string_map),
+    )
+
+
+vertical_map = DEFAULT_SPEC.vertical_dimensions_mapper.dimension_map
+area_map = DEFAULT_SPEC.area_cell_methods_mapper.sub_string_map
+
+
+@pytest.mark.parametrize(
+    "new_spec",
+    (
+        pytest.param(
+            with_vertical(DEFAULT_SPEC, {**vertical_map, "height2m": "h02m"}),
+            id="vertical-value",
+        ),
+        pytest.param(
+            with_vertical(
+                DEFAULT_SPEC,
+                {k: v for k, v in vertical_map.items() if k != "height10m"},
+            ),
+            id="vertical-removed",
+        ),
+        pytest.param(
+            with_vertical(
+                DEFAULT_SPEC,
+                {k: vertical_map[k] for k in reversed(list(vertical_map))},
+            ),
+            id="vertical-priorities",
+        ),
+        pytest.param(
+            with_area(
+                DEFAULT_SPEC,
+                tuple(
+                    (k, "sea" if v == "si" else v)
+                    for k, v in area_map
+                    if not k.startswith("where land")
+                ),
+            ),
+            id="area",
+        ),
+        pytest.param(
+            evolve(
+                DEFAULT_SPEC,
+                temporal_cell_methods_initial_mapper=CellMethodsSubStringMapper(
+                    {
+                        **DEFAULT_SPEC.temporal_cell_methods_initial_mapper.sub_string_map,
+                        "time: mean": "tmean",
+                    }
+                ),
+            ),
+            id="temporal-cell-methods",
+        ),
+        pytest.param(
+            evolve(DEFAULT_SPEC, vertical_fallback="uu", area_fallback="uu"),
+            id="fallbacks",
+        ),
+        pytest.param(
+            evolve(
+                DEFAULT_SPEC, temporal_cell_methods_initial_required_dimension="time1"
+            ),
+            id="required-dimension",
+        ),
+    ),
+)
+def test_update_matches_full_remap(test_cases, new_spec):
+    mapper = IncrementalMapper.from_records(*test_cases)
+    old = mapper.get_branded_variables()
+
+    res = mapper.update(new_spec)
+
+    exp = [new_spec.map_to_cmip_branded_variable(*v) for v in zip(*test_cases)]
+    assert mapper.get_branded_variables() == exp
+    assert mapper.spec is new_spec
+
+    exp_rows = [i for i, (o, n) in enumerate(zip(old, exp)) if o != n]
+    assert res.rows.tolist() == exp_rows
+    assert res.old == [old[i] for i in exp_rows]
+    assert res.new == [exp[i] for i in exp_rows]
+    # Make sure the test is meaningful
+    assert len(res) > 0
+
+
+@pytest.mark.parametrize(
+    "new_spec",
+    (
+        pytest.param(
+            evolve(
+                DEFAULT_SPEC,
+                temporal_cell_methods_initial_mapper=CellMethodsSubStringMapper(
+                    {
+                        **DEFAULT_SPEC.temporal_cell_methods_initial_mapper.sub_string_map,
+                        "time: max": "tmaxx",
+                    }
+                ),
+            ),
+            id="temporal",
+        ),
+        pytest.param(
+            with_area(
+                DEFAULT_SPEC,
+                tuple((k, "lnd2" if v == "lnd" else v) for k, v in area_map),
+            ),
+            id="area",
+        ),
+    ),
+)
+def test_update_matches_full_remap_normalised_cell_methods(new_spec):
+    cell_methods = [
+        "area: mean time:  max",
+        "time: max area: mean",
+        "area: mean  where land time: mean",
+        "time: mean area: mean where land",
+        "area: mean\twhere land time:\tmax",
+        '"area: mean where land time: max"',
+        None,
+    ]
+    records = (
+        ["x"] * len(cell_methods),
+        cell_methods,
+        [("longitude", "latitude", "time")] * len(cell_methods),
+    )
+    mapper = IncrementalMapper.from_records(*records)
+    old = mapper.get_branded_variables()
+
+    res = mapper.update(new_spec)
+
+    exp = [new_spec.map_to_cmip_branded_variable(*v) for v in zip(*records)]
+    assert mapper.get_branded_variables() == exp
+    assert res.rows.tolist() == [i for i, (o, n) in enumerate(zip(old, exp)) if o != n]
+    # Make sure the test is meaningful
+    assert len(res) >= 3
+
+
+def test_update_only_recomputes_affected(test_cases):
+    mapper = IncrementalMapper.from_records(*test_cases)
+
+    res = mapper.update(
+        with_vertical(DEFAULT_SPEC, {**vertical_map, "height2m": "h02m"})
+    )
+
+    n_with_height2m = len(
+        {(cm, dims) for cm, dims in zip(*test_cases[1:]) if "height2m" in dims}
+    )
+    assert res.n_recomputed == n_with_height2m
+    assert res.n_recomputed < len(mapper.uniques) / 10
+    assert set(res.new) == {v.replace("-h2m-", "-h02m-") for v in res.old}
+
+
+def test_update_no_change(test_cases):
+    mapper = IncrementalMapper.from_records(*test_cases)
+
+    new_spec = evolve(DEFAULT_SPEC, version="renamed")
+    assert diff_specs(DEFAULT_SPEC, new_spec).is_empty
+
+    res = mapper.update(new_spec)
+
+    assert len(res) == 0
+    assert res.n_recomputed == 0
+
+
+def test_successive_updates(test_cases):
+    mapper = IncrementalMapper.from_records(*test_cases)
+    new_spec = with_vertical(DEFAULT_SPEC, {**vertical_map, "height2m": "h02m"})
+
+    mapper.update(new_spec)
+    res = mapper.update(DEFAULT_SPEC)
+
+    assert mapper.get_branded_variables() == [
+        DEFAULT_SPEC.map_to_cmip_branded_variable(*v) for v in zip(*test_cases)
+    ]
+    assert all("-h2m-" in v for v in res.new)
+
+
+def test_diff_specs():
+    new_spec = evolve(
+        with_area(DEFAULT_SPEC, (("where ocean", "ocean"), *area_map)),
+        horizontal_fallback="hx",
+    )
+
+    res = diff_specs(DEFAULT_SPEC, new_spec)
+
+    assert res.dimensions == frozenset()
+    assert res.cell_methods_sub_strings == {"where ocean"}
+    assert res.fallbacks == ((2, DEFAULT_SPEC.horizontal_fallback),)
+
+
+def test_inconsistent_lengths():
+    with pytest.raises(ValueError, match=re.escape("len(cell_methods)=1")):
+        IncrementalMapper.from_records(["a", "b"], [None], [(), ()])
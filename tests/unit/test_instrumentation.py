@@ -0,0 +1,147 @@
+"""
+Tests of `cmip_branded_variable_mapper.instrumentation`
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from cmip_branded_variable_mapper.instrumentation import (
+    INSTRUMENTATION,
+    Instrumentation,
+    instrumented,
+    map_to_cmip_branded_variable_instrumented,
+)
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+def test_matches_reference_on_test_data():
+    raw = pd.read_csv(TEST_CASES_FILE)
+    instrumentation = Instrumentation(enabled=True)
+
+    for variable_name, cell_methods, dimensions in zip(
+        raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+    ):
+        cell_methods_h = None if pd.isnull(cell_methods) else cell_methods
+        dimensions_t = tuple(dimensions.split(", "))
+
+        res = map_to_cmip_branded_variable_instrumented(
+            variable_name, cell_methods_h, dimensions_t, instrumentation=instrumentation
+        )
+        exp = map_to_cmip_branded_variable(variable_name, cell_methods_h, dimensions_t)
+        assert res == exp
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["calls"] == raw.shape[0]
+    for label_snapshot in snapshot["labels"].values():
+        assert sum(label_snapshot["branches"].values()) == raw.shape[0]
+        assert label_snapshot["time_ns"] > 0
+
+
+def test_branches():
+    with instrumented() as instrumentation:
+        map_to_cmip_branded_variable(
+            "tasmax", "area: mean time: maximum", ("longitude", "latitude", "time")
+        )
+        map_to_cmip_branded_variable("orog", None, ("latitude",))
+        map_to_cmip_branded_variable("siline", "junk", ("siline", "time4"))
+
+    assert not INSTRUMENTATION.enabled
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["calls"] == 3
+    labels = snapshot["labels"]
+    assert labels["temporal_label"]["branches"] == {
+        "time: max -> tmax": 1,
+        "fallback": 2,
+    }
+    assert labels["vertical_label"]["fallback_fraction"] == 1.0
+    assert labels["horizontal_label"]["branches"] == {
+        "longitude latitude -> hxy": 1,
+        "latitude -> hy": 1,
+        "siline -> ht": 1,
+    }
+    assert labels["area_label"]["branches"] == {"fallback": 3}
+
+
+def test_branches_with_the_same_value():
+    with instrumented() as instrumentation:
+        for dimensions in (
+            ("longitude", "latitude", "depth100m", "time"),
+            ("longitude", "latitude", "olayer100m", "time"),
+            ("xant", "yant", "p700", "time"),
+            ("xgre", "ygre", "pl700", "time"),
+        ):
+            map_to_cmip_branded_variable("x", "area: time: mean", dimensions)
+
+    labels = instrumentation.snapshot()["labels"]
+    assert labels["vertical_label"]["branches"] == {
+        "depth100m -> d100m": 1,
+        "olayer100m -> d100m": 1,
+        "p700 -> 700hPa": 1,
+        "pl700 -> 700hPa": 1,
+    }
+    assert labels["horizontal_label"]["branches"] == {
+        "longitude latitude -> hxy": 2,
+        "xant yant -> hxy": 1,
+        "xgre ygre -> hxy": 1,
+    }
+
+
+def test_inputs_are_timed_separately():
+    instrumentation = Instrumentation(enabled=True)
+
+    map_to_cmip_branded_variable_instrumented(
+        "tas",
+        "area: time: mean",
+        ("longitude", "latitude", "time"),
+        instrumentation=instrumentation,
+    )
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["inputs"]["time_ns"] > 0
+    assert snapshot["inputs"]["mean_time_ns"] == snapshot["inputs"]["time_ns"]
+
+
+def test_string_dimensions():
+    instrumentation = Instrumentation(enabled=True)
+
+    res = map_to_cmip_branded_variable_instrumented(
+        "tas",
+        "area: time: mean",
+        "longitude latitude time height2m",
+        instrumentation=instrumentation,
+    )
+
+    assert res == "tas_tavg-h2m-hxy-u"
+    labels = instrumentation.snapshot()["labels"]
+    assert labels["temporal_label"]["branches"] == {"time -> tavg": 1}
+    assert labels["vertical_label"]["branches"] == {"height2m -> h2m": 1}
+    assert labels["horizontal_label"]["branches"] == {"longitude latitude -> hxy": 1}
+
+
+def test_disabled_records_nothing():
+    INSTRUMENTATION.reset()
+
+    map_to_cmip_branded_variable("tas", "area: time: mean", ("time",))
+
+    assert INSTRUMENTATION.snapshot()["calls"] == 0
+
+
+def test_to_json_and_reset():
+    instrumentation = Instrumentation(enabled=True)
+    map_to_cmip_branded_variable_instrumented(
+        "tas", "area: time: mean", ("time",), instrumentation=instrumentation
+    )
+
+    assert json.loads(instrumentation.to_json()) == instrumentation.snapshot()
+
+    instrumentation.reset()
+    assert instrumentation.snapshot()["calls"] == 0
+    assert instrumentation.snapshot()["inputs"]["time_ns"] == 0
+    assert instrumentation.snapshot()["labels"]["area_label"]["branches"] == {}
@@ -2,14 +2,29 @@
 Tests of `cmip_branded_variable_mapper.mapper_classes`
 """
 
+import pickle
+import random
 import re
 from contextlib import nullcontext as does_not_raise
+from pathlib import Path
 
+import pandas as pd
 import pytest
 
+from cmip_branded_variable_mapper import mapper_classes
+from cmip_branded_variable_mapper.area_label import AREA_LABEL_CELL_METHODS_MAPPER
+from cmip_branded_variable_mapper.dimension_vocabulary import encode_dimensions
 from cmip_branded_variable_mapper.mapper_classes import (
+    AUTOMATON_ENGINE_MIN_KEYS,
     CellMethodsSubStringMapper,
     CellMethodsSubStringMapperOrdered,
+    DimensionMapper,
+)
+from cmip_branded_variable_mapper.temporal_label import TEMPORAL_LABEL_DIMENSIONS_MAPPER
+from cmip_branded_variable_mapper.vertical_label import VERTICAL_LABEL_DIMENSIONS_MAPPER
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
 )
 
 
@@ -33,7 +48,13 @@ from cmip_branded_variable_mapper.mapper_classes import (
         ),
     ),
 )
-def test_cell_methods_sub_string_mapper_validator(sub_string_map, expectation):
+@pytest.mark.parametrize("validation_min_keys", (1_000_000, 0))
+def test_cell_methods_sub_string_mapper_validator(
+    sub_string_map, expectation, validation_min_keys, monkeypatch
+):
+    monkeypatch.setattr(
+        mapper_classes, "AUTOMATON_VALIDATION_MIN_KEYS", validation_min_keys
+    )
     with expectation:
         CellMethodsSubStringMapper(sub_string_map=sub_string_map)
 
@@ -64,6 +85,149 @@ def test_cell_methods_sub_string_mapper_validator(sub_string_map, expectation):
         ),
     ),
 )
-def test_cell_methods_sub_string_mapper_ordered_validator(sub_string_map, expectation):
+@pytest.mark.parametrize("validation_min_keys", (1_000_000, 0))
+def test_cell_methods_sub_string_mapper_ordered_validator(
+    sub_string_map, expectation, validation_min_keys, monkeypatch
+):
+    monkeypatch.setattr(
+        mapper_classes, "AUTOMATON_VALIDATION_MIN_KEYS", validation_min_keys
+    )
     with expectation:
         CellMethodsSubStringMapperOrdered(sub_string_map=sub_string_map)
+
+
+def test_validators_report_same_clash(monkeypatch):
+    rng = random.Random(2026)  # noqa: S311
+
+    def get_error(cls, sub_string_map, validation_min_keys):
+        monkeypatch.setattr(
+            mapper_classes, "AUTOMATON_VALIDATION_MIN_KEYS", validation_min_keys
+        )
+        try:
+            cls(sub_string_map=sub_string_map)
+        except AssertionError as exc:
+            return str(exc)
+
+        return None
+
+    for _ in range(500):
+        keys = list(
+            {
+                "".join(rng.choice("ab: ") for _ in range(rng.randint(0, 5)))
+                for _ in range(rng.randint(1, 8))
+            }
+        )
+        rng.shuffle(keys)
+
+        unordered = {k: "v" for k in keys}
+        assert get_error(CellMethodsSubStringMapper, unordered, 1_000_000) == (
+            get_error(CellMethodsSubStringMapper, unordered, 0)
+        )
+
+        ordered = tuple((k, "v") for k in keys)
+        assert get_error(CellMethodsSubStringMapperOrdered, ordered, 1_000_000) == (
+            get_error(CellMethodsSubStringMapperOrdered, ordered, 0)
+        )
+
+
+@pytest.mark.parametrize(
+    "n_keys, exp_automaton",
+    (
+        pytest.param(AUTOMATON_ENGINE_MIN_KEYS - 1, False, id="small"),
+        pytest.param(AUTOMATON_ENGINE_MIN_KEYS, True, id="large"),
+    ),
+)
+def test_cell_methods_sub_string_mapper_ordered_auto_engine(n_keys, exp_automaton):
+    mapper = CellMethodsSubStringMapperOrdered.from_unordered(
+        {f"key_{i:04d}": str(i) for i in range(n_keys)}
+    )
+
+    assert (mapper._automaton is not None) == exp_automaton
+
+
+def test_cell_methods_sub_string_mapper_ordered_engines_agree():
+    cell_methods = pd.read_csv(TEST_CASES_FILE)["Cell Methods"].tolist()
+    cell_methods.extend(["area: mean where junk", ""])
+
+    unordered_map = dict(AREA_LABEL_CELL_METHODS_MAPPER.sub_string_map)
+    scan = CellMethodsSubStringMapperOrdered.from_unordered(
+        unordered_map, engine="scan"
+    )
+    automaton = CellMethodsSubStringMapperOrdered.from_unordered(
+        unordered_map, engine="automaton"
+    )
+
+    assert [automaton.get_value(cm) for cm in cell_methods] == [
+        scan.get_value(cm) for cm in cell_methods
+    ]
+    assert [automaton.get_match(cm) for cm in cell_methods] == [
+        scan.get_match(cm) for cm in cell_methods
+    ]
+    assert [m and m[1] for m in (scan.get_match(cm) for cm in cell_methods)] == [
+        scan.get_value(cm) for cm in cell_methods
+    ]
+
+
+@pytest.mark.parametrize("engine", ("scan", "index"))
+@pytest.mark.parametrize(
+    "dimensions, exp",
+    (
+        pytest.param(("latitude", "time"), None, id="no-match"),
+        pytest.param(("latitude", "b"), "vb", id="single-match"),
+        pytest.param(("c", "b", "time"), "vb", id="priority-from-map-order"),
+        pytest.param(("c", "a", "b"), "va", id="highest-priority"),
+        pytest.param((), None, id="empty"),
+    ),
+)
+def test_dimension_mapper(engine, dimensions, exp):
+    mapper = DimensionMapper(
+        dimension_map={"a": "va", "b": "vb", "c": "vc"}, engine=engine
+    )
+
+    assert mapper.get_value(dimensions) == exp
+
+    match = mapper.get_match(dimensions)
+    if exp is None:
+        assert match is None
+    else:
+        assert match == (exp[1:], exp)
+
+
+@pytest.mark.parametrize(
+    "dimension_map",
+    (
+        pytest.param(TEMPORAL_LABEL_DIMENSIONS_MAPPER.dimension_map, id="temporal"),
+        pytest.param(VERTICAL_LABEL_DIMENSIONS_MAPPER.dimension_map, id="vertical"),
+    ),
+)
+def test_dimension_mapper_engines_agree(dimension_map):
+    dimensions = [
+        tuple(v.strip() for v in d.split(","))
+        for d in pd.read_csv(TEST_CASES_FILE)["Dimensions"]
+    ]
+
+    scan = DimensionMapper(dimension_map=dimension_map, engine="scan")
+    index = DimensionMapper(dimension_map=dimension_map, engine="index")
+
+    assert [index.get_value(d) for d in dimensions] == [
+        scan.get_value(d) for d in dimensions
+    ]
+    assert [index.get_match(d) for d in dimensions] == [
+        scan.get_match(d) for d in dimensions
+    ]
+
+
+def test_dimension_mapper_pickle():
+    mapper = DimensionMapper(dimension_map={"a": "va", "b": "vb"}, engine="scan")
+
+    # The bit indexes depend on the process, so they aren't pickled
+    assert mapper.__getstate__() == {
+        "dimension_map": {"a": "va", "b": "vb"},
+        "engine": "scan",
+    }
+
+    res = pickle.loads(pickle.dumps(mapper))  # noqa: S301
+
+    assert res == mapper
+    assert res.get_value(("b", "a")) == "va"
+    assert res.get_value_from_mask(encode_dimensions(("b",))) == "vb"
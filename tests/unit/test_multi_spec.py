@@ -0,0 +1,106 @@
+"""
+Tests of `cmip_branded_variable_mapper.multi_spec`
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from attrs import evolve
+
+from cmip_branded_variable_mapper.area_label import AREA_LABEL_CELL_METHODS_MAPPER
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+from cmip_branded_variable_mapper.mapper_classes import (
+    CellMethodsSubStringMapperOrdered,
+)
+from cmip_branded_variable_mapper.multi_spec import (
+    CHANGED_COLUMN,
+    get_version_column,
+    map_to_cmip_branded_variables_multi_spec,
+)
+from cmip_branded_variable_mapper.spec import LabelSpec
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return (
+        raw["Physical Parameter"].tolist(),
+        [None if pd.isnull(v) else v for v in raw["Cell Methods"]],
+        [tuple(v.split(", ")) for v in raw["Dimensions"]],
+    )
+
+
+@pytest.fixture(scope="module")
+def specs():
+    current = LabelSpec.from_defaults()
+    # E.g. a revision which drops the "sea ice" area labels
+    proposed = evolve(
+        current,
+        version="proposed",
+        area_cell_methods_mapper=CellMethodsSubStringMapperOrdered.from_unordered(
+            {
+                k: v
+                for k, v in AREA_LABEL_CELL_METHODS_MAPPER.sub_string_map
+                if not k.startswith("sea_ice")
+            }
+        ),
+        horizontal_fallback="hx",
+    )
+
+    return current, proposed
+
+
+def test_matches_single_spec_runs(test_cases, specs):
+    res = map_to_cmip_branded_variables_multi_spec(*test_cases, specs=specs)
+
+    assert res.columns.tolist() == [
+        *(get_version_column(spec.version) for spec in specs),
+        CHANGED_COLUMN,
+    ]
+
+    exp = {
+        spec.version: [
+            spec.map_to_cmip_branded_variable(*test_case)
+            for test_case in zip(*test_cases)
+        ]
+        for spec in specs
+    }
+    for spec in specs:
+        assert res[get_version_column(spec.version)].tolist() == exp[spec.version]
+
+    assert res[get_version_column(specs[0].version)].tolist() == (
+        map_to_cmip_branded_variables(*test_cases)
+    )
+
+    exp_changed = [a != b for a, b in zip(exp[specs[0].version], exp[specs[1].version])]
+    assert res[CHANGED_COLUMN].tolist() == exp_changed
+    # Make sure the test is meaningful
+    assert 0 < sum(exp_changed) < len(exp_changed)
+
+
+def test_single_spec(test_cases, specs):
+    res = map_to_cmip_branded_variables_multi_spec(*test_cases, specs=specs[:1])
+
+    assert not res[CHANGED_COLUMN].any()
+
+
+def test_inconsistent_lengths(specs):
+    with pytest.raises(ValueError, match=re.escape("len(cell_methods)=1")):
+        map_to_cmip_branded_variables_multi_spec(["a", "b"], [None], [(), ()], specs)
+
+
+@pytest.mark.parametrize(
+    "n_duplicates", (pytest.param(0, id="no-specs"), pytest.param(2, id="duplicates"))
+)
+def test_invalid_specs(specs, n_duplicates):
+    with pytest.raises(ValueError, match="versions must be unique"):
+        map_to_cmip_branded_variables_multi_spec(
+            ["a"], [None], [()], [specs[0]] * n_duplicates
+        )
@@ -0,0 +1,194 @@
+"""
+Tests of `cmip_branded_variable_mapper.netcdf_dimensions`
+"""
+
+import re
+
+import pytest
+
+from cmip_branded_variable_mapper.netcdf_dimensions import (
+    UnresolvedDimensionsError,
+    get_cmip_dimensions,
+)
+from cmip_branded_variable_mapper.netcdf_header import (
+    NetCDFHeader,
+    NetCDFVariable,
+)
+
+
+def get_header(dimensions, variables):
+    return NetCDFHeader(
+        format="classic",
+        dimensions=dimensions,
+        attributes={},
+        variables=tuple(NetCDFVariable(*v) for v in variables),
+    )
+
+
+def test_tas(tas_netcdf_spec):
+    header = get_header(
+        tas_netcdf_spec["dimensions"],
+        [v[:3] for v in tas_netcdf_spec["variables"]],
+    )
+    (tas,) = header.data_variables
+
+    res = get_cmip_dimensions(header, tas, scalar_values={"height": 2.0})
+
+    assert res == ("time", "latitude", "longitude", "height2m")
+
+
+@pytest.mark.parametrize(
+    "coordinate_attributes, cell_methods, exp",
+    (
+        pytest.param({"standard_name": "time"}, None, "time1", id="no-bounds"),
+        pytest.param(
+            {"standard_name": "time", "bounds": "time_bnds"}, None, "time", id="bounds"
+        ),
+        pytest.param(
+            {"axis": "T", "climatology": "climatology_bnds"},
+            "time: mean within years time: mean over years",
+            "time2",
+            id="climatology",
+        ),
+        pytest.param(
+            {"axis": "T", "climatology": "climatology_bnds"},
+            "time: mean within days time: mean over days",
+            "time3",
+            id="diurnal-cycle",
+        ),
+    ),
+)
+def test_time(coordinate_attributes, cell_methods, exp):
+    header = get_header(
+        {"t": 3},
+        [
+            ("t", ("t",), coordinate_attributes),
+            (
+                "x",
+                ("t",),
+                {} if cell_methods is None else {"cell_methods": cell_methods},
+            ),
+        ],
+    )
+
+    assert get_cmip_dimensions(header, header.variables[1]) == (exp,)
+
+
+@pytest.mark.parametrize(
+    "attributes, value, exp",
+    (
+        pytest.param({"standard_name": "height"}, 10.0, "height10m", id="height"),
+        pytest.param(
+            {"standard_name": "depth", "units": "m"}, 100, "depth100m", id="depth"
+        ),
+        pytest.param({"standard_name": "air_pressure"}, 85000.0, "p850", id="pa"),
+        pytest.param(
+            {"standard_name": "air_pressure", "units": "hPa"}, 500, "p500", id="hpa"
+        ),
+    ),
+)
+def test_scalar_vertical(attributes, value, exp):
+    header = get_header(
+        {},
+        [("z", (), attributes), ("x", (), {"coordinates": "z"})],
+    )
+
+    res = get_cmip_dimensions(header, header.variables[1], scalar_values={"z": value})
+
+    assert res == (exp,)
+
+
+def test_pressure_levels():
+    header = get_header(
+        {"plev": 19},
+        [
+            ("plev", ("plev",), {"standard_name": "air_pressure"}),
+            ("ta", ("plev",), {}),
+        ],
+    )
+
+    assert get_cmip_dimensions(header, header.variables[1]) == ("plev19",)
+
+
+def test_curvilinear():
+    header = get_header(
+        {"j": 2, "i": 3},
+        [
+            ("latitude", ("j", "i"), {"standard_name": "latitude"}),
+            ("longitude", ("j", "i"), {"standard_name": "longitude"}),
+            ("tos", ("j", "i"), {"coordinates": "latitude longitude"}),
+        ],
+    )
+
+    res = get_cmip_dimensions(header, header.variables[2])
+
+    assert res == ("latitude", "longitude")
+
+
+def test_name_in_rule_tables():
+    header = get_header(
+        {"basin": 3},
+        [("basin", ("basin",), {}), ("msftm", ("basin",), {})],
+    )
+
+    assert get_cmip_dimensions(header, header.variables[1]) == ("basin",)
+
+
+def test_scalar_vertical_name():
+    header = get_header(
+        {},
+        [
+            ("height2m", (), {"standard_name": "height"}),
+            ("tas", (), {"coordinates": "height2m"}),
+        ],
+    )
+
+    assert get_cmip_dimensions(header, header.variables[1]) == ("height2m",)
+
+
+def test_unrecognised_passed_through():
+    header = get_header(
+        {"lev": 3, "lat": 2},
+        [
+            ("lev", ("lev",), {"standard_name": "model_level_number"}),
+            ("lat", ("lat",), {"standard_name": "latitude"}),
+            ("height", (), {}),
+            ("ta", ("lev", "lat"), {"coordinates": "height"}),
+        ],
+    )
+
+    res = get_cmip_dimensions(
+        header, header.variables[3], scalar_values={"height": 2.0}
+    )
+
+    assert res == ("lev", "latitude", "height")
+
+
+@pytest.mark.parametrize(
+    "attributes, scalar_values, exp_unresolved",
+    (
+        pytest.param(
+            {"standard_name": "height"}, {}, "height", id="scalar-without-value"
+        ),
+        pytest.param(
+            {"standard_name": "height"}, {"height": 5.0}, "height", id="unknown-height"
+        ),
+        pytest.param(
+            {"standard_name": "height", "units": "km"},
+            {"height": 2.0},
+            "height",
+            id="unknown-units",
+        ),
+    ),
+)
+def test_unresolved(attributes, scalar_values, exp_unresolved):
+    header = get_header(
+        {},
+        [("height", (), attributes), ("tas", (), {"coordinates": "height"})],
+    )
+
+    with pytest.raises(
+        UnresolvedDimensionsError,
+        match=re.escape(f"Unrecognised coordinate(s): {exp_unresolved}"),
+    ):
+        get_cmip_dimensions(header, header.variables[1], scalar_values=scalar_values)
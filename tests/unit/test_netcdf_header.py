@@ -0,0 +1,143 @@
+"""
+Tests of `cmip_branded_variable_mapper.netcdf_header`
+"""
+
+import re
+
+import pytest
+
+from cmip_branded_variable_mapper.netcdf_header import (
+    NetCDFHeaderError,
+    read_classic_header,
+    read_header,
+    read_scalar_values,
+)
+
+
+@pytest.mark.parametrize(
+    "version, exp_format",
+    ((1, "classic"), (2, "64bit_offset"), (5, "64bit_data")),
+)
+def test_read_classic_header(
+    tmp_path, write_classic_netcdf, tas_netcdf_spec, version, exp_format
+):
+    path = tmp_path / "tas.nc"
+    header_size = write_classic_netcdf(path, version, **tas_netcdf_spec)
+
+    res = read_header(path)
+
+    assert res.format == exp_format
+    assert res.header_size == header_size
+    assert res.dimensions == {"time": 0, "lat": 2, "lon": 3, "bnds": 2}
+    assert res.attributes == {"Conventions": "CF-1.7", "realization_index": (1,)}
+    assert [v.name for v in res.variables] == [
+        "time",
+        "time_bnds",
+        "lat",
+        "lon",
+        "height",
+        "tas",
+    ]
+    # The value of the scalar height comes first in the data
+    assert res.data_start == header_size
+    assert {v.name: v.begin for v in res.variables}["height"] == header_size
+    assert {v.begin for v in res.variables} == {header_size, header_size + 8}
+    assert {v.nc_type for v in res.variables} == {6}
+
+    (tas,) = res.data_variables
+    assert tas.name == "tas"
+    assert tas.dimensions == ("time", "lat", "lon")
+    assert tas.attributes["cell_methods"] == "area: time: mean"
+
+
+def test_read_classic_header_does_not_read_data(
+    tmp_path, write_classic_netcdf, tas_netcdf_spec
+):
+    path = tmp_path / "tas.nc"
+    header_size = write_classic_netcdf(path, 2, **tas_netcdf_spec, data_size=0)
+    # Data which is "missing" (e.g. a partially downloaded file) doesn't matter,
+    # only the value of the scalar height is there
+    assert path.stat().st_size == header_size + 8
+
+    assert read_classic_header(path).data_variables[0].name == "tas"
+
+
+@pytest.mark.parametrize("version", (1, 2, 5))
+def test_read_scalar_values(tmp_path, write_classic_netcdf, tas_netcdf_spec, version):
+    path = tmp_path / "tas.nc"
+    write_classic_netcdf(path, version, **tas_netcdf_spec)
+
+    assert read_scalar_values(path, read_header(path)) == {"height": 2.0}
+
+
+def test_read_header_not_netcdf(tmp_path):
+    path = tmp_path / "junk.nc"
+    path.write_bytes(b"junk" * 4)
+
+    with pytest.raises(NetCDFHeaderError, match="It is not a netCDF file"):
+        read_header(path)
+
+
+def test_read_classic_header_truncated(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "truncated.nc"
+    write_classic_netcdf(path, 1, **tas_netcdf_spec)
+    path.write_bytes(path.read_bytes()[:40])
+
+    with pytest.raises(
+        NetCDFHeaderError,
+        match=re.escape(
+            f"Could not read the header of {path}. The header is truncated."
+        ),
+    ):
+        read_classic_header(path)
+
+
+def test_read_classic_header_unknown_version(tmp_path):
+    path = tmp_path / "unknown.nc"
+    path.write_bytes(b"CDF\x03" + b"\x00" * 12)
+
+    with pytest.raises(NetCDFHeaderError, match="Unknown classic format version 3"):
+        read_header(path)
+
+
+def test_read_netcdf4_header_without_netcdf4(tmp_path):
+    try:
+        import netCDF4  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        pytest.skip("netCDF4 is installed")
+
+    path = tmp_path / "tas.nc"
+    path.write_bytes(b"\x89HDF\r\n\x1a\n" + b"\x00" * 8)
+
+    with pytest.raises(ImportError, match="requires netCDF4"):
+        read_header(path)
+
+
+def test_read_netcdf4_header(tmp_path):
+    netCDF4 = pytest.importorskip("netCDF4")
+
+    path = tmp_path / "tas.nc"
+    with netCDF4.Dataset(path, "w", format="NETCDF4") as ds:
+        ds.createDimension("time", None)
+        ds.createDimension("lat", 2)
+        ds.setncattr("Conventions", "CF-1.7")
+        tas = ds.createVariable("tas", "f8", ("time", "lat"))
+        tas.setncattr("cell_methods", "area: time: mean")
+        tas.setncattr("coordinates", "height")
+        ds.createVariable("lat", "f8", ("lat",))
+        height = ds.createVariable("height", "f8", ())
+        height.assignValue(2.0)
+
+    res = read_header(path)
+
+    assert res.format == "netcdf4"
+    assert res.attributes == {"Conventions": "CF-1.7"}
+    (tas,) = res.data_variables
+    assert tas.dimensions == ("time", "lat")
+    assert tas.attributes == {
+        "cell_methods": "area: time: mean",
+        "coordinates": "height",
+    }
+    assert read_scalar_values(path, res) == {"height": 2.0}
@@ -0,0 +1,89 @@
+"""
+Tests of `cmip_branded_variable_mapper.parallel`
+"""
+
+import multiprocessing
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.bulk import map_to_cmip_branded_variables
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.parallel import (
+    map_to_cmip_branded_variables_parallel,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return (
+        raw["Physical Parameter"].tolist(),
+        [None if pd.isnull(v) else v for v in raw["Cell Methods"]],
+        [tuple(v.split(", ")) for v in raw["Dimensions"]],
+    )
+
+
+@pytest.mark.parametrize(
+    "chunk_size, start_method",
+    (
+        pytest.param(10_000, None, id="single-chunk"),
+        pytest.param(100, None, id="default"),
+        pytest.param(500, "spawn", id="spawn"),
+    ),
+)
+def test_matches_bulk(test_cases, chunk_size, start_method):
+    res = map_to_cmip_branded_variables_parallel(
+        *test_cases,
+        max_workers=2,
+        chunk_size=chunk_size,
+        mp_context=(
+            None if start_method is None else multiprocessing.get_context(start_method)
+        ),
+    )
+
+    assert res == map_to_cmip_branded_variables(*test_cases)
+    assert res == [map_to_cmip_branded_variable(*v) for v in zip(*test_cases)]
+
+
+def test_matches_scalar_mapper_edge_cases():
+    cell_methods = [
+        "area: mean where snow over sea_ice time: mean",
+        "area: mean time:  maximum",
+        '"time: max"',
+        None,
+        "area: time: mean",
+    ]
+    dimensions = [
+        *([("longitude", "latitude", "time")] * (len(cell_methods) - 1)),
+        "longitude latitude time height2m",
+    ]
+    variable_names = ["x"] * len(cell_methods)
+
+    res = map_to_cmip_branded_variables_parallel(
+        variable_names, cell_methods, dimensions, max_workers=2, chunk_size=2
+    )
+
+    assert res == [
+        map_to_cmip_branded_variable(*v)
+        for v in zip(variable_names, cell_methods, dimensions)
+    ]
+    assert res[0] == "x_tavg-u-hxy-si"
+    assert res[-1] == "x_tavg-h2m-hxy-u"
+
+
+def test_inconsistent_lengths():
+    with pytest.raises(ValueError, match=re.escape("len(cell_methods)=1")):
+        map_to_cmip_branded_variables_parallel(["a", "b"], [None], [(), ()])
+
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError, match="chunk_size must be at least one"):
+        map_to_cmip_branded_variables_parallel(["a"], [None], [()], chunk_size=0)
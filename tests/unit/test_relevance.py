@@ -0,0 +1,87 @@
+"""
+Tests of `cmip_branded_variable_mapper.relevance`
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cmip_branded_variable_mapper.area_label import get_area_label
+from cmip_branded_variable_mapper.horizontal_label import get_horizontal_label
+from cmip_branded_variable_mapper.relevance import get_default_relevance
+from cmip_branded_variable_mapper.temporal_label import get_temporal_label
+from cmip_branded_variable_mapper.vertical_label import get_vertical_label
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+LABEL_FUNCTIONS = {
+    "temporal_label": get_temporal_label,
+    "vertical_label": lambda cm, dims: get_vertical_label(dims),
+    "horizontal_label": lambda cm, dims: get_horizontal_label(dims),
+    "area_label": lambda cm, dims: get_area_label(cm),
+}
+
+
+@pytest.mark.parametrize("label", sorted(LABEL_FUNCTIONS))
+def test_projection_does_not_change_label(label):
+    relevance = get_default_relevance()[label]
+    func = LABEL_FUNCTIONS[label]
+
+    raw = pd.read_csv(TEST_CASES_FILE)
+    for cell_methods, dimensions in zip(raw["Cell Methods"], raw["Dimensions"]):
+        cell_methods_h = None if pd.isnull(cell_methods) else cell_methods
+        dimensions_t = tuple(dimensions.split(", "))
+        projected = relevance.project_dimensions(dimensions_t)
+        cell_methods_p = relevance.project_cell_methods(cell_methods_h)
+
+        assert func(cell_methods_p, projected) == func(cell_methods_h, dimensions_t)
+
+
+def test_project_dimensions_is_canonical():
+    relevance = get_default_relevance()["branded_variable"]
+
+    assert relevance.project_dimensions(
+        ["time", "landUse", "latitude", "longitude"]
+    ) == relevance.project_dimensions(("longitude", "latitude", "spectband", "time"))
+
+
+def test_project_dimensions_string():
+    relevance = get_default_relevance()["branded_variable"]
+
+    exp = relevance.project_dimensions(("longitude", "latitude", "time", "height2m"))
+    assert relevance.project_dimensions("longitude latitude time height2m") == exp
+    assert relevance.project_dimensions("longitude, latitude, time, height2m") == exp
+
+
+@pytest.mark.parametrize(
+    "label, cell_methods, exp",
+    (
+        ("temporal_label", "area: mean where sea time: mean", "time: mean"),
+        ("temporal_label", "area: mean  time:\tmaximum", "time: maximum"),
+        ("area_label", "area: mean where sea time: mean", "sea"),
+        ("area_label", "area: mean where snow over sea_ice", "snow | sea_ice"),
+        ("area_label", '"time: max"', '"time: max"'),
+        ("vertical_label", "area: mean where sea time: mean", None),
+        ("branded_variable", "area:  time: mean", "area: time: mean"),
+        ("branded_variable", None, None),
+    ),
+)
+def test_project_cell_methods(label, cell_methods, exp):
+    relevance = get_default_relevance()[label]
+
+    assert relevance.project_cell_methods(cell_methods) == exp
+
+
+def test_branded_variable_relevance_is_union():
+    relevance = get_default_relevance()
+
+    assert relevance["branded_variable"].dimensions == (
+        relevance["temporal_label"].dimensions
+        | relevance["vertical_label"].dimensions
+        | relevance["horizontal_label"].dimensions
+    )
+    assert relevance["branded_variable"].uses_cell_methods
+    assert not relevance["vertical_label"].uses_cell_methods
@@ -0,0 +1,156 @@
+"""
+Tests of `cmip_branded_variable_mapper.scanner`
+"""
+
+import csv
+import io
+
+from cmip_branded_variable_mapper.scanner import (
+    ScannedVariable,
+    find_netcdf_files,
+    main,
+    scan_file,
+    scan_files,
+)
+
+
+def test_scan_file(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "tas.nc"
+    write_classic_netcdf(path, 2, **tas_netcdf_spec)
+
+    res = scan_file(path)
+
+    assert res.path == path
+    assert res.error is None
+    assert res.variables == (
+        ScannedVariable(
+            variable_name="tas",
+            cell_methods="area: time: mean",
+            dimensions=("time", "latitude", "longitude", "height2m"),
+            branded_variable="tas_tavg-h2m-hxy-u",
+        ),
+    )
+
+
+def test_scan_file_custom_mapper(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "tas.nc"
+    write_classic_netcdf(path, 2, **tas_netcdf_spec)
+
+    res = scan_file(path, mapper=lambda name, cm, dims: f"{name}|{cm}|{dims}")
+
+    assert res.variables[0].branded_variable == (
+        "tas|area: time: mean|('time', 'latitude', 'longitude', 'height2m')"
+    )
+
+
+def test_scan_file_error(tmp_path):
+    path = tmp_path / "junk.nc"
+    path.write_bytes(b"junk")
+
+    res = scan_file(path)
+
+    assert res.variables == ()
+    assert "It is not a netCDF file" in res.error
+
+
+def test_scan_file_unrecognised(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "tas.nc"
+    variables = [
+        (name, dims, {}, *rest) if name == "lat" else (name, dims, attrs, *rest)
+        for name, dims, attrs, *rest in tas_netcdf_spec["variables"]
+    ]
+    write_classic_netcdf(
+        path,
+        2,
+        dimensions=tas_netcdf_spec["dimensions"],
+        attributes=tas_netcdf_spec["attributes"],
+        variables=variables,
+    )
+
+    res = scan_file(path)
+
+    # An unrecognised coordinate is passed through under its own name,
+    # rather than failing the file
+    assert res.error is None
+    assert res.variables == (
+        ScannedVariable(
+            variable_name="tas",
+            cell_methods="area: time: mean",
+            dimensions=("time", "lat", "longitude", "height2m"),
+            branded_variable="tas_tavg-h2m-hm-u",
+        ),
+    )
+
+
+def test_scan_file_unresolved(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "tas.nc"
+    variables = [
+        (*v[:3], 5.0) if v[0] == "height" else v for v in tas_netcdf_spec["variables"]
+    ]
+    write_classic_netcdf(
+        path,
+        2,
+        dimensions=tas_netcdf_spec["dimensions"],
+        attributes=tas_netcdf_spec["attributes"],
+        variables=variables,
+    )
+
+    res = scan_file(path)
+
+    assert res.variables == ()
+    assert res.error == (
+        "Could not work out the CMIP dimension names of 'tas'. "
+        "Unrecognised coordinate(s): height"
+    )
+
+
+def test_find_netcdf_files(tmp_path):
+    for p in ("b/2.nc", "b/1.nc4", "a/3.nc", "a/notes.txt"):
+        (tmp_path / p).parent.mkdir(exist_ok=True)
+        (tmp_path / p).write_bytes(b"")
+
+    res = list(find_netcdf_files([tmp_path / "a" / "notes.txt", tmp_path]))
+
+    assert res == [
+        tmp_path / "a" / "notes.txt",
+        tmp_path / "a" / "3.nc",
+        tmp_path / "b" / "1.nc4",
+        tmp_path / "b" / "2.nc",
+    ]
+
+
+def test_scan_files_order(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i}.nc"
+        if i % 3:
+            write_classic_netcdf(path, 1, **tas_netcdf_spec)
+        else:
+            path.write_bytes(b"junk")
+
+        paths.append(path)
+
+    res = list(scan_files(iter(paths), max_workers=2))
+
+    assert [r.path for r in res] == paths
+    assert [r.error is None for r in res] == [bool(i % 3) for i in range(20)]
+
+
+def test_main(tmp_path, write_classic_netcdf, tas_netcdf_spec, capsys):
+    write_classic_netcdf(tmp_path / "tas.nc", 5, **tas_netcdf_spec)
+    (tmp_path / "junk.nc").write_bytes(b"junk")
+
+    exit_code = main([str(tmp_path)])
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert "junk.nc" in captured.err
+    assert list(csv.DictReader(io.StringIO(captured.out))) == [
+        {
+            "path": str(tmp_path / "tas.nc"),
+            "variable_name": "tas",
+            "cell_methods": "area: time: mean",
+            "dimensions": "time latitude longitude height2m",
+            "branded_variable": "tas_tavg-h2m-hxy-u",
+        }
+    ]
@@ -0,0 +1,224 @@
+"""
+Tests of `cmip_branded_variable_mapper.spec`
+"""
+
+import importlib.util
+import json
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from attrs import evolve
+
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+from cmip_branded_variable_mapper.spec import (
+    CACHE_DIR_ENV_VAR,
+    DEFAULT_SPEC_PATH,
+    LabelSpec,
+    get_cache_path,
+    get_default_cache_dir,
+    load_spec,
+    parse_spec_file,
+)
+
+TEST_CASES_FILE = (
+    Path(__file__).parents[1] / "test-data" / "CMIP7-variables-for-branding.csv"
+)
+
+requires_toml = pytest.mark.skipif(
+    sys.version_info < (3, 11) and importlib.util.find_spec("tomli") is None,
+    reason="Reading TOML requires Python 3.11+ or tomli",
+)
+
+
+@pytest.fixture(scope="module")
+def test_cases():
+    raw = pd.read_csv(TEST_CASES_FILE)
+
+    return [
+        (variable_name, None if pd.isnull(cm) else cm, tuple(dims.split(", ")))
+        for variable_name, cm, dims in zip(
+            raw["Physical Parameter"], raw["Cell Methods"], raw["Dimensions"]
+        )
+    ]
+
+
+@pytest.fixture
+def default_spec_raw():
+    return parse_spec_file(DEFAULT_SPEC_PATH.read_bytes(), suffix=".toml")
+
+
+@pytest.fixture
+def json_spec(tmp_path, default_spec_raw):
+    default_spec_raw["version"] = "test"
+    default_spec_raw["vertical"]["fallback"] = "uu"
+    default_spec_raw["vertical"]["dimensions"] = {
+        "testlev": "tl",
+        **default_spec_raw["vertical"]["dimensions"],
+    }
+
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(default_spec_raw))
+
+    return path
+
+
+@requires_toml
+def test_default_spec_file_matches_defaults():
+    assert load_spec(DEFAULT_SPEC_PATH, use_cache=False) == LabelSpec.from_defaults()
+
+
+def test_default_spec_matches_mapper(test_cases):
+    spec = LabelSpec.from_defaults()
+    compiled = spec.compile()
+
+    for test_case in test_cases:
+        exp = map_to_cmip_branded_variable(*test_case)
+
+        assert spec.map_to_cmip_branded_variable(*test_case) == exp
+        assert compiled.map_to_cmip_branded_variable(*test_case) == exp
+
+
+@requires_toml
+def test_json_spec(json_spec):
+    res = load_spec(json_spec, use_cache=False)
+
+    assert res.version == "test"
+    assert (
+        res.map_to_cmip_branded_variable(
+            "ta",
+            "area: time: mean",
+            ("longitude", "latitude", "p10", "testlev", "time"),
+        )
+        == "ta_tavg-tl-hxy-u"
+    )
+    assert (
+        res.map_to_cmip_branded_variable(
+            "tas", "area: time: mean", ("longitude", "latitude", "time")
+        )
+        == "tas_tavg-uu-hxy-u"
+    )
+    assert (
+        res.compile().map_to_cmip_branded_variable(
+            "tas", "area: time: mean", ("longitude", "latitude", "time")
+        )
+        == "tas_tavg-uu-hxy-u"
+    )
+
+
+def test_missing_entry():
+    with pytest.raises(
+        ValueError, match=re.escape("missing the required entry 'area'")
+    ):
+        LabelSpec.from_dict({"version": "1", "temporal": {}, "vertical": {}})
+
+
+@requires_toml
+def test_invalid_rules(default_spec_raw):
+    default_spec_raw["temporal"]["cell_methods_initial"]["time: m"] = "tm"
+
+    with pytest.raises(AssertionError, match="'time: m' is a subset of 'time: max'"):
+        LabelSpec.from_dict(default_spec_raw)
+
+
+@requires_toml
+def test_cache(tmp_path, json_spec, monkeypatch):
+    cache_dir = tmp_path / "cache"
+
+    res = load_spec(json_spec, cache_dir=cache_dir)
+
+    cache_path = get_cache_path(json_spec.read_bytes(), cache_dir)
+    assert list(cache_dir.iterdir()) == [cache_path]
+
+    # Loading again doesn't parse or validate anything
+    def fail(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr(LabelSpec, "from_dict", fail)
+    monkeypatch.setattr(
+        "cmip_branded_variable_mapper.spec.parse_spec_file", fail, raising=True
+    )
+
+    res_cached = load_spec(json_spec, cache_dir=cache_dir)
+    assert res_cached == res
+    assert res_cached.map_to_cmip_branded_variable(
+        "ta", None, ("testlev",)
+    ) == res.map_to_cmip_branded_variable("ta", None, ("testlev",))
+
+    with pytest.raises(AssertionError):
+        load_spec(json_spec, cache_dir=cache_dir, use_cache=False)
+
+
+@requires_toml
+def test_cache_keyed_by_content(tmp_path, json_spec):
+    cache_dir = tmp_path / "cache"
+
+    load_spec(json_spec, cache_dir=cache_dir)
+
+    raw = json.loads(json_spec.read_text())
+    raw["area"]["fallback"] = "uu"
+    json_spec.write_text(json.dumps(raw))
+
+    res = load_spec(json_spec, cache_dir=cache_dir)
+
+    assert res.area_fallback == "uu"
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_cache_path_keyed_by_package_version(tmp_path, monkeypatch):
+    content = b'{"version": "test"}'
+    before = get_cache_path(content, tmp_path)
+
+    monkeypatch.setattr("importlib.metadata.version", lambda name: "0.0.0-other")
+
+    assert get_cache_path(content, tmp_path) != before
+
+
+@requires_toml
+def test_cache_corrupt(tmp_path, json_spec):
+    cache_dir = tmp_path / "cache"
+    cache_path = get_cache_path(json_spec.read_bytes(), cache_dir)
+    cache_dir.mkdir()
+    cache_path.write_bytes(b"junk")
+
+    res = load_spec(json_spec, cache_dir=cache_dir)
+
+    assert res.version == "test"
+    # Re-written
+    assert load_spec(json_spec, cache_dir=cache_dir) == res
+    assert cache_path.read_bytes() != b"junk"
+
+
+@requires_toml
+def test_cache_not_writable(tmp_path, json_spec):
+    # A file where the directory should be
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("not a directory")
+
+    res = load_spec(json_spec, cache_dir=cache_dir)
+
+    assert res.version == "test"
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "override"))
+    assert get_default_cache_dir() == tmp_path / "override"
+
+    monkeypatch.delenv(CACHE_DIR_ENV_VAR)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert get_default_cache_dir() == tmp_path / "xdg" / "cmip-branded-variable-mapper"
+
+
+def test_required_dimension_outside_tables():
+    # Not in any of the rule tables, so only known to the vocabulary via the spec
+    spec = evolve(
+        LabelSpec.from_defaults(),
+        temporal_cell_methods_initial_required_dimension="timeRequiredBySpec",
+    )
+
+    assert (
+        spec.map_to_cmip_branded_variable("x", "time: max", ("timeRequiredBySpec",))
+        == "x_tmax-u-hm-u"
+    )
@@ -0,0 +1,168 @@
+"""
+Tests of `cmip_branded_variable_mapper.stamping`
+"""
+
+import csv
+import io
+
+import pytest
+
+from cmip_branded_variable_mapper.netcdf_header import read_header
+from cmip_branded_variable_mapper.stamping import main, stamp_file, stamp_files
+
+
+@pytest.fixture
+def tas_file(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    def write(version=2, header_padding=512):
+        path = tmp_path / f"tas-{version}-{header_padding}.nc"
+        write_classic_netcdf(
+            path, version, **tas_netcdf_spec, header_padding=header_padding
+        )
+
+        return path
+
+    return write
+
+
+@pytest.mark.parametrize("version", (1, 2, 5))
+def test_stamp_file(tas_file, version):
+    path = tas_file(version=version)
+    before = read_header(path)
+    raw_before = path.read_bytes()
+
+    res = stamp_file(path)
+
+    assert res.action == "stamp"
+    assert res.value == "tas_tavg-h2m-hxy-u"
+    assert res.header_size == before.header_size
+    assert res.new_header_size > before.header_size
+    assert res.data_start == before.data_start
+
+    after = read_header(path)
+    assert after.attributes == {
+        **before.attributes,
+        "branded_variable": "tas_tavg-h2m-hxy-u",
+    }
+    assert after.variables == before.variables
+    raw_after = path.read_bytes()
+    assert len(raw_after) == len(raw_before)
+    # The data is untouched
+    assert raw_after[before.data_start :] == raw_before[before.data_start :]
+
+    assert stamp_file(path).action == "unchanged"
+
+
+def test_stamp_file_replaces_value(tas_file):
+    path = tas_file()
+    stamp_file(path, attribute="branded_variable", mapper=lambda *args: "x" * 100)
+    longer_header_size = read_header(path).header_size
+
+    res = stamp_file(path)
+
+    assert res.action == "stamp"
+    assert res.new_header_size < longer_header_size
+    header = read_header(path)
+    assert header.attributes["branded_variable"] == "tas_tavg-h2m-hxy-u"
+    assert list(header.attributes) == [
+        "Conventions",
+        "realization_index",
+        "branded_variable",
+    ]
+
+
+def test_stamp_file_no_room(tas_file):
+    path = tas_file(header_padding=0)
+    raw_before = path.read_bytes()
+
+    res = stamp_file(path)
+
+    assert res.action == "rewrite"
+    assert res.reason == (
+        f"The header needs {res.new_header_size - res.data_start} more bytes "
+        "than there is room for before the data"
+    )
+    assert path.read_bytes() == raw_before
+
+
+def test_stamp_file_dry_run(tas_file):
+    path = tas_file()
+    raw_before = path.read_bytes()
+
+    res = stamp_file(path, dry_run=True, attribute="branding")
+
+    assert res.action == "stamp"
+    assert path.read_bytes() == raw_before
+
+
+def test_stamp_file_skip_and_error(tmp_path, write_classic_netcdf):
+    no_data = tmp_path / "no-data.nc"
+    write_classic_netcdf(no_data, 1, dimensions={"lat": 2}, attributes={}, variables=[])
+    junk = tmp_path / "junk.nc"
+    junk.write_bytes(b"junk")
+
+    res = list(stamp_files([no_data, junk], max_workers=2))
+
+    assert [r.action for r in res] == ["skip", "error"]
+    assert "It is not a netCDF file" in res[1].reason
+
+
+def test_stamp_file_unresolved(tmp_path, write_classic_netcdf, tas_netcdf_spec):
+    path = tmp_path / "tas-5m.nc"
+    variables = [
+        v if v[0] != "height" else (*v[:3], 5.0) for v in tas_netcdf_spec["variables"]
+    ]
+    write_classic_netcdf(
+        path,
+        2,
+        dimensions=tas_netcdf_spec["dimensions"],
+        attributes=tas_netcdf_spec["attributes"],
+        variables=variables,
+        header_padding=512,
+    )
+    raw_before = path.read_bytes()
+
+    res = stamp_file(path)
+
+    assert res.action == "unresolved"
+    assert res.value is None
+    assert res.reason == (
+        "Could not work out the CMIP dimension names of 'tas'. "
+        "Unrecognised coordinate(s): height"
+    )
+    assert path.read_bytes() == raw_before
+    assert main([str(path)]) == 1
+
+
+def test_main_dry_run(tas_file, capsys):
+    stampable = tas_file()
+    no_room = tas_file(header_padding=0)
+    raw_before = {p: p.read_bytes() for p in (stampable, no_room)}
+
+    exit_code = main([str(stampable), str(no_room), "--dry-run"])
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    rows = list(csv.DictReader(io.StringIO(captured.out)))
+    assert [(r["path"], r["action"]) for r in rows] == [
+        (str(stampable), "stamp"),
+        (str(no_room), "rewrite"),
+    ]
+    assert {p: p.read_bytes() for p in raw_before} == raw_before
+
+    assert main([str(stampable)]) == 0
+    assert read_header(stampable).attributes["branded_variable"] == "tas_tavg-h2m-hxy-u"
+
+
+def test_stamp_file_netcdf4(tmp_path):
+    netCDF4 = pytest.importorskip("netCDF4")
+
+    path = tmp_path / "tas.nc"
+    with netCDF4.Dataset(path, "w", format="NETCDF4") as ds:
+        ds.createDimension("time", None)
+        tas = ds.createVariable("tas", "f8", ("time",))
+        tas.setncattr("cell_methods", "area: time: mean")
+
+    res = stamp_file(path)
+
+    assert res.action == "stamp"
+    assert read_header(path).attributes["branded_variable"] == res.value
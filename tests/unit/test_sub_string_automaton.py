@@ -0,0 +1,68 @@
+"""
+Tests of `cmip_branded_variable_mapper.sub_string_automaton`
+"""
+
+import random
+
+import pytest
+
+from cmip_branded_variable_mapper.sub_string_automaton import (
+    SubStringAutomaton,
+    iter_sub_string_pairs,
+)
+
+
+@pytest.mark.parametrize("build_transitions", (True, False))
+def test_against_brute_force(build_transitions):
+    rng = random.Random(2025)  # noqa: S311
+    for _ in range(2000):
+        patterns = tuple(
+            "".join(rng.choice("ab") for _ in range(rng.randint(0, 4)))
+            for _ in range(rng.randint(1, 6))
+        )
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+
+        automaton = SubStringAutomaton.from_patterns(
+            patterns, build_transitions=build_transitions
+        )
+
+        exp = {i for i, pattern in enumerate(patterns) if pattern in text}
+        assert automaton.find_all(text) == exp
+        assert automaton.first_match(text) == min(exp, default=None)
+
+
+def test_iter_matches():
+    automaton = SubStringAutomaton.from_patterns(("he", "she", "his", "hers"))
+
+    res = list(automaton.iter_matches("ushers"))
+
+    assert res == [(4, 0), (4, 1), (6, 3)]
+
+
+def test_first_match_priority():
+    automaton = SubStringAutomaton.from_patterns(("sea_ice", "sea", "ice"))
+
+    assert automaton.first_match("area: mean where sea_ice") == 0
+    assert automaton.first_match("area: mean where sea") == 1
+    assert automaton.first_match("area: mean where land_ice") == 2
+    assert automaton.first_match("area: mean where land") is None
+
+
+@pytest.mark.parametrize("reverse", (False, True))
+def test_iter_sub_string_pairs_against_brute_force(reverse):
+    rng = random.Random(2026)  # noqa: S311
+    for _ in range(2000):
+        patterns = tuple(
+            "".join(rng.choice("ab") for _ in range(rng.randint(0, 4)))
+            for _ in range(rng.randint(0, 6))
+        )
+
+        indexes = range(len(patterns))
+        exp = [
+            (i, j)
+            for j in (reversed(indexes) if reverse else indexes)
+            for i in indexes
+            if i != j and patterns[i] in patterns[j]
+        ]
+
+        assert list(iter_sub_string_pairs(patterns, reverse=reverse)) == exp
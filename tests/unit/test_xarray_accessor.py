@@ -0,0 +1,169 @@
+"""
+Tests of `cmip_branded_variable_mapper.xarray_accessor`
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from cmip_branded_variable_mapper.mapper import map_to_cmip_branded_variable
+
+xr = pytest.importorskip("xarray")
+
+from cmip_branded_variable_mapper.netcdf_dimensions import (  # noqa: E402
+    UnresolvedDimensionsError,
+)
+from cmip_branded_variable_mapper.spec import load_spec  # noqa: E402
+from cmip_branded_variable_mapper.xarray_accessor import (  # noqa: E402
+    CACHE_ATTRIBUTE,
+    get_mapper_version,
+)
+
+
+@pytest.fixture
+def ds():
+    return xr.Dataset(
+        {
+            "tas": (
+                ("time", "latitude", "longitude"),
+                np.zeros((2, 3, 4)),
+                {"cell_methods": "area: time: mean"},
+            ),
+            "pr": (
+                ("time", "latitude", "longitude"),
+                np.zeros((2, 3, 4)),
+                {"cell_methods": "area: time: mean where land"},
+            ),
+            "orog": (("latitude", "longitude"), np.zeros((3, 4))),
+        },
+        coords={"time": [0, 1], "latitude": [0, 1, 2], "longitude": [0, 1, 2, 3]},
+    )
+
+
+def test_map(ds):
+    res = ds.cmip_branding.map()
+
+    assert res == {
+        "tas": "tas_tavg-u-hxy-u",
+        "pr": "pr_tavg-u-hxy-lnd",
+        "orog": "orog_ti-u-hxy-u",
+    }
+    assert json.loads(ds.attrs[CACHE_ATTRIBUTE]) == {
+        "mapper": get_mapper_version(map_to_cmip_branded_variable),
+        "branded_variables": res,
+    }
+
+
+def test_map_translates_coordinates():
+    ds = xr.Dataset(
+        {
+            "tas": (
+                ("time", "lat", "lon"),
+                np.zeros((2, 3, 4)),
+                {"cell_methods": "area: time: mean"},
+            ),
+            "time_bnds": (("time", "bnds"), np.zeros((2, 2))),
+        },
+        coords={
+            "time": ("time", [0, 1], {"standard_name": "time", "bounds": "time_bnds"}),
+            "lat": ("lat", [0, 1, 2], {"standard_name": "latitude"}),
+            "lon": ("lon", [0, 1, 2, 3], {"standard_name": "longitude"}),
+            "height": ((), 2.0, {"standard_name": "height", "units": "m"}),
+        },
+    )
+
+    assert ds.cmip_branding.map() == {"tas": "tas_tavg-h2m-hxy-u"}
+
+
+def test_map_unresolved(ds):
+    ds = ds.assign_coords(height=((), 5.0, {"standard_name": "height"}))
+
+    with pytest.raises(UnresolvedDimensionsError, match="height"):
+        ds.cmip_branding.map()
+
+
+def test_map_cached(ds):
+    calls = []
+
+    def mapper(*args):
+        calls.append(args)
+        return "branded"
+
+    first = ds.cmip_branding.map(mapper=mapper)
+    second = ds.cmip_branding.map(mapper=mapper)
+
+    assert first == second
+    assert len(calls) == len(ds.data_vars)
+
+    ds.cmip_branding.map(mapper=mapper, refresh=True)
+    assert len(calls) == 2 * len(ds.data_vars)
+
+
+def test_map_cache_invalidated_by_other_mapper(ds):
+    ds.cmip_branding.map()
+    spec = load_spec(use_cache=False)
+
+    res = ds.cmip_branding.map(mapper=lambda *args: "other")
+    assert set(res.values()) == {"other"}
+
+    res = ds.cmip_branding.map(mapper=spec.map_to_cmip_branded_variable)
+    assert res["tas"] == "tas_tavg-u-hxy-u"
+    assert json.loads(ds.attrs[CACHE_ATTRIBUTE])["mapper"] == get_mapper_version(
+        spec.map_to_cmip_branded_variable
+    )
+
+
+def test_map_cache_old_format_ignored(ds):
+    ds.attrs[CACHE_ATTRIBUTE] = json.dumps({k: "stale" for k in ds.data_vars})
+
+    assert ds.cmip_branding.map()["tas"] == "tas_tavg-u-hxy-u"
+
+
+def test_get_mapper_version():
+    spec = load_spec(use_cache=False)
+
+    default = get_mapper_version(map_to_cmip_branded_variable)
+    from_spec = get_mapper_version(spec.map_to_cmip_branded_variable)
+
+    assert default.startswith(
+        "cmip_branded_variable_mapper.mapper.map_to_cmip_branded_variable/"
+    )
+    assert f"/{spec.version}/" in from_spec
+    assert default != from_spec
+
+
+def test_map_cache_invalidated_by_new_variables(ds):
+    ds.cmip_branding.map()
+
+    ds["huss"] = (("time",), np.zeros(2))
+
+    assert ds.cmip_branding.map()["huss"] == "huss_tavg-u-hm-u"
+
+
+def test_map_does_not_compute():
+    dask = pytest.importorskip("dask")
+    da = pytest.importorskip("dask.array")
+
+    @dask.delayed
+    def fail():
+        msg = "Data was computed"
+        raise AssertionError(msg)
+
+    lazy = da.from_delayed(fail(), shape=(2, 3, 4), dtype=float)
+    ds = xr.Dataset(
+        {
+            f"var{i}": (
+                ("time", "latitude", "longitude"),
+                lazy,
+                {"cell_methods": "area: time: mean"},
+            )
+            for i in range(300)
+        },
+        coords={"time": [0, 1], "latitude": [0, 1, 2], "longitude": [0, 1, 2, 3]},
+    )
+
+    res = ds.cmip_branding.map()
+
+    assert len(res) == 300
+    assert res["var0"] == "var0_tavg-u-hxy-u"